@@ -35,9 +35,11 @@ setup(
         ],
     },
     install_requires=requirements,
+    extras_require={'numpy': ['numpy']},
     license="MIT license",
     long_description=readme,
     include_package_data=True,
+    package_data={'texas_holdem': ['lookup_tables.bin', 'preflop_table.bin']},
     keywords='texas holdem poker',
     name='texas_holdem',
     packages=find_packages('src'),
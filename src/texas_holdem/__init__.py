@@ -1,7 +1,48 @@
+import sys
+import types
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from texas_holdem.__version__ import version
-from texas_holdem.my_chances import compute as compute_my_chances, Opponent
+
+if TYPE_CHECKING:
+  from texas_holdem.hand_range import HandRange
+  from texas_holdem.my_chances import compute as compute_my_chances, \
+      compute_async as compute_my_chances_async, compute_multiway as compute_my_multiway_chances, \
+      estimate as estimate_my_chances, Opponent
 
 __author__ = """David Herskovics"""
 __email__ = 'huncros@gmail.com'
 __version__ = version
 
+# The names exported by the package with the module and the name they are defined by. The modules
+# are only imported when one of their names is first used, so importing the package is cheap (e.g.
+# `my_chances` imports `multiprocessing`).
+_EXPORTS = {
+    'HandRange': ('texas_holdem.hand_range', 'HandRange'),
+    'compute_my_chances': ('texas_holdem.my_chances', 'compute'),
+    'compute_my_chances_async': ('texas_holdem.my_chances', 'compute_async'),
+    'compute_my_multiway_chances': ('texas_holdem.my_chances', 'compute_multiway'),
+    'estimate_my_chances': ('texas_holdem.my_chances', 'estimate'),
+    'Opponent': ('texas_holdem.my_chances', 'Opponent'),
+}
+
+__all__ = list(_EXPORTS)
+
+
+class _LazyModule(types.ModuleType):
+  'Imports the exported names when they are first used (`__getattr__` of modules needs 3.7).'
+
+  def __getattr__(self, name):
+    if name not in _EXPORTS:
+      raise AttributeError(f'module {self.__name__!r} has no attribute {name!r}')
+    module_name, attribute = _EXPORTS[name]
+    value = getattr(import_module(module_name), attribute)
+    setattr(self, name, value)
+    return value
+
+  def __dir__(self):
+    return sorted({*super().__dir__(), *_EXPORTS})
+
+
+sys.modules[__name__].__class__ = _LazyModule
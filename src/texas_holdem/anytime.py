@@ -0,0 +1,170 @@
+'''Enumerates the boards in a random order so the computation can be stopped at any time.
+
+The exact computation (see `my_chances.compute`) can take long, e.g. before the flop or on the flop
+with assumptions about the opponent. Here the boards are enumerated in a pseudorandom order: the
+boards enumerated until any moment are a uniform random sample (without replacement) of all the
+possible boards. So when the time is up, the sums over the boards enumerated so far give an
+unbiased estimate of your chances along with its standard error, which shrinks to zero as the
+enumeration covers every board.
+
+The order is a pseudorandom permutation of the indices of the boards (a Feistel network restricted
+to the number of boards by cycle walking), so the boards don't need to be listed up front. The
+boards are enumerated in blocks by the worker processes and the blocks are collected in order, so
+the enumerated boards are always the first ones of the permutation.
+'''
+import math
+import random
+import time
+from bisect import bisect_right
+from multiprocessing.pool import Pool
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from texas_holdem.card import cards_to_mask, list_remaining_card_ints
+from texas_holdem.monte_carlo import _imap_with_bounded_queue, _normal_quantile
+from texas_holdem.my_chances import Opponent, OpponentError, _compute_weights, _is_picklable, \
+    n_choose_m, worker
+
+
+class PartialChances(NamedTuple):
+  '''Your chances computed from the boards enumerated so far, along with the standard error and
+  the confidence interval (clipped to [0, 1]) of the estimate and the fraction of the boards that
+  were enumerated. Once every board is enumerated, the chances are exact and the error is zero.
+  '''
+  chances: float
+  standard_error: float
+  confidence_interval: Tuple[float, float]
+  fraction_covered: float
+
+
+_BOARDS_PER_BLOCK = 200
+_FEISTEL_ROUNDS = 4
+
+
+def compute_by_anytime_enumeration(
+    hole_cards: Tuple[int, ...], community_cards: Tuple[int, ...],
+    against: Optional[Opponent] = None, time_budget: Optional[float] = None,
+    progress: Optional[Callable[[PartialChances], None]] = None, seed: Optional[int] = None,
+    confidence: float = 0.95, pool: Optional[Pool] = None,
+    num_processes: Optional[int] = None) -> PartialChances:
+  '''Same as `my_chances.compute_by_enumeration`, but the enumeration stops when `time_budget`
+  seconds have passed and the chances are computed from the boards enumerated until then.
+
+  `progress` is called with the chances computed so far each time a block of boards has been
+  enumerated. The `seed` determines the order of the boards.
+
+  The blocks are enumerated in the given pool (which has `num_processes` processes) or in the
+  current process if no pool is given. An `Opponent` that can't be sent to the worker processes is
+  always used in the current process.
+  '''
+  if seed is None:
+    seed = random.randrange(1 << 64)
+  num_remaining_cards = 52 - len(hole_cards) - len(community_cards)
+  num_boards = n_choose_m(num_remaining_cards, 5 - len(community_cards))
+  rng = random.Random(seed)
+  keys = tuple(rng.randrange(1 << 32) for _ in range(_FEISTEL_ROUNDS))
+  tasks = ((hole_cards, community_cards, against, keys, num_boards, start,
+      min(start + _BOARDS_PER_BLOCK, num_boards))
+      for start in range(0, num_boards, _BOARDS_PER_BLOCK))
+  results: Iterable[List[float]]
+  if pool is None or (against is not None and not _is_picklable(against)):
+    results = map(_enumerate_block, tasks)
+  else:
+    results = _imap_with_bounded_queue(pool, _enumerate_block, tasks, 2 * (num_processes or 1))
+
+  deadline = None if time_budget is None else time.monotonic() + time_budget
+  # The number of boards and the sums of a, b, a^2, a * b and b^2 over the boards, where a and b
+  # are the weighted number of all the cases and the bad cases on the board.
+  sums = [0.0] * 6
+  partial_chances = _partial_chances(sums, num_boards, confidence)
+  for block_sums in results:
+    sums = [s + bs for s, bs in zip(sums, block_sums)]
+    partial_chances = _partial_chances(sums, num_boards, confidence)
+    if progress is not None:
+      progress(partial_chances)
+    if deadline is not None and time.monotonic() >= deadline:
+      break
+  if sums[1] == 0 and sums[0] == num_boards:
+    raise OpponentError(
+        'The `hole_cards_weights` method of your `Opponent` instance returns 0 for every ' +
+        'possible hole cards the opponent can have. Change the method so at least one possible ' +
+        'hole cards receive positive weight.')
+  return partial_chances
+
+
+def _enumerate_block(task) -> List[float]:
+  'Enumerates the boards of a block and returns the sums described in the function above.'
+  hole_cards, community_cards, against, keys, num_boards, start, stop = task
+  remaining_cards = list_remaining_card_ints(cards_to_mask(hole_cards + community_cards))
+  num_missing_cards = 5 - len(community_cards)
+  binomials = [[n_choose_m(n, k) if n >= k else 0 for n in range(len(remaining_cards) + 1)]
+      for k in range(num_missing_cards + 1)]
+  sums = [0.0] * 6
+  for position in range(start, stop):
+    board_index = _permute(position, num_boards, keys)
+    board = community_cards + _unrank_combination(
+        board_index, remaining_cards, num_missing_cards, binomials)
+    result = worker(hole_cards, board, _compute_weights(hole_cards, board, against))
+    all_cases, bad_cases = result['all'], result['bad']
+    sums[0] += 1
+    sums[1] += all_cases
+    sums[2] += bad_cases
+    sums[3] += all_cases * all_cases
+    sums[4] += all_cases * bad_cases
+    sums[5] += bad_cases * bad_cases
+  return sums
+
+
+def _permute(index: int, size: int, keys: Sequence[int]) -> int:
+  '''Maps the index to its position in a pseudorandom permutation of range(size) defined by the
+  keys.
+  '''
+  half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+  half_mask = (1 << half_bits) - 1
+  while True:
+    # A Feistel network permutes the numbers of 2 * half_bits bits. Applying it again until the
+    # result is in the range permutes the range.
+    left, right = index >> half_bits, index & half_mask
+    for key in keys:
+      left, right = right, left ^ (((right + key) * 2654435761 >> 7) & half_mask)
+    index = left << half_bits | right
+    if index < size:
+      return index
+
+
+def _unrank_combination(
+    index: int, cards: Sequence[int], k: int, binomials: List[List[int]]) -> Tuple[int, ...]:
+  '''Returns the combination of k cards with the given index in the combinatorial number system,
+  where `binomials[j][n]` is n choose j.
+  '''
+  combination = []
+  for j in range(k, 0, -1):
+    # The largest n for which n choose j is at most the index.
+    n = bisect_right(binomials[j], index) - 1
+    combination.append(cards[n])
+    index -= binomials[j][n]
+  return tuple(reversed(combination))
+
+
+def _partial_chances(sums: List[float], num_boards: int, confidence: float) -> PartialChances:
+  'Computes the chances and the standard error of the ratio estimate from the sums.'
+  count, sum_a, sum_b, sum_aa, sum_ab, sum_bb = sums
+  fraction_covered = count / num_boards
+  if sum_a > 0 and count == num_boards:
+    chances = 1 - sum_b / sum_a
+    return PartialChances(chances, 0.0, (chances, chances), 1.0)
+  if sum_a == 0 or count < 2:
+    return PartialChances(math.nan, math.inf, (0.0, 1.0), fraction_covered)
+  ratio = sum_b / sum_a
+  chances = 1 - ratio
+  # The variance of the ratio estimate is approximated using the delta method, with the finite
+  # population correction as the boards are sampled without replacement.
+  residual_sum_of_squares = sum_bb - 2 * ratio * sum_ab + ratio * ratio * sum_aa
+  mean_a = sum_a / count
+  variance = (1 - fraction_covered) * residual_sum_of_squares / (count - 1) / count / mean_a ** 2
+  standard_error = math.sqrt(max(variance, 0.0))
+  half_width = _normal_quantile((1 + confidence) / 2) * standard_error
+  return PartialChances(
+      chances=chances,
+      standard_error=standard_error,
+      confidence_interval=(max(0.0, chances - half_width), min(1.0, chances + half_width)),
+      fraction_covered=fraction_covered)
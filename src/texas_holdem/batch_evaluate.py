@@ -0,0 +1,130 @@
+'''Evaluates lots of hands at once using NumPy.
+
+Instead of evaluating the hands one by one, the cards of all the hands are stored in a single array
+and each step of the evaluation (counting the cards of each rank and suit, finding the flushes and
+the straights, picking the kickers) is done for every hand with a few array operations.
+
+This module requires NumPy, which can be installed along with the package::
+
+    pip install texas_holdem[numpy]
+
+Usage
+-----
+
+    >>> import numpy as np
+    >>> from texas_holdem.batch_evaluate import evaluate_batch
+    >>> cards = np.random.default_rng().permuted(np.tile(np.arange(52), (1000000, 1)), axis=1)
+    >>> strengths = evaluate_batch(cards[:, :7])
+
+The hands can also be evaluated with the `numpy` engine of `evaluate_hand`, e.g.
+`evaluate_hand.set_default_engine('numpy')` makes `my_chances.compute` evaluate all the possible
+hole cards of the opponent on a board in a single call.
+'''
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from texas_holdem.evaluate_hand import HandRank, _highest_ranks, _highest_straight
+
+
+_RANK_BITS = 1 << np.arange(13, dtype=np.int64)
+_NUM_RANK_MASKS = 1 << 13
+
+
+def _build_rank_mask_tables():
+  '''Builds the tables keyed by the 13-bit masks of ranks:
+    - the index of the highest rank in the mask (-1 for the empty mask),
+    - the highest rank of the highest straight in the mask (0 if there is none) and
+    - for each n, the n highest ranks in the mask packed the same way as the tie breaker card ranks
+      in `HandValue.strength`, starting from the first tie breaker card rank.
+  '''
+  highest = np.array([m.bit_length() - 1 for m in range(_NUM_RANK_MASKS)], dtype=np.int64)
+  straight = np.array(
+      [_highest_straight(m) or 0 for m in range(_NUM_RANK_MASKS)], dtype=np.int64)
+  top_ranks = np.zeros((6, _NUM_RANK_MASKS), dtype=np.int64)
+  for m in range(_NUM_RANK_MASKS):
+    for i, rank in enumerate(_highest_ranks(m, 5)):
+      top_ranks[i + 1:, m] |= int(rank) << (16 - 4 * i)
+  return highest, straight, top_ranks
+
+
+_HIGHEST, _STRAIGHT, _TOP_RANKS = _build_rank_mask_tables()
+
+
+def evaluate_batch(cards) -> np.ndarray:
+  '''Evaluates the hands given as an (N, 7) array of the integer encoding of the cards (see
+  `card.card_to_int`) and returns the (N,) array of their strengths (see `HandValue.strength`).
+  '''
+  cards = np.asarray(cards, dtype=np.int64)
+  if cards.ndim != 2:
+    raise ValueError(f'Expected an (N, 7) array of cards, got an array of shape {cards.shape}.')
+  num_hands = cards.shape[0]
+  suits, ranks = np.divmod(cards, 13)
+  hand_indices = np.arange(num_hands, dtype=np.int64)[:, None]
+  rank_counts = np.bincount(
+      (13 * hand_indices + ranks).ravel(), minlength=13 * num_hands).reshape(num_hands, 13)
+  suit_counts = np.bincount(
+      (4 * hand_indices + suits).ravel(), minlength=4 * num_hands).reshape(num_hands, 4)
+
+  rank_bits = _RANK_BITS[ranks]
+  rank_mask = np.bitwise_or.reduce(rank_bits, axis=1)
+  flush_suit = suit_counts.argmax(axis=1)
+  flush_mask = np.bitwise_or.reduce(np.where(suits == flush_suit[:, None], rank_bits, 0), axis=1)
+  flush_mask = np.where(suit_counts.max(axis=1) >= 5, flush_mask, 0)
+  quads_mask = (rank_counts == 4) @ _RANK_BITS
+  triplets_mask = (rank_counts == 3) @ _RANK_BITS
+  pairs_mask = (rank_counts == 2) @ _RANK_BITS
+
+  quad, quad_bit = _highest_rank(quads_mask)
+  triplet, triplet_bit = _highest_rank(triplets_mask)
+  # The pair of a full house can come from a second triplet too.
+  full_house_pair, _ = _highest_rank((triplets_mask & ~triplet_bit) | pairs_mask)
+  pair, pair_bit = _highest_rank(pairs_mask)
+  second_pair, second_pair_bit = _highest_rank(pairs_mask & ~pair_bit)
+  straight_flush = _STRAIGHT[flush_mask]
+  straight = _STRAIGHT[rank_mask]
+
+  def strength(hand_rank: HandRank, *tie_breakers):
+    packed = np.int64(int(hand_rank) << 20)
+    for i, tie_breaker in enumerate(tie_breakers):
+      packed = packed | (tie_breaker << (16 - 4 * i))
+    return packed
+
+  def kickers(n: int, mask, num_preceding: int):
+    return _TOP_RANKS[n][mask] >> (4 * num_preceding)
+
+  # The hand ranks are checked from the highest one, the first matching condition is chosen.
+  conditions_and_strengths: Sequence[Tuple[np.ndarray, np.ndarray]] = [
+      (straight_flush == 14, strength(HandRank.ROYAL_FLUSH)),
+      (straight_flush > 0, strength(HandRank.STRAIGHT_FLUSH, straight_flush)),
+      (quad >= 0, strength(HandRank.FOUR_OF_A_KIND, quad + 2)
+          | kickers(1, rank_mask & ~quad_bit, 1)),
+      ((triplet >= 0) & (full_house_pair >= 0),
+          strength(HandRank.FULL_HOUSE, triplet + 2, full_house_pair + 2)),
+      (flush_mask > 0, strength(HandRank.FLUSH) | kickers(5, flush_mask, 0)),
+      (straight > 0, strength(HandRank.STRAIGHT, straight)),
+      (triplet >= 0, strength(HandRank.THREE_OF_A_KIND, triplet + 2)
+          | kickers(2, rank_mask & ~triplet_bit, 1)),
+      (second_pair >= 0, strength(HandRank.TWO_PAIRS, pair + 2, second_pair + 2)
+          | kickers(1, rank_mask & ~pair_bit & ~second_pair_bit, 2)),
+      (pair >= 0, strength(HandRank.ONE_PAIR, pair + 2) | kickers(3, rank_mask & ~pair_bit, 1)),
+  ]
+  return np.select(
+      [condition for condition, _ in conditions_and_strengths],
+      [np.broadcast_to(s, (num_hands,)) for _, s in conditions_and_strengths],
+      default=strength(HandRank.HIGH_CARD) | kickers(5, rank_mask, 0))
+
+
+def _highest_rank(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+  'Returns the index of the highest rank in each mask (or -1) and the bit of that rank (or 0).'
+  rank = _HIGHEST[mask]
+  return rank, np.where(rank >= 0, _RANK_BITS[np.maximum(rank, 0)], 0)
+
+
+def evaluate_hole_cards_batch(board: Sequence[int], hole_cards_list) -> np.ndarray:
+  '''Evaluates the hands that can be formed from the board and each of the hole cards, given as an
+  (N, 2) array (or a sequence of pairs) of the integer encoding of the cards.
+  '''
+  hole_cards = np.asarray(hole_cards_list, dtype=np.int64).reshape(-1, 2)
+  boards = np.broadcast_to(np.asarray(board, dtype=np.int64), (hole_cards.shape[0], len(board)))
+  return evaluate_batch(np.concatenate([hole_cards, boards], axis=1))
@@ -0,0 +1,265 @@
+'''Measures the speed of hand evaluation, hand comparison and chance computation.
+
+Each benchmark calls a function on the same pseudorandom deals (the seed is fixed) until at least
+`--min_time` seconds have passed, and repeats that `--repeat` times. The fastest repetition gives
+the rate (e.g. hands per second), as the slower ones were slowed down by other processes. The
+results are written as JSON along with the commit, the Python version and the machine they were
+measured on, so the results of two commits can be compared::
+
+    python -m texas_holdem.benchmark run --output before.json
+    git checkout other-commit
+    python -m texas_holdem.benchmark run --output after.json
+    python -m texas_holdem.benchmark compare before.json after.json
+
+`make benchmark` runs the benchmarks and writes the results to `benchmark.json`. Computing the
+chances before the flop with an opponent enumerates every board, which takes minutes, so it is only
+measured with `--slow`.
+'''
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from texas_holdem.card import Board, Card, HoleCards, int_to_card, parse
+from texas_holdem.compare_hands import has_better_hand_than_hand_value
+from texas_holdem.engine import EquityEngine
+from texas_holdem.evaluate_hand import ENGINES, HandValue, get_evaluator, get_hand_value
+from texas_holdem.find_better_hole_cards import find_better_hole_cards
+from texas_holdem.hand_range import HandRange
+from texas_holdem.my_chances import Opponent
+
+
+_SEED = 0
+_NUM_DEALS = 1000
+_HOLE_CARDS = [parse(c) for c in ('S2', 'DA')]
+_COMMUNITY_CARDS = {
+    street: [parse(c) for c in ('H2', 'D3', 'S5', 'C9', 'CA')[:num_cards]]
+    for street, num_cards in (('preflop', 0), ('flop', 3), ('turn', 4), ('river', 5))}
+_RANGE = 'TT+, AJs+, KQo, 76s'
+
+
+class BenchmarkResult(NamedTuple):
+  '''The rate is the number of `unit`s (e.g. hands) processed per second in the fastest of the
+  repetitions, each of which calls the benchmarked function `number` times.
+  '''
+  name: str
+  unit: str
+  rate: float
+  best_seconds: float
+  median_seconds: float
+  number: int
+  repeat: int
+
+
+class _Benchmark(NamedTuple):
+  name: str
+  unit: str
+  # The number of units processed by a call.
+  units_per_call: int
+  call: Callable[[], Any]
+  slow: bool = False
+
+
+class _NoAces(Opponent):
+  '''An opponent who folds every ace, only used by the benchmarks of the `hole_cards_weight`
+  callback. Defined at the module level so that it can be sent to the worker processes.
+  '''
+  def hole_cards_weight(self, opponents_hole_cards, board):
+    return 0 if any(c.rank.value == 14 for c in opponents_hole_cards) else 1
+
+
+def run(
+    names: Optional[Sequence[str]] = None, slow: bool = False, processes: Optional[int] = None,
+    min_time: float = 0.2, repeat: int = 5,
+    progress: Optional[Callable[[BenchmarkResult], None]] = None) -> Dict[str, Any]:
+  '''Runs the benchmarks whose names contain any of the `names` (or every benchmark) and returns
+  the results along with the environment they were measured in.
+
+  The chances are computed by an engine with `processes` worker processes (by default the number
+  of CPUs) which is started before the measurements.
+  '''
+  results = []
+  with EquityEngine(processes) as engine:
+    engine.start()
+    for benchmark in _list_benchmarks(engine):
+      if benchmark.slow and not slow:
+        continue
+      if names and not any(name in benchmark.name for name in names):
+        continue
+      result = _measure(benchmark, min_time, repeat)
+      results.append(result._asdict())
+      if progress is not None:
+        progress(result)
+  return {
+      'metadata': _describe_environment(processes, min_time, repeat),
+      'results': results,
+  }
+
+
+def compare(
+    baseline: Dict[str, Any], results: Dict[str, Any],
+    tolerance: float = 0.1) -> List[Tuple[str, float, float, bool]]:
+  '''Compares the rates of the benchmarks found in both results. Returns the name, the rate in the
+  baseline, the rate in the results and whether it is slower by more than the `tolerance` (as a
+  fraction of the baseline rate) for each of them.
+  '''
+  baseline_rates = {r['name']: r['rate'] for r in baseline['results']}
+  return [
+      (r['name'], baseline_rates[r['name']], r['rate'],
+       r['rate'] < (1 - tolerance) * baseline_rates[r['name']])
+      for r in results['results'] if r['name'] in baseline_rates]
+
+
+def _list_benchmarks(engine: EquityEngine) -> Iterator[_Benchmark]:
+  deals = _deal(_NUM_DEALS)
+  for evaluation_engine in ENGINES:
+    try:
+      get_evaluator(evaluation_engine)
+    except ImportError:
+      continue
+    yield _Benchmark(
+        f'get_hand_value[{evaluation_engine}]', 'hands/s', len(deals),
+        partial(_get_hand_values, deals, evaluation_engine))
+
+  compare_to = get_hand_value(*deals[0])
+  yield _Benchmark(
+      'has_better_hand_than_hand_value', 'hands/s', len(deals),
+      lambda: [has_better_hand_than_hand_value(hole_cards, board, compare_to)
+               for hole_cards, board in deals])
+
+  yield _Benchmark(
+      'find_better_hole_cards', 'boards/s', len(deals[:100]),
+      lambda: [find_better_hole_cards(hole_cards, board) for hole_cards, board in deals[:100]])
+
+  opponents: List[Tuple[str, Optional[Opponent]]] = [
+      ('none', None), ('opponent', _NoAces()), ('range', HandRange.parse(_RANGE))]
+  for street, community_cards in _COMMUNITY_CARDS.items():
+    for opponent_name, opponent in opponents:
+      yield _Benchmark(
+          f'compute[{street},{opponent_name}]', 'computations/s', 1,
+          partial(engine.compute, _HOLE_CARDS, community_cards, opponent),
+          slow=street == 'preflop' and opponent is not None)
+
+
+def _get_hand_values(deals: List[Tuple[HoleCards, Board]], engine: str) -> List[HandValue]:
+  return [get_hand_value(hole_cards, board, engine=engine) for hole_cards, board in deals]
+
+
+def _deal(n: int) -> List[Tuple[HoleCards, Board]]:
+  'Deals the hole cards and the board of n hands pseudorandomly, the same ones on every run.'
+  rng = random.Random(_SEED)
+  deals = []
+  for _ in range(n):
+    cards: List[Card] = [int_to_card(c) for c in rng.sample(range(52), 7)]
+    deals.append((HoleCards(*cards[:2]), Board(*cards[2:])))
+  return deals
+
+
+def _measure(benchmark: _Benchmark, min_time: float, repeat: int) -> BenchmarkResult:
+  '''Calls the benchmark as many times as needed to take at least `min_time` seconds (doubling the
+  number of calls like `timeit.Timer.autorange`), then repeats that many calls.
+  '''
+  number = 1
+  while True:
+    seconds = _time(benchmark.call, number)
+    if seconds >= min_time:
+      break
+    number *= 2
+  times = [seconds] + [_time(benchmark.call, number) for _ in range(repeat - 1)]
+  best_seconds = min(times)
+  return BenchmarkResult(
+      name=benchmark.name,
+      unit=benchmark.unit,
+      rate=number * benchmark.units_per_call / best_seconds,
+      best_seconds=best_seconds,
+      median_seconds=statistics.median(times),
+      number=number,
+      repeat=repeat)
+
+
+def _time(call: Callable[[], Any], number: int) -> float:
+  start = time.perf_counter()
+  for _ in range(number):
+    call()
+  return time.perf_counter() - start
+
+
+def _describe_environment(processes: Optional[int], min_time: float, repeat: int) -> Dict[str, Any]:
+  try:
+    commit: Optional[str] = subprocess.run(
+        ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(__file__), stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, universal_newlines=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    commit = None
+  return {
+      'commit': commit,
+      'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+      'python': platform.python_version(),
+      'implementation': platform.python_implementation(),
+      'platform': platform.platform(),
+      'machine': platform.machine(),
+      'processor': platform.processor(),
+      'cpu_count': os.cpu_count(),
+      'processes': processes or os.cpu_count(),
+      'min_time': min_time,
+      'repeat': repeat,
+      'seed': _SEED,
+  }
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+  subparsers = parser.add_subparsers(dest='command')
+  run_parser = subparsers.add_parser('run', help='Runs the benchmarks.')
+  run_parser.add_argument(
+      'names', nargs='*', help='Only runs the benchmarks whose names contain any of these.')
+  run_parser.add_argument('--output', help='Writes the results to this file (by default stdout).')
+  run_parser.add_argument(
+      '--slow', action='store_true', help='Also runs the benchmarks taking minutes.')
+  run_parser.add_argument('--processes', type=int, default=None)
+  run_parser.add_argument('--min_time', type=float, default=0.2)
+  run_parser.add_argument('--repeat', type=int, default=5)
+  compare_parser = subparsers.add_parser(
+      'compare', help='Compares the results of two runs. Fails if a benchmark got slower.')
+  compare_parser.add_argument('baseline')
+  compare_parser.add_argument('results')
+  compare_parser.add_argument(
+      '--tolerance', type=float, default=0.1,
+      help='The fraction by which a rate can drop without failing (by default 0.1).')
+  parsed_args = parser.parse_args(args)
+
+  if parsed_args.command == 'run':
+    results = run(
+        parsed_args.names, parsed_args.slow, parsed_args.processes, parsed_args.min_time,
+        parsed_args.repeat,
+        progress=lambda r: print(f'{r.name:40} {r.rate:14.1f} {r.unit}', file=sys.stderr))
+    if parsed_args.output:
+      with open(parsed_args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    else:
+      json.dump(results, sys.stdout, indent=2)
+    return 0
+  if parsed_args.command == 'compare':
+    with open(parsed_args.baseline) as f:
+      baseline = json.load(f)
+    with open(parsed_args.results) as f:
+      results = json.load(f)
+    comparisons = compare(baseline, results, parsed_args.tolerance)
+    for name, baseline_rate, rate, regressed in comparisons:
+      print(f'{name:40} {baseline_rate:14.1f} {rate:14.1f} {rate / baseline_rate - 1:+8.1%}' +
+            (' slower' if regressed else ''))
+    return 1 if any(regressed for *_, regressed in comparisons) else 0
+  parser.print_help()
+  return 1
+
+
+if __name__ == '__main__':
+  sys.exit(main())
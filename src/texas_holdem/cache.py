@@ -0,0 +1,138 @@
+'''Caches the results of `my_chances.compute` so that asking for the chances in the same situation
+again doesn't require enumerating all the cases again.
+
+The cache has two levels: an in-process LRU cache with a bounded size and an optional persistent
+store (an sqlite database) shared between processes and runs.
+
+Situations that only differ in the suits of the cards (e.g. (SA, SK) with no community cards and
+(HA, HK) with no community cards) are stored under the same key (see `situation_key`).
+
+Usage
+-----
+
+    >>> from texas_holdem.cache import ResultCache
+    >>> cache = ResultCache(maxsize=10000, path='chances.sqlite')
+    >>> compute_my_chances(hole_cards=[S2, DA], community_cards=[H2, D3, S5, C9], cache=cache)
+'''
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, NamedTuple, Optional, Sequence
+
+from texas_holdem.card import cards_to_mask
+from texas_holdem.suit_isomorphism import canonical_masks
+
+if TYPE_CHECKING:
+  import sqlite3
+
+
+def situation_key(
+    hole_cards: Sequence[int], community_cards: Sequence[int], against=None,
+    num_opponents: int = 1) -> Optional[str]:
+  '''Returns the key under which the chances in the situation are cached or None if they can't be
+  cached.
+
+  The chances computed using assumptions about the opponent can only be cached if the `Opponent`
+  has a `cache_key`: the results with different `Opponent`s are only considered to be the same if
+  their cache keys are equal.
+
+  The chances against more than one opponent (see `multiway`) get different keys from those
+  against one opponent.
+  '''
+  if against is None:
+    opponent_key = ''
+  elif against.cache_key is None:
+    return None
+  else:
+    opponent_key = str(against.cache_key)
+  if against is None or against.suit_symmetric:
+    hole_cards_mask, community_cards_mask = canonical_masks([hole_cards, community_cards])
+  else:
+    hole_cards_mask = cards_to_mask(hole_cards)
+    community_cards_mask = cards_to_mask(community_cards)
+  key = f'{hole_cards_mask:x}:{community_cards_mask:x}:{opponent_key}'
+  return key if num_opponents == 1 else f'{key}:{num_opponents}'
+
+
+class CacheStats(NamedTuple):
+  hits: int
+  misses: int
+  evictions: int
+  memory_hits: int
+  persistent_hits: int
+  size: int
+
+
+class ResultCache:
+  '''A cache of chances with an in-process LRU level holding at most `maxsize` results and an
+  optional persistent level stored in the sqlite database at `path`.
+
+  Results found only in the persistent store are also put into the in-process level.
+  '''
+  def __init__(self, maxsize: int = 100000, path: Optional[str] = None):
+    self.maxsize = maxsize
+    self._memory: 'OrderedDict[str, float]' = OrderedDict()
+    self._lock = threading.Lock()
+    self._db: Optional['sqlite3.Connection'] = None
+    if path is not None:
+      # Only imported when needed, so processes without a persistent cache start faster.
+      import sqlite3
+      self._db = sqlite3.connect(path, check_same_thread=False)
+      with self._db:
+        self._db.execute('CREATE TABLE IF NOT EXISTS chances (key TEXT PRIMARY KEY, value REAL)')
+    self._memory_hits = 0
+    self._persistent_hits = 0
+    self._misses = 0
+    self._evictions = 0
+
+  def get(self, key: str) -> Optional[float]:
+    with self._lock:
+      value = self._memory.get(key)
+      if value is not None:
+        self._memory.move_to_end(key)
+        self._memory_hits += 1
+        return value
+      if self._db is not None:
+        row = self._db.execute('SELECT value FROM chances WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+          self._persistent_hits += 1
+          self._put_in_memory(key, row[0])
+          return row[0]
+      self._misses += 1
+      return None
+
+  def put(self, key: str, value: float):
+    with self._lock:
+      self._put_in_memory(key, value)
+      if self._db is not None:
+        with self._db:
+          self._db.execute('INSERT OR REPLACE INTO chances VALUES (?, ?)', (key, value))
+
+  def _put_in_memory(self, key: str, value: float):
+    self._memory[key] = value
+    self._memory.move_to_end(key)
+    while len(self._memory) > self.maxsize:
+      self._memory.popitem(last=False)
+      self._evictions += 1
+
+  @property
+  def stats(self) -> CacheStats:
+    return CacheStats(
+        hits=self._memory_hits + self._persistent_hits,
+        misses=self._misses,
+        evictions=self._evictions,
+        memory_hits=self._memory_hits,
+        persistent_hits=self._persistent_hits,
+        size=len(self._memory))
+
+  def clear(self):
+    'Removes every result from both levels.'
+    with self._lock:
+      self._memory.clear()
+      if self._db is not None:
+        with self._db:
+          self._db.execute('DELETE FROM chances')
+
+  def close(self):
+    if self._db is not None:
+      self._db.close()
+      self._db = None
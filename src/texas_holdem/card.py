@@ -1,4 +1,4 @@
-from typing import NamedTuple
+from typing import Iterable, List, NamedTuple
 from enum import Enum, IntEnum
 
 
@@ -66,7 +66,40 @@ def list_all_cards():
 
 
 def list_remaining_cards(cards_seen):
-  return [card for card in list_all_cards() if card not in cards_seen]
+  cards_seen = set(cards_seen)
+  return [card for card in _ALL_CARDS if card not in cards_seen]
+
+
+# The engine doesn't work with `Card` instances directly but with their integer encoding: each card
+# is represented by its position in `list_all_cards`, i.e. 13 * <index of its suit in `Suit`> +
+# <its rank's value - 2>. A set of cards is represented by a bitmask where the bit of each card's
+# integer is set.
+# The public functions convert between the two representations at the API boundary.
+_ALL_CARDS = tuple(list_all_cards())
+_CARD_INTS = {card: i for i, card in enumerate(_ALL_CARDS)}
+
+
+def card_to_int(card: Card) -> int:
+  'Returns the integer encoding of the card used internally by the engine.'
+  return _CARD_INTS[card]
+
+
+def int_to_card(card_int: int) -> Card:
+  'The inverse of `card_to_int`.'
+  return _ALL_CARDS[card_int]
+
+
+def cards_to_mask(card_ints: Iterable[int]) -> int:
+  'Returns the bitmask representing the set of the (integer encoded) cards.'
+  mask = 0
+  for c in card_ints:
+    mask |= 1 << c
+  return mask
+
+
+def list_remaining_card_ints(mask_of_cards_seen: int) -> List[int]:
+  'Same as `list_remaining_cards` but works with the integer encoding of the cards.'
+  return [c for c in range(len(_ALL_CARDS)) if not mask_of_cards_seen >> c & 1]
 
 
 class HoleCards(NamedTuple):
@@ -75,6 +108,8 @@ class HoleCards(NamedTuple):
   c2: Card
 
   def __eq__(self, other):
+    if isinstance(other, HoleCards):
+      return tuple.__eq__(self, other) or (self.c1 == other.c2 and self.c2 == other.c1)
     return set(self) == set(other)
 
   def __str__(self):
@@ -82,7 +117,7 @@ class HoleCards(NamedTuple):
     return f'HoleCards({c1},{c2})'
 
   def __hash__(self):
-    return hash(str(self))
+    return (1 << card_to_int(self.c1)) | (1 << card_to_int(self.c2))
 
 
 class Board(NamedTuple):
@@ -1,19 +1,53 @@
-"""Console script for texas_holdem."""
+"""Console script for texas_holdem.
+
+Besides answering a single query given by `--hc` and `--cc`, it can answer a batch of queries read
+from a file or the standard input (`--batch`). The queries are either JSON lines, e.g.
+
+    {"id": "q1", "hc": ["S2", "DA"], "cc": ["H2", "D3", "S5"]}
+    {"id": "q2", "hc": "SK SQ", "cc": "", "range": "TT+, AJs+"}
+
+or CSV with a header row naming the same columns:
+
+    id,hc,cc,range
+    q1,S2 DA,H2 D3 S5,
+    q2,SK SQ,,"TT+, AJs+"
+
+where `range` is the optional range of the opponent (see `hand_range`) and `id` is optional too
+(the index of the query is used by default). The results are written to the standard output in
+the same format as soon as they are ready, in the order of the queries unless `--unordered` is
+given. Each result is tagged by the id of its query and contains either the chances or the error
+that prevented computing them.
+
+The whole batch is computed by a single `engine.EquityEngine`, so its pool of worker processes is
+started once. A few queries are computed at the same time (see `--jobs`) while the boards of each
+query are also split between the processes.
+"""
 import argparse
+import csv
+import json
+import os
 import sys
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, \
+    TextIO, Tuple
 
-from texas_holdem.card import parse
+from texas_holdem.card import Card, parse
+from texas_holdem.engine import EquityEngine
 from texas_holdem.my_chances import compute
 
+# Only needed by the batch mode, so they are imported there to start the CLI faster.
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from texas_holdem.hand_range import HandRange
 
-def main():
+
+def main(argv: Optional[List[str]] = None):
     """Console script for texas_holdem."""
     parser = argparse.ArgumentParser()
     parser.add_argument(
       '--hole_cards',
       '--hc',
       nargs=2,
-      required=True,
       type=parse)
     parser.add_argument(
       '--community_cards',
@@ -21,12 +55,161 @@ def main():
       nargs='*',
       default=[],
       type=parse)
+    parser.add_argument(
+      '--batch',
+      nargs='?',
+      const='-',
+      metavar='FILE',
+      help='Answers the queries read from the file (or the standard input if it is not given).')
+    parser.add_argument(
+      '--format',
+      choices=('jsonl', 'csv'),
+      help='The format of the queries and the results in batch mode. By default it is csv for ' +
+        'files with the .csv extension and jsonl otherwise.')
+    parser.add_argument(
+      '--unordered',
+      action='store_true',
+      help='Writes the results of the batch as soon as they are ready instead of in input order.')
+    parser.add_argument(
+      '--processes',
+      type=int,
+      help='The number of worker processes (by default the number of CPUs).')
+    parser.add_argument(
+      '--jobs',
+      type=int,
+      help='The number of queries of the batch computed at the same time (by default twice the ' +
+        'number of worker processes).')
+
+    args = parser.parse_args(argv)
+    if args.batch is None:
+        if args.hole_cards is None:
+            parser.error('the following arguments are required: --hole_cards/--hc')
+        my_chances = compute(args.hole_cards, args.community_cards)
+        print(my_chances)
+        return 0
+
+    format_ = args.format or ('csv' if args.batch.endswith('.csv') else 'jsonl')
+    if args.batch == '-':
+        num_failed = run_batch(
+            sys.stdin, sys.stdout, format_, not args.unordered, args.processes, args.jobs)
+    else:
+        with open(args.batch, newline='') as queries:
+            num_failed = run_batch(
+                queries, sys.stdout, format_, not args.unordered, args.processes, args.jobs)
+    return 1 if num_failed else 0
+
+
+def run_batch(
+        lines: Iterable[str], output: TextIO, format_: str = 'jsonl', ordered: bool = True,
+        processes: Optional[int] = None, jobs: Optional[int] = None) -> int:
+    """Answers the queries read from the lines (see the module documentation) and writes the
+    results to `output`. Returns the number of queries that could not be answered.
+
+    At most `jobs` queries are read ahead of the results written, so arbitrarily long inputs can be
+    streamed through.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    jobs = jobs or 2 * (processes or os.cpu_count() or 1)
+    write_result = _result_writer(output, format_)
+    num_failed = 0
+
+    def write(future: 'Future'):
+        nonlocal num_failed
+        result = future.result()
+        num_failed += 'error' in result
+        write_result(result)
+
+    with EquityEngine(processes) as engine, ThreadPoolExecutor(jobs) as executor:
+        pending_in_order: Deque['Future'] = deque()
+        pending: Set['Future'] = set()
+        for index, query in enumerate(_read_queries(lines, format_)):
+            future = executor.submit(_answer, engine, index, query)
+            if ordered:
+                pending_in_order.append(future)
+                if len(pending_in_order) >= jobs:
+                    write(pending_in_order.popleft())
+            else:
+                pending.add(future)
+                if len(pending) >= jobs:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write(future)
+        for future in pending_in_order:
+            write(future)
+        for future in pending:
+            write(future)
+    return num_failed
+
+
+def _read_queries(lines: Iterable[str], format_: str) -> Iterator[Any]:
+    """Lists the queries as dicts (or the exception raised when reading them)."""
+    if format_ == 'csv':
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def _answer(engine: EquityEngine, index: int, query: Any) -> Dict[str, Any]:
+    """Computes the chances for the query and returns its result."""
+    query_id = query.get('id', index) if isinstance(query, dict) else index
+    try:
+        if isinstance(query, Exception):
+            raise query
+        hole_cards, community_cards, against = _parse_query(query)
+        return {'id': query_id, 'chances': engine.compute(hole_cards, community_cards, against)}
+    except Exception as e:
+        return {'id': query_id, 'error': str(e) or type(e).__name__}
+
+
+def _parse_query(query: Any) -> Tuple[List[Card], List[Card], Optional['HandRange']]:
+    from texas_holdem.hand_range import HandRange
+
+    if not isinstance(query, dict):
+        raise ValueError(f'A query should be an object. Got: {query}')
+    hole_cards = _parse_cards(query.get('hc', query.get('hole_cards')))
+    community_cards = _parse_cards(query.get('cc', query.get('community_cards')) or [])
+    if len(set(hole_cards + community_cards)) < len(hole_cards + community_cards):
+        raise ValueError('The same card is listed multiple times in the query.')
+    range_notation = query.get('range')
+    return hole_cards, community_cards, HandRange.parse(range_notation) if range_notation else None
+
+
+def _parse_cards(cards: Any) -> List[Card]:
+    """Parses the cards given either as a list or as a string separated by spaces or commas."""
+    if cards is None:
+        raise ValueError('The hole cards of the query are missing.')
+    if isinstance(cards, str):
+        cards = cards.replace(',', ' ').split()
+    parsed_cards = []
+    for c in cards:
+        try:
+            parsed_cards.append(parse(c))
+        except (IndexError, KeyError, StopIteration, TypeError):
+            raise ValueError(f'Invalid card: {c}') from None
+    return parsed_cards
+
+
+def _result_writer(output: TextIO, format_: str):
+    if format_ == 'csv':
+        writer = csv.DictWriter(output, ['id', 'chances', 'error'], lineterminator='\n')
+        writer.writeheader()
 
-    args = parser.parse_args()
+        def write_csv(result: Dict[str, Any]):
+            writer.writerow(result)
+            output.flush()
+        return write_csv
 
-    my_chances = compute(args.hole_cards, args.community_cards)
-    print(my_chances)
-    return 0
+    def write_json(result: Dict[str, Any]):
+        output.write(json.dumps(result) + '\n')
+        output.flush()
+    return write_json
 
 
 if __name__ == "__main__":
@@ -0,0 +1,441 @@
+'''A long-lived session for computing your chances.
+
+`my_chances.compute` creates a new pool of worker processes for each computation and tears it
+down afterwards, which can take longer than the computation itself once the turn or the river has
+been dealt. `EquityEngine` keeps its pool (and the tables used by the workers) warm between
+computations.
+
+Usage
+-----
+
+    >>> from texas_holdem.engine import EquityEngine
+    >>> with EquityEngine() as engine:
+    ...   engine.compute(hole_cards=[S2, DA], community_cards=[H2, D3, S5, C9])
+    ...   engine.compute_batch([([S2, DA], [H2, D3, S5, C9, CA]), ([SK, SQ], [])])
+    ...   engine.estimate(hole_cards=[S2, DA], community_cards=[H2, D3, S5], target_error=0.005)
+    ...   engine.compute_anytime(
+    ...       hole_cards=[S2, DA], community_cards=[H2, D3, S5], against=Cautious(), time_budget=1)
+    ...   engine.compute_multiway(
+    ...       hole_cards=[S2, DA], community_cards=[H2, D3, S5], num_opponents=3)
+    ...   engine.compute_range_vs_range(
+    ...       HandRange.parse('TT+, AQs+'), HandRange.parse('88+, ATs+, KQs'), [H2, D3, S5])
+
+The chances can also be awaited from a coroutine, without blocking the event loop:
+
+    >>> async def act(engine):
+    ...   chances = await engine.compute_async(hole_cards=[S2, DA], community_cards=[H2, D3, S5])
+'''
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, \
+    Sequence, Tuple
+
+from texas_holdem import preflop_table
+from texas_holdem.cache import ResultCache, situation_key
+from texas_holdem.card import Card, card_to_int
+from texas_holdem.evaluate_hand import get_evaluator
+from texas_holdem.instrumentation import ComputationStats, measure
+from texas_holdem.multiway import MAX_EXACT_OPPONENTS
+from texas_holdem.my_chances import Opponent, _init_worker, check_cards, compute_by_enumeration, \
+    count_cases_per_board
+
+# The modules only needed by some of the methods are imported by them, so that short-lived
+# processes computing a single situation start faster.
+if TYPE_CHECKING:
+  import asyncio
+  from concurrent.futures import ThreadPoolExecutor
+  from multiprocessing.pool import Pool
+  from texas_holdem.anytime import PartialChances
+  from texas_holdem.hand_range import HandRange
+  from texas_holdem.monte_carlo import Estimate
+  from texas_holdem.range_equity import RangeEquity
+
+
+# The number of computations started by `compute_async` that can be cancelled at the same time.
+# Further computations can't be stopped in the worker processes once they are started.
+_MAX_CANCELLABLE_COMPUTATIONS = 64
+
+# Marks the end of the results of `EquityEngine.map_unordered`.
+_NO_RESULT = object()
+
+
+class EquityEngine:
+  '''Computes your chances (see `my_chances.compute`) using a pool of `processes` worker
+  processes that is reused between computations. By default, as many processes are used as the
+  number of CPUs.
+
+  The pool is only started when the first computation needs it. It's stopped by `close`, which is
+  also called when the engine is used as a context manager.
+
+  If a `cache` is given then the results are looked up from it or stored in it after computing
+  them.
+
+  The `*_async` methods run the computations in threads of the engine, so they can be awaited.
+
+  If a `stats_hook` is given, then it's called with the statistics of each computation of
+  `compute` (and of the methods built on it) once it's done (see `instrumentation`).
+  '''
+  def __init__(
+      self, processes: Optional[int] = None, cache: Optional[ResultCache] = None,
+      stats_hook: Optional[Callable[[ComputationStats], None]] = None):
+    self.processes = processes
+    self.cache = cache
+    self.stats_hook = stats_hook
+    self._pool: Optional['Pool'] = None
+    # The engine can be shared by threads (e.g. to compute several situations at the same time),
+    # which must not start separate pools or use the same cancellation flag.
+    self._lock = threading.Lock()
+    self._closed = False
+    self._executor: Optional['ThreadPoolExecutor'] = None
+    # A flag for each cancellable computation, shared with the worker processes (see
+    # `my_chances.compute_by_enumeration`). They are created along with the pool or the first
+    # cancellable computation (see `_get_cancel_flags`).
+    self._cancel_flags: Any = None
+    self._free_cancel_indices = list(range(_MAX_CANCELLABLE_COMPUTATIONS))
+
+  def compute(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card],
+      against: Optional[Opponent] = None, stats: Optional[ComputationStats] = None) -> float:
+    '''Same as `my_chances.compute`. If `stats` are given then the statistics of the computation
+    are added to them.
+    '''
+    return self._compute(hole_cards, community_cards, against, stats=stats)
+
+  def _compute(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card],
+      against: Optional[Opponent] = None, cancel_index: Optional[int] = None,
+      stats: Optional[ComputationStats] = None) -> float:
+    if stats is None and self.stats_hook is not None:
+      stats = ComputationStats()
+    with measure(stats, 'total'):
+      chances = self._compute_measured(
+          hole_cards, community_cards, against, cancel_index, stats)
+    if stats is not None:
+      stats.record_peak_memory()
+      if self.stats_hook is not None:
+        self.stats_hook(stats)
+    return chances
+
+  def _compute_measured(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card],
+      against: Optional[Opponent], cancel_index: Optional[int],
+      stats: Optional[ComputationStats]) -> float:
+    check_cards(hole_cards, community_cards)
+    hole_cards_ = tuple(card_to_int(c) for c in hole_cards)
+    community_cards_ = tuple(card_to_int(c) for c in community_cards)
+    key = None if self.cache is None else situation_key(hole_cards_, community_cards_, against)
+    if self.cache is not None and key is not None:
+      with measure(stats, 'cache'):
+        chances = self.cache.get(key)
+      if chances is not None:
+        return chances
+    chances = None
+    if not community_cards_ and against is None:
+      with measure(stats, 'preflop_table'):
+        chances = preflop_table.lookup(hole_cards_)
+    if chances is None:
+      pool = None
+      # The river is computed in this process (see `my_chances.compute_by_enumeration`), so the
+      # worker processes aren't started for it.
+      if len(community_cards_) < 5:
+        if stats is not None and self._pool is None:
+          with stats.measure('pool_startup'):
+            self._get_pool()
+        pool = self._get_pool()
+      chances = compute_by_enumeration(
+          hole_cards_, community_cards_, against, pool=pool,
+          num_processes=self.processes,
+          cancellation=None if cancel_index is None else (self._cancel_flags, cancel_index),
+          stats=stats)
+    if self.cache is not None and key is not None:
+      with measure(stats, 'cache'):
+        self.cache.put(key, chances)
+    return chances
+
+  def compute_batch(
+      self, queries: Iterable[Tuple[Sequence[Card], Sequence[Card]]],
+      against: Optional[Opponent] = None) -> List[float]:
+    '''Computes the chances for each (hole cards, community cards) query in order.
+
+    The same situation (up to the suits of the cards) is only computed once within the batch.
+    '''
+    results = []
+    computed = {}
+    for hole_cards, community_cards in queries:
+      check_cards(hole_cards, community_cards)
+      key = situation_key(
+          [card_to_int(c) for c in hole_cards], [card_to_int(c) for c in community_cards], against)
+      if key is None or key not in computed:
+        chances = self.compute(hole_cards, community_cards, against)
+        if key is not None:
+          computed[key] = chances
+      else:
+        chances = computed[key]
+      results.append(chances)
+    return results
+
+  async def compute_async(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card],
+      against: Optional[Opponent] = None) -> float:
+    '''Same as `compute` but it can be awaited.
+
+    If it's cancelled, then the worker processes stop enumerating the boards of the computation
+    as well.
+    '''
+    import asyncio
+
+    check_cards(hole_cards, community_cards)
+    executor = self._get_executor()
+    with self._lock:
+      cancel_index = None
+      if self._free_cancel_indices:
+        self._get_cancel_flags()
+        cancel_index = self._free_cancel_indices.pop()
+    future = executor.submit(self._compute, hole_cards, community_cards, against, cancel_index)
+    if cancel_index is not None:
+      future.add_done_callback(lambda _: self._release_cancel_index(cancel_index))
+    try:
+      return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+      if cancel_index is not None:
+        with self._lock:
+          # Once the computation is done, its flag may belong to another computation.
+          if not future.done():
+            self._cancel_flags[cancel_index] = 1
+      raise
+
+  async def compute_batch_async(
+      self, queries: Iterable[Tuple[Sequence[Card], Sequence[Card]]],
+      against: Optional[Opponent] = None) -> List[float]:
+    '''Same as `compute_batch` but it can be awaited. The situations are computed concurrently.
+
+    If it's cancelled or any of the computations fails, then the rest of them are cancelled.
+    '''
+    import asyncio
+
+    computations: Dict[str, 'asyncio.Future[float]'] = {}
+    futures = []
+    for hole_cards, community_cards in queries:
+      check_cards(hole_cards, community_cards)
+      key = situation_key(
+          [card_to_int(c) for c in hole_cards], [card_to_int(c) for c in community_cards], against)
+      future = None if key is None else computations.get(key)
+      if future is None:
+        future = asyncio.ensure_future(self.compute_async(hole_cards, community_cards, against))
+        if key is not None:
+          computations[key] = future
+      futures.append(future)
+    try:
+      return list(await asyncio.gather(*futures))
+    except BaseException:
+      for future in futures:
+        future.cancel()
+      raise
+
+  def estimate(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card],
+      against: Optional[Opponent] = None, target_error: Optional[float] = None,
+      time_budget: Optional[float] = None, max_samples: int = 1000000,
+      seed: Optional[int] = None, confidence: float = 0.95) -> 'Estimate':
+    '''Estimates your chances by sampling (see `monte_carlo.estimate_by_sampling`).
+
+    If the exact chances are available without enumerating the cases (from the cache or the
+    preflop table), then they are returned with zero error instead.
+    '''
+    from texas_holdem.monte_carlo import Estimate, estimate_by_sampling
+
+    check_cards(hole_cards, community_cards)
+    hole_cards_ = tuple(card_to_int(c) for c in hole_cards)
+    community_cards_ = tuple(card_to_int(c) for c in community_cards)
+    chances = None
+    key = None if self.cache is None else situation_key(hole_cards_, community_cards_, against)
+    if self.cache is not None and key is not None:
+      chances = self.cache.get(key)
+    if chances is None and not community_cards_ and against is None:
+      chances = preflop_table.lookup(hole_cards_)
+    if chances is not None:
+      return Estimate(chances, 0.0, (chances, chances), 0)
+    return estimate_by_sampling(
+        hole_cards_, community_cards_, against, target_error=target_error,
+        time_budget=time_budget, max_samples=max_samples, seed=seed, confidence=confidence,
+        pool=self._get_pool(), num_processes=self.processes)
+
+  def compute_anytime(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card],
+      against: Optional[Opponent] = None, time_budget: Optional[float] = None,
+      progress: Optional[Callable[['PartialChances'], None]] = None, seed: Optional[int] = None,
+      confidence: float = 0.95) -> 'PartialChances':
+    '''Computes your chances enumerating the boards in a random order, stopping after
+    `time_budget` seconds (see `anytime.compute_by_anytime_enumeration`).
+
+    If the exact chances are available without enumerating the cases (from the cache or the
+    preflop table), then they are returned right away. The chances are only cached if every board
+    was enumerated.
+    '''
+    from texas_holdem.anytime import PartialChances, compute_by_anytime_enumeration
+
+    check_cards(hole_cards, community_cards)
+    hole_cards_ = tuple(card_to_int(c) for c in hole_cards)
+    community_cards_ = tuple(card_to_int(c) for c in community_cards)
+    chances = None
+    key = None if self.cache is None else situation_key(hole_cards_, community_cards_, against)
+    if self.cache is not None and key is not None:
+      chances = self.cache.get(key)
+    if chances is None and not community_cards_ and against is None:
+      chances = preflop_table.lookup(hole_cards_)
+    if chances is not None:
+      return PartialChances(chances, 0.0, (chances, chances), 1.0)
+    partial_chances = compute_by_anytime_enumeration(
+        hole_cards_, community_cards_, against, time_budget=time_budget, progress=progress,
+        seed=seed, confidence=confidence, pool=self._get_pool(), num_processes=self.processes)
+    if self.cache is not None and key is not None and partial_chances.fraction_covered == 1:
+      self.cache.put(key, partial_chances.chances)
+    return partial_chances
+
+  def compute_multiway(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card], num_opponents: int,
+      against: Optional[Opponent] = None, target_error: Optional[float] = None,
+      time_budget: Optional[float] = None, max_samples: int = 1000000,
+      seed: Optional[int] = None, confidence: float = 0.95) -> 'Estimate':
+    '''Computes the probability that none of `num_opponents` opponents has a better hand than
+    you. If given, the assumptions apply to each opponent.
+
+    Once the flop has been dealt, it's computed exactly against at most
+    `multiway.MAX_EXACT_OPPONENTS` opponents and returned with zero error. Otherwise it's estimated
+    by sampling, see `estimate` for the rest of the arguments.
+    '''
+    from texas_holdem.monte_carlo import Estimate, estimate_by_sampling
+
+    check_cards(hole_cards, community_cards)
+    if not 1 <= num_opponents <= 22:
+      raise ValueError(f'There can be 1 to 22 opponents. Got: {num_opponents}.')
+    if num_opponents == 1 and (community_cards or against is None):
+      chances = self.compute(hole_cards, community_cards, against)
+      return Estimate(chances, 0.0, (chances, chances), 0)
+    hole_cards_ = tuple(card_to_int(c) for c in hole_cards)
+    community_cards_ = tuple(card_to_int(c) for c in community_cards)
+    if not community_cards_ or num_opponents > MAX_EXACT_OPPONENTS:
+      return estimate_by_sampling(
+          hole_cards_, community_cards_, against, target_error=target_error,
+          time_budget=time_budget, max_samples=max_samples, seed=seed, confidence=confidence,
+          pool=self._get_pool(), num_processes=self.processes, num_opponents=num_opponents)
+
+    key = None
+    if self.cache is not None:
+      key = situation_key(hole_cards_, community_cards_, against, num_opponents)
+    if self.cache is not None and key is not None:
+      cached_chances = self.cache.get(key)
+      if cached_chances is not None:
+        return Estimate(cached_chances, 0.0, (cached_chances, cached_chances), 0)
+    exact_chances = compute_by_enumeration(
+        hole_cards_, community_cards_, against, pool=self._get_pool(),
+        num_processes=self.processes, num_opponents=num_opponents)
+    if self.cache is not None and key is not None:
+      self.cache.put(key, exact_chances)
+    return Estimate(exact_chances, 0.0, (exact_chances, exact_chances), 0)
+
+  def compute_range_vs_range(
+      self, my_range: 'HandRange', opponents_range: 'HandRange',
+      community_cards: Sequence[Card]) -> 'RangeEquity':
+    'Computes your chances with a range against a range (see `range_equity`).'
+    from texas_holdem.range_equity import compute_range_vs_range
+
+    return compute_range_vs_range(
+        my_range, opponents_range, community_cards, pool=self._get_pool(),
+        num_processes=self.processes)
+
+  def count_cases_per_board(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card],
+      against: Optional[Opponent] = None) -> Dict[int, Tuple[float, float]]:
+    '''Counts the weighted bad cases and all the cases for each possible board, keyed by the bitmask
+    of the board (see `my_chances.count_cases_per_board`).
+    '''
+    check_cards(hole_cards, community_cards)
+    return count_cases_per_board(
+        tuple(card_to_int(c) for c in hole_cards), tuple(card_to_int(c) for c in community_cards),
+        against, pool=self._get_pool(), num_processes=self.processes)
+
+  def start(self):
+    '''Starts the worker processes now instead of when the first computation needs them (e.g.
+    before opening files or sockets that they shouldn't inherit).
+    '''
+    self._get_pool()
+
+  def map_unordered(self, function: Callable[[Any], Any], tasks: Iterable[Any]) -> Iterator[Any]:
+    '''Calls the function with each of the tasks in the worker processes and yields the results in
+    the order they are done. The function must be defined at the module level and the tasks must
+    be picklable.
+
+    If the engine has a `stats_hook`, then it's called with the time of starting the worker
+    processes and of waiting for the results once every result was yielded.
+    '''
+    stats = None if self.stats_hook is None else ComputationStats()
+    if stats is not None and self._pool is None:
+      with stats.measure('pool_startup'):
+        self._get_pool()
+    results = self._get_pool().imap_unordered(function, tasks)
+    return results if stats is None else self._measure_results(results, stats)
+
+  def _measure_results(self, results: Iterator[Any], stats: ComputationStats) -> Iterator[Any]:
+    while True:
+      with stats.measure('wait'):
+        result = next(results, _NO_RESULT)
+      if result is _NO_RESULT:
+        break
+      yield result
+    stats.record_peak_memory()
+    if self.stats_hook is not None:
+      self.stats_hook(stats)
+
+  def _get_pool(self) -> 'Pool':
+    from multiprocessing.pool import Pool
+
+    with self._lock:
+      if self._closed:
+        raise RuntimeError('The engine has been closed.')
+      if self._pool is None:
+        # Build the evaluator's tables before forking so the workers don't need to build their
+        # own.
+        get_evaluator()
+        self._pool = Pool(
+            self.processes, initializer=_init_worker, initargs=(self._get_cancel_flags(),))
+      return self._pool
+
+  def _get_cancel_flags(self):
+    'Returns the cancellation flags, creating them first if needed. Called with the lock held.'
+    if self._cancel_flags is None:
+      import multiprocessing
+      self._cancel_flags = multiprocessing.RawArray('b', _MAX_CANCELLABLE_COMPUTATIONS)
+    return self._cancel_flags
+
+  def _release_cancel_index(self, cancel_index: int):
+    with self._lock:
+      self._cancel_flags[cancel_index] = 0
+      self._free_cancel_indices.append(cancel_index)
+
+  def _get_executor(self) -> 'ThreadPoolExecutor':
+    from concurrent.futures import ThreadPoolExecutor
+
+    with self._lock:
+      if self._closed:
+        raise RuntimeError('The engine has been closed.')
+      if self._executor is None:
+        self._executor = ThreadPoolExecutor(2 * (self.processes or os.cpu_count() or 1))
+      return self._executor
+
+  def close(self):
+    'Stops the worker processes. The engine cannot be used afterwards.'
+    self._closed = True
+    if self._executor is not None:
+      self._executor.shutdown()
+      self._executor = None
+    if self._pool is not None:
+      self._pool.close()
+      self._pool.join()
+      self._pool = None
+
+  def __enter__(self) -> 'EquityEngine':
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
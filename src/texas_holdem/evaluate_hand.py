@@ -1,12 +1,31 @@
 '''Computes the rank and relative strength within the rank of the best hand that the player can
 form from their 2 hole cards and the 5 community cards (the board).
+
+The tables of the lookup engine are shipped with the package in `lookup_tables.bin`, as building
+them takes longer than starting a short computation. They can be regenerated by running::
+
+    python -m texas_holdem.evaluate_hand generate
+
+Only the nonzero entries of the rank table (15 MB when expanded) are stored in that file. The
+expanded tables are written to a file in a private directory of the user in the temporary
+directory once and every process (e.g. the worker processes of the pools) maps that file into its
+memory, so they share a single copy of the tables and a new process can use them right away. The
+file is only used if its contents match the digest stored in `lookup_tables.bin`.
 '''
+import argparse
+import mmap
+import os
+import struct
+import stat
+import sys
+from array import array
 from collections import Counter
 from enum import IntEnum
 from functools import total_ordering
-from typing import List, NamedTuple, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, \
+    Tuple
 
-from texas_holdem.card import Card, Rank, card_value, HoleCards, Board
+from texas_holdem.card import Card, Rank, card_value, card_to_int, int_to_card, HoleCards, Board
 
 
 class HandRank(IntEnum):
@@ -30,6 +49,21 @@ def sort_hand_ranks_in_decr_order() -> List[HandRank]:
   return sorted(HandRank, reverse=True)
 
 
+# The number of tie breaker card ranks of the `HandValue`s with the given hand rank.
+_NUM_TIE_BREAKER_CARD_RANKS = {
+    HandRank.HIGH_CARD: 5,
+    HandRank.ONE_PAIR: 4,
+    HandRank.TWO_PAIRS: 3,
+    HandRank.THREE_OF_A_KIND: 3,
+    HandRank.STRAIGHT: 1,
+    HandRank.FLUSH: 5,
+    HandRank.FULL_HOUSE: 2,
+    HandRank.FOUR_OF_A_KIND: 2,
+    HandRank.STRAIGHT_FLUSH: 1,
+    HandRank.ROYAL_FLUSH: 0,
+}
+
+
 @total_ordering
 class HandValue(NamedTuple):
   '''Describes the strength of a hand so we can compare hands.
@@ -41,9 +75,34 @@ class HandValue(NamedTuple):
   pair and the higher rank wins. If it's the same, then they compare the rank of their lower
   ranked pair. If it's still equal then they compare the rank of their 5th card which is not
   part of a pair.
+
+  The same information can be packed into a single integer, the strength of the hand (see the
+  `strength` property). Comparing the strengths of hands is much cheaper than comparing their
+  `HandValue`s, that's why the evaluator works with strengths.
   '''
   rank: HandRank
   tie_breaker_card_ranks: List[Rank]
+
+  @property
+  def strength(self) -> int:
+    '''The hand rank in the highest bits followed by the tie breaker card ranks on 4 bits each,
+    so the order of the strengths is the same as the order of the `HandValue`s.
+    '''
+    strength = int(self.rank)
+    for i in range(5):
+      strength <<= 4
+      if i < len(self.tie_breaker_card_ranks):
+        strength |= self.tie_breaker_card_ranks[i]
+    return strength
+
+  @staticmethod
+  def from_strength(strength: int) -> 'HandValue':
+    'The inverse of the `strength` property.'
+    rank = HandRank(strength >> 20)
+    tie_breaker_card_ranks = [Rank((strength >> (16 - 4 * i)) & 0xF)
+        for i in range(_NUM_TIE_BREAKER_CARD_RANKS[rank])]
+    return HandValue(rank=rank, tie_breaker_card_ranks=tie_breaker_card_ranks)
+
   def __lt__(self, other):
     if self.rank == other.rank:
       for r1, r2 in zip(self.tie_breaker_card_ranks, other.tie_breaker_card_ranks):
@@ -56,16 +115,191 @@ class HandValue(NamedTuple):
       return self.rank < other.rank
 
 
-def get_hand_value(hole_cards: HoleCards, board: Board):
-  cards = hole_cards + board
+def get_hand_value(
+    hole_cards: HoleCards, board: Board, engine: Optional[str] = None) -> HandValue:
+  return HandValue.from_strength(get_hand_strength(hole_cards, board, engine=engine))
+
+
+def get_hand_strength(hole_cards: HoleCards, board: Board, engine: Optional[str] = None) -> int:
+  'Returns the strength of the hand (see `HandValue.strength`).'
+  return evaluate([card_to_int(c) for c in (*hole_cards, *board)], engine=engine)
+
+
+def evaluate(cards: Sequence[int], engine: Optional[str] = None) -> int:
+  '''Same as `get_hand_strength` but takes the integer encoding of the 7 cards (see
+  `card.card_to_int`).
+
+  When evaluating lots of hands, prefer calling the function returned by `get_evaluator` directly.
+  '''
+  return get_evaluator(engine)(cards)
+
+
+# The available implementations of `evaluate`. They all return the same strength for the same
+# cards, they only differ in speed.
+#   - lookup: Looks the strength up from precomputed tables (see `_LookupTables`).
+#   - rank_checks: Checks the ranks one by one using `HandValueWhenRankIsFixedAs`. It's the
+#     slowest one but it's the easiest to follow, so it serves as the reference implementation.
+#   - numpy: Evaluates many hands at once with array operations (see `batch_evaluate`). It only
+#     pays off with `evaluate_hole_cards`, and it requires NumPy.
+ENGINES = ('lookup', 'rank_checks', 'numpy')
+DEFAULT_ENGINE = 'lookup'
+
+
+def set_default_engine(engine: str):
+  'Sets the engine used by `get_hand_value` and `evaluate` when no engine is specified.'
+  global DEFAULT_ENGINE
+  if engine not in ENGINES:
+    raise ValueError(f'Unknown engine: {engine}. Choose from: {", ".join(ENGINES)}.')
+  DEFAULT_ENGINE = engine
+
+
+def get_evaluator(engine: Optional[str] = None) -> Callable[[Sequence[int]], int]:
+  '''Returns the function implementing `evaluate` with the given engine (or the default one).
+
+  The tables needed by the engine are built when the function is called, so it's worth calling it
+  before forking worker processes.
+  '''
+  engine = engine or DEFAULT_ENGINE
+  if engine == 'lookup':
+    _lookup_tables()
+    return _evaluate_with_lookup_tables
+  if engine == 'rank_checks':
+    return _evaluate_with_rank_checks
+  if engine == 'numpy':
+    from texas_holdem.batch_evaluate import evaluate_batch
+    return lambda cards: int(evaluate_batch([cards])[0])
+  raise ValueError(f'Unknown engine: {engine}. Choose from: {", ".join(ENGINES)}.')
+
+
+def evaluate_hole_cards(
+    board: Sequence[int], hole_cards_list: Iterable[Tuple[int, int]],
+    engine: Optional[str] = None) -> List[int]:
+  '''Evaluates the hands that can be formed from the board and each of the hole cards.
+
+  It's the same as calling `evaluate` for each hole cards, but the lookup engine only needs to
+  process the board once and the numpy engine evaluates all the hands in a single call.
+  '''
+  engine = engine or DEFAULT_ENGINE
+  strengths: List[int]
+  if engine == 'lookup':
+    strengths = _evaluate_hole_cards_with_lookup_tables(board, hole_cards_list)
+  elif engine == 'numpy':
+    from texas_holdem.batch_evaluate import evaluate_hole_cards_batch
+    strengths = evaluate_hole_cards_batch(board, list(hole_cards_list)).tolist()
+  else:
+    evaluate = get_evaluator(engine)
+    board = tuple(board)
+    strengths = [evaluate((c1, c2, *board)) for c1, c2 in hole_cards_list]
+  if _hand_rank_counts is not None:
+    for strength in strengths:
+      _hand_rank_counts[strength >> 20] += 1
+  return strengths
+
+
+# The number of hands evaluated by `evaluate_hole_cards` for each hand rank, only counted while
+# it's set (see `instrumentation.ComputationStats.count_hand_ranks`).
+_hand_rank_counts: Optional[List[int]] = None
+
+
+def _evaluate_with_lookup_tables(cards: Sequence[int]) -> int:
+  rank_table, flush_suit_table, flush_table = _lookup_tables()
+  key = 0
+  mask = 0
+  for c in cards:
+    key += _CARD_KEYS[c]
+    mask |= 1 << c
+  flush_shift = flush_suit_table[key >> _SUIT_KEY_SHIFT]
+  if flush_shift < 0:
+    return _STRENGTHS[rank_table[key & _RANK_KEY_MASK]]
+  return _STRENGTHS[flush_table[(mask >> flush_shift) & 0x1FFF]]
+
+
+def _evaluate_hole_cards_with_lookup_tables(
+    board: Sequence[int], hole_cards_list: Iterable[Tuple[int, int]]) -> List[int]:
+  rank_table, flush_suit_table, flush_table = _lookup_tables()
+  board_key = 0
+  board_mask = 0
+  for c in board:
+    board_key += _CARD_KEYS[c]
+    board_mask |= 1 << c
+  strengths = []
+  for c1, c2 in hole_cards_list:
+    key = board_key + _CARD_KEYS[c1] + _CARD_KEYS[c2]
+    flush_shift = flush_suit_table[key >> _SUIT_KEY_SHIFT]
+    if flush_shift < 0:
+      strengths.append(_STRENGTHS[rank_table[key & _RANK_KEY_MASK]])
+    else:
+      mask = board_mask | (1 << c1) | (1 << c2)
+      strengths.append(_STRENGTHS[flush_table[(mask >> flush_shift) & 0x1FFF]])
+  return strengths
+
+
+def _evaluate_with_rank_checks(cards: Sequence[int]) -> int:
+  cards_ = [int_to_card(c) for c in cards]
   # A hand can satisfy the conditions for multiple ranks (i.e. a 4 of a kind also contains a pair)
   # but we are only interested in the highest rank. So we check the possible ranks starting from the
   # highest one.
   for rank in sort_hand_ranks_in_decr_order():
     check_for_rank = getattr(HandValueWhenRankIsFixedAs, rank.name)
-    hand_value = check_for_rank(cards)
+    hand_value = check_for_rank(cards_)
     if hand_value is not None:
-      return hand_value
+      return hand_value.strength
+  raise AssertionError('Every hand has a HIGH_CARD value.')
+
+
+def _evaluate_with_bit_operations(cards: Sequence[int]) -> HandValue:
+  '''Instead of sorting and grouping the cards, it collects the ranks present in each suit and the
+  number of cards of each rank, so every hand rank can be checked with a few bit operations.
+
+  Unlike the other implementations, it works with any number of cards (it's used to fill the
+  lookup tables).
+  '''
+  rank_counts = [0] * 13
+  suit_masks = [0, 0, 0, 0]
+  for c in cards:
+    suit, rank = divmod(c, 13)
+    rank_counts[rank] += 1
+    suit_masks[suit] |= 1 << rank
+  rank_mask = suit_masks[0] | suit_masks[1] | suit_masks[2] | suit_masks[3]
+  flush_mask = next((m for m in suit_masks if _num_ranks(m) >= 5), 0)
+  # Ranks (in decreasing order) grouped by the number of cards of that rank.
+  ranks_with_count: Dict[int, List[int]] = {1: [], 2: [], 3: [], 4: []}
+  for rank in range(12, -1, -1):
+    if rank_counts[rank]:
+      ranks_with_count[rank_counts[rank]].append(rank)
+  quads, triplets, pairs = ranks_with_count[4], ranks_with_count[3], ranks_with_count[2]
+
+  if flush_mask:
+    straight_flush = _highest_straight(flush_mask)
+    if straight_flush == Rank.ACE:
+      return HandValue(rank=HandRank.ROYAL_FLUSH, tie_breaker_card_ranks=[])
+    if straight_flush is not None:
+      return HandValue(rank=HandRank.STRAIGHT_FLUSH, tie_breaker_card_ranks=[straight_flush])
+  if quads:
+    kicker = _highest_ranks(rank_mask & ~(1 << quads[0]), 1)
+    return HandValue(
+        rank=HandRank.FOUR_OF_A_KIND, tie_breaker_card_ranks=[_RANKS[quads[0]]] + kicker)
+  if triplets and len(triplets) + len(pairs) >= 2:
+    pair = max(triplets[1:] + pairs)
+    return HandValue(
+        rank=HandRank.FULL_HOUSE, tie_breaker_card_ranks=[_RANKS[triplets[0]], _RANKS[pair]])
+  if flush_mask:
+    return HandValue(rank=HandRank.FLUSH, tie_breaker_card_ranks=_highest_ranks(flush_mask, 5))
+  straight = _highest_straight(rank_mask)
+  if straight is not None:
+    return HandValue(rank=HandRank.STRAIGHT, tie_breaker_card_ranks=[straight])
+  if triplets:
+    kickers = _highest_ranks(rank_mask & ~(1 << triplets[0]), 2)
+    return HandValue(
+        rank=HandRank.THREE_OF_A_KIND, tie_breaker_card_ranks=[_RANKS[triplets[0]]] + kickers)
+  if len(pairs) >= 2:
+    kicker = _highest_ranks(rank_mask & ~(1 << pairs[0]) & ~(1 << pairs[1]), 1)
+    return HandValue(
+        rank=HandRank.TWO_PAIRS, tie_breaker_card_ranks=[_RANKS[p] for p in pairs[:2]] + kicker)
+  if pairs:
+    kickers = _highest_ranks(rank_mask & ~(1 << pairs[0]), 3)
+    return HandValue(rank=HandRank.ONE_PAIR, tie_breaker_card_ranks=[_RANKS[pairs[0]]] + kickers)
+  return HandValue(rank=HandRank.HIGH_CARD, tie_breaker_card_ranks=_highest_ranks(rank_mask, 5))
 
 
 class HandValueWhenRankIsFixedAs:
@@ -241,3 +475,314 @@ def _filter_most_freq_suit(cards: List[Card]) -> List[Card]:
   most_common_suit, num_cards = num_cards_per_suit.most_common(1)[0]
   return [c for c in cards if c.suit == most_common_suit]
 
+
+
+# `_RANKS[i]` is the rank of the cards whose integer encoding `c` satisfies `c % 13 == i`.
+_RANKS = [Rank(i + 2) for i in range(13)]
+
+
+def _num_ranks(rank_mask: int) -> int:
+  return bin(rank_mask).count('1')
+
+
+def _highest_ranks(rank_mask: int, n: int) -> List[Rank]:
+  'Returns the n highest ranks whose bit is set in the mask in decreasing order.'
+  ranks: List[Rank] = []
+  while rank_mask and len(ranks) < n:
+    rank = rank_mask.bit_length() - 1
+    ranks.append(_RANKS[rank])
+    rank_mask &= ~(1 << rank)
+  return ranks
+
+
+def _highest_straight(rank_mask: int) -> Optional[Rank]:
+  '''If the mask contains 5 consecutive ranks then it returns the highest rank of the highest
+  such sequence. Otherwise returns None.
+  '''
+  # Shift the ranks by one to make room for the ACE_LOW at the lowest bit (see
+  # `_find_highest_ranked_straight` for why it is needed), so bit i represents the rank i + 1.
+  ranks = (rank_mask << 1) | (rank_mask >> 12)
+  # The lowest bit of each 5 long sequence of set bits remains set.
+  sequence_starts = ranks & (ranks >> 1) & (ranks >> 2) & (ranks >> 3) & (ranks >> 4)
+  if sequence_starts:
+    return Rank(sequence_starts.bit_length() + 4)
+  return None
+
+
+### Lookup tables ###
+
+# Each card gets a key so that the sum of the keys of the 7 cards tells
+#   - the multiset of the ranks of the cards (in the lower bits) and
+#   - the number of cards of each suit (in the higher bits).
+# The weights of the ranks are chosen so that the sums of any 7 of them (with each rank used at most
+# 4 times) are distinct. The number of cards of a suit is stored on 3 bits for each suit.
+_RANK_WEIGHTS = (0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181)
+_SUIT_KEY_SHIFT = 23
+_RANK_KEY_MASK = (1 << _SUIT_KEY_SHIFT) - 1
+_CARD_KEYS = [
+    _RANK_WEIGHTS[c % 13] + (1 << (_SUIT_KEY_SHIFT + 3 * (c // 13))) for c in range(52)]
+_MAX_RANK_KEY = 4 * _RANK_WEIGHTS[12] + 3 * _RANK_WEIGHTS[11]
+
+
+class _LookupTables(NamedTuple):
+  '''The tables used by the lookup engine. Each of them contain indices of `_STRENGTHS`.
+
+  rank_table: The value of the hand that doesn't contain a flush keyed by the sum of the rank
+    weights of the cards.
+  flush_suit_table: Keyed by the sum of the suit weights of the cards. It's -1 if the cards don't
+    contain a flush and otherwise it's 13 * <the suit of the flush>, so shifting the bitmask of the
+    cards with it moves the ranks in the flush to the lowest 13 bits.
+  flush_table: The value of the hand that contains a flush keyed by the bitmask of the ranks in the
+    flush.
+  '''
+  rank_table: Sequence[int]
+  flush_suit_table: Sequence[int]
+  flush_table: Sequence[int]
+
+
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lookup_tables.bin')
+_TABLES_MAGIC = b'THLOOKU2'
+# The size of the digest of the expanded tables in the header of the file.
+_DIGEST_SIZE = 32
+
+_TABLES: Optional[_LookupTables] = None
+# The strengths of the possible hands in increasing order. The tables contain indices of this list
+# instead of the strengths themselves so they can use 2 bytes per entry.
+_STRENGTHS: List[int] = []
+
+
+def _lookup_tables() -> _LookupTables:
+  global _TABLES
+  if _TABLES is None:
+    _TABLES = _load_lookup_tables() or _build_lookup_tables()
+  return _TABLES
+
+
+def _load_lookup_tables() -> Optional[_LookupTables]:
+  '''Loads the tables from `lookup_tables.bin`. Returns None if the file is not available.
+
+  The tables are mapped from the file of the expanded tables (see `_map_expanded_tables`), which is
+  created from `lookup_tables.bin` if it doesn't exist yet or it doesn't contain the expected
+  tables. If it can't be created, then the tables are expanded in the memory of this process.
+  '''
+  if not os.path.exists(TABLES_PATH):
+    return None
+  with open(TABLES_PATH, 'rb') as f:
+    data = f.read()
+  strengths, digest, _, _ = _parse_lookup_tables(data, expand=False)
+  expanded_tables_path = None
+  tables = None
+  # The digest is of the tables in little-endian byte order, which the file would be in.
+  if sys.byteorder == 'little':
+    try:
+      expanded_tables_path = os.path.join(
+          _private_directory(), f'lookup_tables_{digest.hex()[:16]}.bin')
+    except OSError:
+      pass
+  if expanded_tables_path is not None:
+    tables = _map_expanded_tables(expanded_tables_path, digest)
+  if tables is None:
+    _, _, rank_table, flush_table = _parse_lookup_tables(data, expand=True)
+    flush_suit_table = _build_flush_suit_table()
+    tables = _LookupTables(rank_table, flush_suit_table, flush_table)
+    if expanded_tables_path is not None:
+      try:
+        _save_expanded_tables(expanded_tables_path, rank_table, flush_suit_table, flush_table)
+        # This process maps the file too, so it shares the tables with the others.
+        tables = _map_expanded_tables(expanded_tables_path, digest) or tables
+      except OSError:
+        pass
+  _STRENGTHS[:] = strengths
+  return tables
+
+
+def _parse_lookup_tables(
+    data: bytes, expand: bool) -> Tuple[Sequence[int], bytes, array, array]:
+  '''Parses the contents of `lookup_tables.bin`. Returns the strengths, the digest of the expanded
+  tables (see `_expanded_tables_digest`) and (if `expand` is set) the rank table and the flush
+  table.
+
+  The file contains the strengths, the nonzero entries of the rank table (which is mostly empty)
+  and the flush table, as little-endian integers after a header.
+  '''
+  header_size = len(_TABLES_MAGIC) + 8 + _DIGEST_SIZE
+  if data[:len(_TABLES_MAGIC)] != _TABLES_MAGIC or len(data) < header_size:
+    raise ValueError(f'{TABLES_PATH} does not contain valid lookup tables. Regenerate them.')
+  num_strengths, num_rank_entries = struct.unpack_from('<II', data, len(_TABLES_MAGIC))
+  if len(data) != header_size + 4 * num_strengths + 6 * num_rank_entries + 2 * (1 << 13):
+    raise ValueError(f'{TABLES_PATH} does not contain valid lookup tables. Regenerate them.')
+  digest = data[header_size - _DIGEST_SIZE:header_size]
+  offset = header_size
+  strengths = struct.unpack_from(f'<{num_strengths}I', data, offset)
+  if not expand:
+    return strengths, digest, array('H'), array('H')
+  offset += 4 * num_strengths
+  rank_keys = struct.unpack_from(f'<{num_rank_entries}I', data, offset)
+  offset += 4 * num_rank_entries
+  rank_values = struct.unpack_from(f'<{num_rank_entries}H', data, offset)
+  offset += 2 * num_rank_entries
+  rank_table = array('H', bytes(2 * (_MAX_RANK_KEY + 1)))
+  for key, value in zip(rank_keys, rank_values):
+    rank_table[key] = value
+  flush_table = array('H', struct.unpack_from(f'<{1 << 13}H', data, offset))
+  return strengths, digest, rank_table, flush_table
+
+
+def _expanded_tables_digest(tables: Iterable[Any]) -> bytes:
+  'Returns the SHA-256 digest of the tables one after the other in little-endian byte order.'
+  import hashlib
+
+  digest = hashlib.sha256()
+  for table in tables:
+    if sys.byteorder != 'little':
+      table = array(table.typecode, table)
+      table.byteswap()
+    digest.update(table.tobytes())
+  return digest.digest()
+
+
+def _map_expanded_tables(path: str, digest: bytes) -> Optional[_LookupTables]:
+  '''Maps the tables from the file of the expanded tables, which contains them one after the other
+  in the native byte order. Returns None if the file doesn't exist, it's not owned by the current
+  user or its contents don't have the given digest (e.g. it's not complete).
+
+  The mapping is read-only and the pages of the file are shared by every process mapping it.
+  '''
+  import hashlib
+
+  try:
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+  except OSError:
+    return None
+  try:
+    info = os.fstat(fd)
+    if not stat.S_ISREG(info.st_mode) or (hasattr(os, 'getuid') and info.st_uid != os.getuid()):
+      return None
+    tables = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+  except (OSError, ValueError):  # ValueError if the file is empty.
+    return None
+  finally:
+    os.close(fd)
+  flush_suit_table_offset = 2 * (_MAX_RANK_KEY + 1)
+  flush_table_offset = flush_suit_table_offset + (1 << 12)
+  if (len(tables) != flush_table_offset + 2 * (1 << 13)
+      or hashlib.sha256(tables).digest() != digest):
+    tables.close()
+    return None
+  view = memoryview(tables)
+  return _LookupTables(
+      view[:flush_suit_table_offset].cast('H'),
+      view[flush_suit_table_offset:flush_table_offset].cast('b'),
+      view[flush_table_offset:].cast('H'))
+
+
+def _save_expanded_tables(
+    path: str, rank_table: array, flush_suit_table: array, flush_table: array):
+  import tempfile
+
+  # Written to a new temporary file first, so other processes never map a partially written file.
+  fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path))
+  try:
+    with os.fdopen(fd, 'wb') as f:
+      for table in (rank_table, flush_suit_table, flush_table):
+        table.tofile(f)
+    os.replace(temporary_path, path)
+  finally:
+    if os.path.exists(temporary_path):
+      os.remove(temporary_path)
+
+
+def _private_directory() -> str:
+  '''Returns the directory of the current user for the expanded tables in the temporary directory,
+  creating it first if needed. Raises `OSError` if it's accessible by other users.
+  '''
+  # Imported here as importing it takes longer than the rest of loading the tables.
+  import tempfile
+
+  if not hasattr(os, 'getuid'):
+    # The temporary directory is already private on Windows.
+    return tempfile.gettempdir()
+  path = os.path.join(tempfile.gettempdir(), f'texas_holdem-{os.getuid()}')
+  try:
+    os.mkdir(path, 0o700)
+  except FileExistsError:
+    pass
+  info = os.lstat(path)
+  if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+    raise OSError(f'{path} is not a private directory of the current user.')
+  return path
+
+
+def save_lookup_tables(path: str = TABLES_PATH):
+  'Builds the tables and writes them to the file loaded by the lookup engine.'
+  tables = _build_lookup_tables()
+  rank_table, _, flush_table = tables
+  rank_entries = [(key, value) for key, value in enumerate(rank_table) if value]
+  with open(path, 'wb') as f:
+    f.write(_TABLES_MAGIC + struct.pack('<II', len(_STRENGTHS), len(rank_entries)))
+    f.write(_expanded_tables_digest(tables))
+    f.write(struct.pack(f'<{len(_STRENGTHS)}I', *_STRENGTHS))
+    f.write(struct.pack(f'<{len(rank_entries)}I', *(key for key, _ in rank_entries)))
+    f.write(struct.pack(f'<{len(rank_entries)}H', *(value for _, value in rank_entries)))
+    f.write(struct.pack(f'<{len(flush_table)}H', *flush_table))
+
+
+def _build_lookup_tables() -> _LookupTables:
+  rank_multisets = list(_list_rank_multisets(7))
+  # The 13-bit masks of ranks that can be in a flush (that is with at least 5 ranks).
+  flush_masks = [m for m in range(1 << 13) if _num_ranks(m) >= 5]
+  # Suits of the cards are chosen so that there isn't a flush among them.
+  strengths_without_flush = [
+      _evaluate_with_bit_operations([13 * (i % 4) + r for i, r in enumerate(ranks)]).strength
+      for ranks in rank_multisets]
+  strengths_with_flush = [
+      _evaluate_with_bit_operations([r for r in range(13) if m >> r & 1]).strength
+      for m in flush_masks]
+
+  _STRENGTHS[:] = sorted(set(strengths_without_flush + strengths_with_flush))
+  index = {strength: i for i, strength in enumerate(_STRENGTHS)}
+
+  rank_table = array('H', bytes(2 * (_MAX_RANK_KEY + 1)))
+  for ranks, strength in zip(rank_multisets, strengths_without_flush):
+    rank_table[sum(_RANK_WEIGHTS[r] for r in ranks)] = index[strength]
+  flush_table = array('H', bytes(2 * (1 << 13)))
+  for m, strength in zip(flush_masks, strengths_with_flush):
+    flush_table[m] = index[strength]
+  return _LookupTables(rank_table, _build_flush_suit_table(), flush_table)
+
+
+def _build_flush_suit_table() -> array:
+  flush_suit_table = array('b', [-1] * (1 << 12))
+  for suit_key in range(1 << 12):
+    for suit in range(4):
+      if (suit_key >> 3 * suit) & 7 >= 5:
+        flush_suit_table[suit_key] = 13 * suit
+  return flush_suit_table
+
+
+def _list_rank_multisets(n: int, max_rank: int = 12) -> Iterator[Tuple[int, ...]]:
+  'Lists the multisets of n ranks (up to `max_rank`) where each rank occurs at most 4 times.'
+  if n == 0:
+    yield ()
+    return
+  if max_rank < 0:
+    return
+  for count in range(min(4, n), -1, -1):
+    for ranks in _list_rank_multisets(n - count, max_rank - 1):
+      yield (max_rank,) * count + ranks
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+  subparsers = parser.add_subparsers(dest='command')
+  subparsers.add_parser('generate', help='Regenerates the tables of the lookup engine.')
+  parsed_args = parser.parse_args(args)
+  if parsed_args.command == 'generate':
+    save_lookup_tables()
+    return 0
+  parser.print_help()
+  return 1
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -1,22 +1,58 @@
 'List the possible hole cards your opponent can hold that would give them a better hand than yours.'
-from typing import Set
+from bisect import bisect_left, bisect_right
+from typing import List, NamedTuple, Sequence, Set, Tuple
 from itertools import combinations
 
-from texas_holdem.card import HoleCards, Board, Card, list_all_cards, list_remaining_cards
-from texas_holdem.evaluate_hand import get_hand_value
-from texas_holdem.compare_hands import has_better_hand_than_hand_value
+from texas_holdem.card import HoleCards, Board, card_to_int, int_to_card, cards_to_mask, \
+    list_remaining_card_ints
+from texas_holdem.evaluate_hand import evaluate_hole_cards
 
 
 def find_better_hole_cards(my_hole_cards: HoleCards, board: Board) -> Set[HoleCards]:
   '''Returns the set of the possible hole cards your opponent can hold that would give them a
   better hand than your.
   '''
-  my_hand_value = get_hand_value(my_hole_cards, board)
-  better_hole_cards = set()
-  cards_seen = my_hole_cards + board
-  remaining_cards = list_remaining_cards(cards_seen)
-  for c1, c2 in combinations(remaining_cards, 2):
-    opponent_hole_cards = HoleCards(c1, c2)
-    if has_better_hand_than_hand_value(opponent_hole_cards, board, my_hand_value):
-      better_hole_cards.add(opponent_hole_cards)
-  return better_hole_cards
+  better_hole_cards = find_better_hole_card_ints(
+      [card_to_int(c) for c in my_hole_cards], [card_to_int(c) for c in board])
+  return {HoleCards(int_to_card(c1), int_to_card(c2)) for c1, c2 in better_hole_cards}
+
+
+def find_better_hole_card_ints(
+    my_hole_cards: Sequence[int], board: Sequence[int]) -> List[Tuple[int, int]]:
+  '''Same as `find_better_hole_cards` but works with the integer encoding of the cards.
+
+  Your hand and all the possible hands of the opponent are evaluated in a single call.
+  '''
+  c1, c2 = my_hole_cards
+  remaining_cards = list_remaining_card_ints(cards_to_mask((c1, c2, *board)))
+  hole_cards_list = list(combinations(remaining_cards, 2))
+  my_strength, *strengths = evaluate_hole_cards(board, [(c1, c2)] + hole_cards_list)
+  return [hc for hc, strength in zip(hole_cards_list, strengths) if my_strength < strength]
+
+
+class HoleCardsCounts(NamedTuple):
+  '''The number of the possible hole cards of the opponent that would give them a better hand
+  than yours, the same hand and a worse hand.
+  '''
+  better: int
+  tied: int
+  worse: int
+
+
+def count_better_hole_cards(
+    my_hole_cards: Sequence[int], board: Sequence[int]) -> HoleCardsCounts:
+  '''Same as `find_better_hole_card_ints` but only counts the hole cards. It also counts those that
+  would tie with you or lose to you.
+
+  The hands of all the possible hole cards are evaluated at once, then the strengths are sorted
+  and your strength is located among them by binary search.
+  '''
+  c1, c2 = my_hole_cards
+  remaining_cards = list_remaining_card_ints(cards_to_mask((c1, c2, *board)))
+  my_strength, *strengths = evaluate_hole_cards(
+      board, [(c1, c2)] + list(combinations(remaining_cards, 2)))
+  strengths.sort()
+  num_worse = bisect_left(strengths, my_strength)
+  num_not_better = bisect_right(strengths, my_strength)
+  return HoleCardsCounts(
+      better=len(strengths) - num_not_better, tied=num_not_better - num_worse, worse=num_worse)
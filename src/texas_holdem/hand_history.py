@@ -0,0 +1,338 @@
+'''Computes your chances on every street of logged hands, e.g. millions of them.
+
+A hand history has a hand on each line: its id, your hole cards, the community cards revealed (see
+`card.parse`) and optionally the street on which the players went all in, separated by `|`:
+
+    h1 | S2 DA | H2 D3 S5 C9 CA | flop
+    h2 | SK SQ | H2 D3 S5
+    h3 | S10 H10
+
+Empty lines and lines starting with `#` are skipped. A JSON line is written for each hand with your
+chances on each street it reached (that is at each decision) and at the time of the all in:
+
+    {"id": "h1", "chances": {"preflop": 0.5, "flop": 0.6, "turn": 0.6, "river": 0.9},
+     "all_in_chances": 0.6}
+
+or with the error that prevented computing them. Only some of the streets can be asked for, the
+chances at the time of the all in are always computed. Against an opponent (e.g. a range), the
+chances before the flop are only computed if they are asked for, as they take minutes to compute
+for each hole cards.
+
+The hands are read in chunks of `chunk_size`, so the memory used doesn't depend on the length of
+the history. The situations of a chunk that only differ in the suits of the cards (see
+`cache.situation_key`) are computed once, the results are also looked up from and put into the
+cache of the engine, and the situations are distributed among its worker processes. The results of
+each chunk are written (and flushed) in the order of the hands, so an interrupted analysis can be
+resumed by `analyze_file`, which skips the hands already in its output.
+
+Usage
+-----
+
+    python -m texas_holdem.hand_history hands.txt --output results.jsonl [--range "TT+, AJs+"]
+
+    >>> from texas_holdem.hand_history import analyze_file
+    >>> analyze_file('hands.txt', 'results.jsonl')
+'''
+import argparse
+import json
+import os
+import sys
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, \
+    Sequence, TextIO, Tuple, Union
+
+from texas_holdem import preflop_table
+from texas_holdem.cache import ResultCache, situation_key
+from texas_holdem.card import Card, card_to_int, parse
+from texas_holdem.engine import EquityEngine
+from texas_holdem.my_chances import Opponent, OpponentError, compute_by_enumeration
+
+
+# The number of community cards revealed on each street.
+STREETS = {'preflop': 0, 'flop': 3, 'turn': 4, 'river': 5}
+
+# The number of situations sent to a worker process in a single task.
+_SITUATIONS_PER_TASK = 64
+
+# The hole cards and the community cards of a situation in their integer encoding.
+_Situation = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+
+class Hand(NamedTuple):
+  id: str
+  hole_cards: List[Card]
+  community_cards: List[Card]
+  # The street on which the players went all in, if they did.
+  all_in_street: Optional[str] = None
+
+
+class _InvalidHand(NamedTuple):
+  id: str
+  error: str
+
+
+def parse_hand(line: str) -> Hand:
+  'Parses a line of a hand history (see the module documentation). Raises ValueError if invalid.'
+  fields = [field.strip() for field in line.split('|')]
+  if not 2 <= len(fields) <= 4:
+    raise ValueError(
+        'A hand should have an id, the hole cards, the community cards and the street of the ' +
+        f'all in separated by |. Got: {line.strip()}')
+  hand_id = fields[0]
+  hole_cards = _parse_cards(fields[1])
+  community_cards = _parse_cards(fields[2]) if len(fields) > 2 else []
+  all_in_street = fields[3] if len(fields) > 3 and fields[3] else None
+  if len(hole_cards) != 2:
+    raise ValueError(f'Needs exactly 2 hole cards. Got: {len(hole_cards)}.')
+  if len(community_cards) not in STREETS.values():
+    raise ValueError(
+        'There can be either 0, 3, 4 or 5 community cards revealed. ' +
+        f'Got: {len(community_cards)}.')
+  if len(set(hole_cards + community_cards)) < len(hole_cards + community_cards):
+    raise ValueError('The same card is listed multiple times in the hand.')
+  if all_in_street is not None:
+    if all_in_street not in STREETS:
+      raise ValueError(
+          f'Unknown street: {all_in_street}. It should be one of {", ".join(STREETS)}.')
+    if STREETS[all_in_street] > len(community_cards):
+      raise ValueError(f'The community cards of the {all_in_street} are missing.')
+  return Hand(hand_id, hole_cards, community_cards, all_in_street)
+
+
+def analyze(
+    lines: Iterable[str], output: TextIO, against: Optional[Opponent] = None,
+    engine: Optional[EquityEngine] = None, chunk_size: int = 10000, skip: int = 0,
+    streets: Optional[Sequence[str]] = None) -> int:
+  '''Computes the chances for the hands read from the lines and writes a JSON line for each of them
+  to `output` (see the module documentation). The first `skip` hands are skipped. Returns the
+  number of hands whose chances could not be computed.
+
+  The chances are computed on each of the `streets` that the hand reached. By default that's
+  every street, except before the flop if there is an opponent (see the module documentation).
+
+  The `against` opponent is sent to the worker processes, so it has to be picklable (e.g. a
+  `hand_range.HandRange` or an `Opponent` defined at the module level). If no `engine` is given,
+  then one with an in-process cache is created for the analysis.
+  '''
+  if streets is None:
+    streets_ = [street for street in STREETS if against is None or street != 'preflop']
+  else:
+    streets_ = list(streets)
+  for street in streets_:
+    if street not in STREETS:
+      raise ValueError(f'Unknown street: {street}. It should be one of {", ".join(STREETS)}.')
+  owns_engine = engine is None
+  engine_ = EquityEngine(cache=ResultCache()) if engine is None else engine
+  num_failed = 0
+  try:
+    hands = islice(_read_hands(lines), skip, None)
+    while True:
+      chunk = list(islice(hands, chunk_size))
+      if not chunk:
+        break
+      for result in _analyze_chunk(chunk, against, engine_, streets_):
+        num_failed += 'error' in result
+        output.write(json.dumps(result) + '\n')
+      output.flush()
+  finally:
+    if owns_engine:
+      engine_.close()
+  return num_failed
+
+
+def analyze_file(
+    path: str, output_path: str, against: Optional[Opponent] = None,
+    engine: Optional[EquityEngine] = None, chunk_size: int = 10000, resume: bool = True,
+    streets: Optional[Sequence[str]] = None) -> int:
+  '''Same as `analyze` but reads the hand history from the file at `path` and writes the results
+  to the file at `output_path`. The hand history is read from the standard input if `path` is -.
+
+  If the output already exists and `resume` is set, then the hands whose results it contains are
+  skipped and the results of the rest are appended to it (after removing a partially written last
+  line). Otherwise the output is overwritten.
+  '''
+  skip = _count_results(output_path) if resume and os.path.exists(output_path) else 0
+  with _open_hand_history(path) as lines, open(output_path, 'a' if skip else 'w') as output:
+    return analyze(lines, output, against, engine, chunk_size, skip, streets)
+
+
+@contextmanager
+def _open_hand_history(path: str) -> Iterator[TextIO]:
+  if path == '-':
+    yield sys.stdin
+  else:
+    with open(path) as f:
+      yield f
+
+
+def _read_hands(lines: Iterable[str]) -> Iterator[Union[Hand, _InvalidHand]]:
+  for line_number, line in enumerate(lines, 1):
+    if not line.strip() or line.lstrip().startswith('#'):
+      continue
+    try:
+      yield parse_hand(line)
+    except ValueError as e:
+      yield _InvalidHand(line.split('|')[0].strip() or f'line {line_number}', str(e))
+
+
+def _parse_cards(cards: str) -> List[Card]:
+  parsed_cards = []
+  for c in cards.replace(',', ' ').split():
+    try:
+      parsed_cards.append(parse(c))
+    except (IndexError, KeyError, StopIteration):
+      raise ValueError(f'Invalid card: {c}') from None
+  return parsed_cards
+
+
+def _list_situations(hand: Hand, streets: Sequence[str]) -> Iterator[Tuple[str, _Situation]]:
+  'Lists the situation on each of the streets the hand reached and on the street of the all in.'
+  hole_cards = tuple(card_to_int(c) for c in hand.hole_cards)
+  community_cards = tuple(card_to_int(c) for c in hand.community_cards)
+  for street, num_cards in STREETS.items():
+    if num_cards <= len(community_cards) and (street in streets or street == hand.all_in_street):
+      yield street, (hole_cards, community_cards[:num_cards])
+
+
+def _analyze_chunk(
+    chunk: Sequence[Union[Hand, _InvalidHand]], against: Optional[Opponent],
+    engine: EquityEngine, streets: Sequence[str]) -> List[Dict[str, Any]]:
+  # The chances (or the error) in each situation of the chunk by its key. The situations are keyed
+  # by `situation_key`, or by their cards if the opponent can't be cached.
+  chances: Dict[Any, Union[float, str]] = {}
+  to_compute: Dict[Any, _Situation] = {}
+  for hand in chunk:
+    if isinstance(hand, _InvalidHand):
+      continue
+    for _, situation in _list_situations(hand, streets):
+      key: Any = situation_key(*situation, against) or situation
+      if key in chances or key in to_compute:
+        continue
+      cached = engine.cache.get(key) if engine.cache is not None and isinstance(key, str) else None
+      if cached is None:
+        to_compute[key] = situation
+      else:
+        chances[key] = cached
+
+  if to_compute:
+    situations = list(to_compute.items())
+    tasks = [
+        (against, situations[i:i + _SITUATIONS_PER_TASK])
+        for i in range(0, len(situations), _SITUATIONS_PER_TASK)]
+    for computed in engine.map_unordered(_compute_situations, tasks):
+      for key, value in computed:
+        chances[key] = value
+        if engine.cache is not None and isinstance(key, str) and isinstance(value, float):
+          engine.cache.put(key, value)
+
+  results = []
+  for hand in chunk:
+    if isinstance(hand, _InvalidHand):
+      results.append({'id': hand.id, 'error': hand.error})
+      continue
+    street_chances = {}
+    error = None
+    for street, situation in _list_situations(hand, streets):
+      value = chances[situation_key(*situation, against) or situation]
+      if isinstance(value, str):
+        error = value
+        break
+      street_chances[street] = value
+    if error is not None:
+      results.append({'id': hand.id, 'error': error})
+      continue
+    result: Dict[str, Any] = {
+        'id': hand.id,
+        'chances': {street: c for street, c in street_chances.items() if street in streets}}
+    if hand.all_in_street is not None:
+      result['all_in_chances'] = street_chances[hand.all_in_street]
+    results.append(result)
+  return results
+
+
+def _compute_situations(
+    task: Tuple[Optional[Opponent], List[Tuple[Any, _Situation]]]
+) -> List[Tuple[Any, Union[float, str]]]:
+  '''Computes the chances in each situation of the task in the worker process (or the error that
+  prevented computing them).
+  '''
+  against, situations = task
+  results: List[Tuple[Any, Union[float, str]]] = []
+  for key, (hole_cards, community_cards) in situations:
+    chances = None
+    if not community_cards and against is None:
+      chances = preflop_table.lookup(hole_cards)
+    try:
+      if chances is None:
+        chances = compute_by_enumeration(
+            hole_cards, community_cards, against, num_processes=1, in_process=True)
+      results.append((key, chances))
+    except OpponentError as e:
+      results.append((key, str(e)))
+  return results
+
+
+def _count_results(path: str) -> int:
+  '''Returns the number of complete lines in the file, removing its last line if it was only
+  partially written.
+  '''
+  num_lines = 0
+  end_of_last_line = 0
+  with open(path, 'rb+') as f:
+    for line in f:
+      if not line.endswith(b'\n'):
+        break
+      num_lines += 1
+      end_of_last_line += len(line)
+    f.truncate(end_of_last_line)
+  return num_lines
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+  parser.add_argument(
+      'hand_history', help='The file of the hand history (or - to read the standard input).')
+  parser.add_argument(
+      '--output', help='The file the results are written to (by default the standard output). ' +
+      'If it exists, then the hands already in it are skipped.')
+  parser.add_argument(
+      '--no_resume', action='store_true',
+      help='Overwrites the output instead of skipping the hands already in it.')
+  parser.add_argument('--range', help='The range of the opponent (see hand_range).')
+  parser.add_argument(
+      '--streets', nargs='+', choices=list(STREETS),
+      help='The streets to compute the chances on (by default every street, except preflop with ' +
+      'a --range).')
+  parser.add_argument(
+      '--processes', type=int, help='The number of worker processes (by default the number of ' +
+      'CPUs).')
+  parser.add_argument(
+      '--chunk_size', type=int, default=10000, help='The number of hands read at once.')
+  parser.add_argument('--cache', help='The path of an sqlite database to cache the results in.')
+  parsed_args = parser.parse_args(args)
+
+  against = None
+  if parsed_args.range:
+    # Imported here so that analyses without a range start faster.
+    from texas_holdem.hand_range import HandRange
+    against = HandRange.parse(parsed_args.range)
+  cache = ResultCache(path=parsed_args.cache) if parsed_args.cache else ResultCache()
+  try:
+    with EquityEngine(parsed_args.processes, cache) as engine:
+      if parsed_args.output is None:
+        with _open_hand_history(parsed_args.hand_history) as lines:
+          num_failed = analyze(
+              lines, sys.stdout, against, engine, parsed_args.chunk_size,
+              streets=parsed_args.streets)
+      else:
+        num_failed = analyze_file(
+            parsed_args.hand_history, parsed_args.output, against, engine, parsed_args.chunk_size,
+            resume=not parsed_args.no_resume, streets=parsed_args.streets)
+  finally:
+    cache.close()
+  return 1 if num_failed else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
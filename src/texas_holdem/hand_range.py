@@ -0,0 +1,203 @@
+'''Ranges of hole cards written in the usual poker notation, e.g. "TT+, AJs+, KQo, 76s".
+
+A range assigns a weight to each of the 1326 possible hole cards (combos), stored in a fixed size
+vector, so it can be used as an `Opponent` (e.g. `compute(..., against=HandRange.parse('TT+'))`)
+without calling back into Python code for each hole cards.
+
+Notation
+--------
+
+The ranks are denoted by 2-9, T, J, Q, K and A and the suits by c, h, d and s. The range is a
+comma or space separated list of the following items:
+
+    AA          A pair (all its 6 combos).
+    TT+         A pair and every higher pair.
+    TT-77       The pairs between the two, inclusive.
+    AKs, AKo    Suited (4 combos) or offsuit (12 combos) hole cards of the two ranks.
+    AK          Both suited and offsuit (16 combos).
+    AJs+        The hole cards of the higher rank with the lower rank or anything above it, below
+                the higher rank (AJs, AQs and AKs).
+    KTo-K7o     The hole cards of the higher rank with the lower ranks between the two, inclusive.
+    AsKs        A single combo.
+
+Any item can be followed by ":<weight>" (e.g. "AKo:0.5") to give its combos a weight other than 1.
+If a combo is listed multiple times, its last weight is used.
+'''
+import hashlib
+import re
+from array import array
+from itertools import combinations
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from texas_holdem.card import Board, Card, HoleCards, card_to_int, int_to_card
+from texas_holdem.my_chances import Opponent
+
+
+NUM_COMBOS = 52 * 51 // 2
+
+_RANK_ALIASES = '23456789TJQKA'
+_SUIT_ALIASES = 'chds'  # In the order of the suits in the integer encoding of the cards.
+
+
+def combo_index(c1: int, c2: int) -> int:
+  'Returns the index of the (integer encoded) hole cards in the weight vector of the ranges.'
+  low, high = (c1, c2) if c1 < c2 else (c2, c1)
+  return high * (high - 1) // 2 + low
+
+
+# The hole cards in the order of their index.
+COMBOS: List[Tuple[int, int]] = [(c1, c2) for c2 in range(52) for c1 in range(c2)]
+
+
+class HandRange(Opponent):
+  '''Assumes the opponent holds one of the hole cards of the range, proportionally to their weights.
+
+  The weights are stored in `weights`, indexed by `combo_index`. Ranges are combined with the set
+  operators: `|` (union, taking the larger weight), `&` (intersection, taking the smaller weight)
+  and `-` (difference, removing the combos of the right hand side).
+  '''
+  def __init__(self, weights: Optional[Iterable[float]] = None):
+    self.weights = array('d', bytes(8 * NUM_COMBOS) if weights is None else weights)
+    if len(self.weights) != NUM_COMBOS:
+      raise ValueError(f'A range needs {NUM_COMBOS} weights. Got: {len(self.weights)}.')
+    if any(w < 0 for w in self.weights):
+      raise ValueError('The weights of a range need to be non-negative.')
+    # Ranges given by rank classes (e.g. AKs) don't depend on the suits, so they can be computed
+    # faster (see `Opponent`). Equal ranges share the cached results.
+    self.suit_symmetric = _is_suit_symmetric(self.weights)
+    self.cache_key = 'HandRange:' + hashlib.sha1(self.weights.tobytes()).hexdigest()
+    # The weights don't depend on the board, so they are selected from the vector by `compute`.
+    self.combo_weights = self.weights
+
+  @staticmethod
+  def parse(notation: str) -> 'HandRange':
+    'Parses a range written in the notation described in the module documentation.'
+    weights = array('d', bytes(8 * NUM_COMBOS))
+    for item in re.split(r'[,\s]+', notation.strip()):
+      if not item:
+        continue
+      combos_notation, _, weight_notation = item.partition(':')
+      try:
+        weight = float(weight_notation) if weight_notation else 1.0
+      except ValueError:
+        raise ValueError(f'Invalid weight in the range: {item}') from None
+      for c1, c2 in _parse_combos(combos_notation):
+        weights[combo_index(c1, c2)] = weight
+    return HandRange(weights)
+
+  def hole_cards_weight(self, opponents_hole_cards: HoleCards, board: Board) -> float:
+    c1, c2 = (card_to_int(c) for c in opponents_hole_cards)
+    return self.weights[combo_index(c1, c2)]
+
+  def hole_cards_weights(
+      self, board: Sequence[int], holdings: Sequence[Tuple[int, int]]) -> Sequence[float]:
+    weights = self.weights
+    return [weights[combo_index(c1, c2)] for c1, c2 in holdings]
+
+  def remove_cards(self, cards: Iterable[Card]) -> 'HandRange':
+    '''Returns the range without the hole cards containing any of the given cards, e.g. those on
+    the board or in your hand.
+    '''
+    removed = {card_to_int(c) for c in cards}
+    return HandRange(
+        0.0 if c1 in removed or c2 in removed else w for (c1, c2), w in zip(COMBOS, self.weights))
+
+  def combos(self) -> Iterator[Tuple[HoleCards, float]]:
+    'Lists the hole cards in the range (those with positive weight) along with their weights.'
+    for (c1, c2), w in zip(COMBOS, self.weights):
+      if w > 0:
+        yield HoleCards(int_to_card(c1), int_to_card(c2)), w
+
+  def __len__(self) -> int:
+    return sum(1 for w in self.weights if w > 0)
+
+  def __or__(self, other: 'HandRange') -> 'HandRange':
+    return HandRange(max(w1, w2) for w1, w2 in zip(self.weights, other.weights))
+
+  def __and__(self, other: 'HandRange') -> 'HandRange':
+    return HandRange(min(w1, w2) for w1, w2 in zip(self.weights, other.weights))
+
+  def __sub__(self, other: 'HandRange') -> 'HandRange':
+    return HandRange(0.0 if w2 > 0 else w1 for w1, w2 in zip(self.weights, other.weights))
+
+  def __eq__(self, other) -> bool:
+    return isinstance(other, HandRange) and self.weights == other.weights
+
+  def __repr__(self) -> str:
+    return f'HandRange(<{len(self)} combos>)'
+
+
+def _parse_combos(notation: str) -> List[Tuple[int, int]]:
+  '''Lists the (integer encoded) hole cards denoted by an item of the range notation (without the
+  weight).
+  '''
+  match = re.fullmatch(r'([2-9TJQKA])([chds])([2-9TJQKA])([chds])', notation)
+  if match:
+    r1, s1, r2, s2 = match.groups()
+    c1 = 13 * _SUIT_ALIASES.index(s1) + _RANK_ALIASES.index(r1)
+    c2 = 13 * _SUIT_ALIASES.index(s2) + _RANK_ALIASES.index(r2)
+    if c1 == c2:
+      raise ValueError(f'The same card is listed twice in the range: {notation}')
+    return [(c1, c2)]
+
+  match = re.fullmatch(
+      r'([2-9TJQKA])([2-9TJQKA])([so]?)(?:(\+)|-([2-9TJQKA])([2-9TJQKA])([so]?))?', notation)
+  if not match:
+    raise ValueError(f'Invalid item in the range: {notation}')
+  high, low, suitedness, plus, end_high, end_low, end_suitedness = match.groups()
+  high_rank, low_rank = _RANK_ALIASES.index(high), _RANK_ALIASES.index(low)
+  if high_rank < low_rank:
+    high_rank, low_rank = low_rank, high_rank
+
+  if high_rank == low_rank:
+    if suitedness:
+      raise ValueError(f'Pairs cannot be suited or offsuit: {notation}')
+    if plus:
+      pair_ranks = range(low_rank, 13)
+    elif end_high:
+      end_rank = _RANK_ALIASES.index(end_high)
+      if end_high != end_low:
+        raise ValueError(f'A range of pairs should end with a pair: {notation}')
+      pair_ranks = range(min(low_rank, end_rank), max(low_rank, end_rank) + 1)
+    else:
+      pair_ranks = range(low_rank, low_rank + 1)
+    return [combo for rank in pair_ranks for combo in _list_combos(rank, rank, '')]
+
+  if plus:
+    low_ranks = range(low_rank, high_rank)
+  elif end_high:
+    end_high_rank, end_low_rank = _RANK_ALIASES.index(end_high), _RANK_ALIASES.index(end_low)
+    if end_high_rank < end_low_rank:
+      end_high_rank, end_low_rank = end_low_rank, end_high_rank
+    if end_high_rank != high_rank or end_suitedness != suitedness:
+      raise ValueError(
+          f'Both ends of a range should have the same higher rank and suitedness: {notation}')
+    low_ranks = range(min(low_rank, end_low_rank), max(low_rank, end_low_rank) + 1)
+  else:
+    low_ranks = range(low_rank, low_rank + 1)
+  return [combo for rank in low_ranks for combo in _list_combos(high_rank, rank, suitedness)]
+
+
+def _list_combos(rank1: int, rank2: int, suitedness: str) -> List[Tuple[int, int]]:
+  '''Lists the hole cards of the two ranks that are suited ('s'), offsuit ('o') or either ('').'''
+  combos = []
+  for suit1, suit2 in combinations(range(4), 2) if rank1 == rank2 else (
+      (s1, s2) for s1 in range(4) for s2 in range(4)):
+    if (suitedness == 's' and suit1 != suit2) or (suitedness == 'o' and suit1 == suit2):
+      continue
+    combos.append((13 * suit1 + rank1, 13 * suit2 + rank2))
+  return combos
+
+
+def _is_suit_symmetric(weights: Sequence[float]) -> bool:
+  'Checks whether the weights are invariant under the permutations of the suits.'
+  # The transpositions of neighbouring suits generate every permutation of the suits.
+  for suit in range(3):
+    swap = {suit: suit + 1, suit + 1: suit}
+    for (c1, c2), w in zip(COMBOS, weights):
+      s1, s2 = c1 // 13, c2 // 13
+      if s1 in swap or s2 in swap:
+        image = combo_index(13 * swap.get(s1, s1) + c1 % 13, 13 * swap.get(s2, s2) + c2 % 13)
+        if weights[image] != w:
+          return False
+  return True
@@ -0,0 +1,86 @@
+'''Follows a hand from street to street, reusing the work done on the earlier streets.
+
+The boards possible on the turn are a subset of those possible on the flop, and your chances only
+depend on which boards are still possible. So the tracker keeps the number of (weighted) bad cases
+and all the cases for each possible board from its first computation and when more community
+cards are revealed it only sums them over the boards containing those cards.
+
+Usage
+-----
+
+    >>> from texas_holdem.hand_tracker import HandTracker
+    >>> with HandTracker(hole_cards=[S2, DA]) as tracker:
+    ...   tracker.compute([H2, D3, S5])  # Enumerates every board.
+    ...   tracker.compute([H2, D3, S5, C9])  # Reuses the results of the flop.
+    ...   tracker.compute([H2, D3, S5, C9, CA])
+'''
+from typing import Dict, Optional, Sequence, Tuple
+
+from texas_holdem.card import Card, card_to_int, cards_to_mask
+from texas_holdem.engine import EquityEngine
+from texas_holdem.my_chances import Opponent, OpponentError, check_cards
+
+
+class HandTracker:
+  '''Computes your chances (see `my_chances.compute`) with the given hole cards as the community
+  cards are revealed.
+
+  The enumeration runs in the pool of the given `engine`. If no engine is given, then the tracker
+  creates its own one, which is closed by `close` (also called when the tracker is used as a
+  context manager).
+  '''
+  def __init__(
+      self, hole_cards: Sequence[Card], against: Optional[Opponent] = None,
+      engine: Optional[EquityEngine] = None):
+    self.hole_cards = list(hole_cards)
+    self.against = against
+    self._owns_engine = engine is None
+    self._engine = EquityEngine() if engine is None else engine
+    # The bitmask of the community cards the cases were computed or last filtered for.
+    self._community_cards_mask: Optional[int] = None
+    self._cases: Dict[int, Tuple[float, float]] = {}
+
+  def compute(self, community_cards: Sequence[Card]) -> float:
+    '''Returns your chances when the given community cards have been revealed.
+
+    If they contain all the community cards of the previous call, the results of that call are
+    reused. Otherwise (e.g. a new hand is dealt with the same hole cards) every board is
+    enumerated again.
+    '''
+    check_cards(self.hole_cards, community_cards)
+    if not community_cards:
+      return self._engine.compute(self.hole_cards, community_cards, self.against)
+    community_cards_ = tuple(card_to_int(c) for c in community_cards)
+    mask = cards_to_mask(community_cards_)
+    previous_mask = self._community_cards_mask
+    if previous_mask is None or mask & previous_mask != previous_mask:
+      self._cases = self._engine.count_cases_per_board(
+          self.hole_cards, community_cards, self.against)
+    elif mask != previous_mask:
+      self._cases = {
+          board_mask: cases for board_mask, cases in self._cases.items()
+          if board_mask & mask == mask}
+    self._community_cards_mask = mask
+
+    weighted_bad_cases: float = 0
+    weighted_all_cases: float = 0
+    for bad_cases, all_cases in self._cases.values():
+      weighted_bad_cases += bad_cases
+      weighted_all_cases += all_cases
+    if weighted_all_cases == 0:
+      raise OpponentError(
+          'The `hole_cards_weights` method of your `Opponent` instance returns 0 for every ' +
+          'possible hole cards the opponent can have. Change the method so at least one possible ' +
+          'hole cards receive positive weight.')
+    return 1 - weighted_bad_cases / weighted_all_cases
+
+  def close(self):
+    'Closes the engine if it was created by the tracker.'
+    if self._owns_engine:
+      self._engine.close()
+
+  def __enter__(self) -> 'HandTracker':
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
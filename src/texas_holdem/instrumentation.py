@@ -0,0 +1,157 @@
+'''Statistics about where the time of a computation goes.
+
+Pass a `ComputationStats` to `my_chances.compute` (or `engine.EquityEngine.compute`), or give the
+engine a `stats_hook` to receive one after each of its computations. The statistics of the worker
+processes are sent back along with their results and merged into it. Without them, the
+computation runs the same code as before, so there is no overhead when the instrumentation is off.
+
+The phases are timed both in wall clock time and CPU time:
+  - cache, preflop_table: Looking up the result from the cache or the preflop table.
+  - pool_startup: Starting the worker processes (only if they weren't running yet).
+  - tasks: Listing the tasks in the main process (including the weights of an `Opponent` that
+    can't be sent to the worker processes).
+  - pickling: Pickling the tasks in the main process (while measuring their size).
+  - wait: The main process waiting for the results of the workers.
+  - weights, evaluation: Computing the weights of the opponent's hole cards and evaluating the
+    hands in the worker processes, summed over the workers.
+  - worker: The whole tasks in the worker processes, summed over the workers.
+  - total: The whole computation in the main process.
+The phases of the main process overlap as the tasks are sent to the workers by a separate thread.
+
+Usage
+-----
+
+    >>> from texas_holdem.instrumentation import ComputationStats
+    >>> stats = ComputationStats()
+    >>> compute(hole_cards=[S2, DA], community_cards=[H2, D3, S5], against=Cautious(), stats=stats)
+    >>> stats.wall_times['evaluation'], stats.num_boards, stats.hand_ranks[HandRank.FLUSH]
+
+    >>> with EquityEngine(stats_hook=lambda stats: print(stats.as_dict())) as engine:
+    ...   engine.compute(hole_cards=[S2, DA], community_cards=[H2, D3, S5])
+'''
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from texas_holdem import evaluate_hand
+from texas_holdem.evaluate_hand import HandRank
+
+try:
+  import resource
+except ImportError:  # Not available on Windows.
+  resource = None  # type: ignore
+
+
+class ComputationStats:
+  '''Collects the statistics of computations (see the module documentation for the phases).
+
+  Besides the times of the phases, it counts the boards enumerated (`num_boards`), the boards they
+  represent when the boards differing only in the suits are enumerated once
+  (`num_boards_represented`), the opponent's hole cards considered on those boards
+  (`num_holdings`) and the hands evaluated for each `HandRank` (`hand_ranks`). `ipc_bytes_sent` and
+  `ipc_bytes_received` are the sizes of the pickled tasks and results exchanged with the worker
+  processes, and `peak_memory` is the peak resident memory in bytes of each process (keyed by the
+  process id), as far as the platform reports it.
+  '''
+  def __init__(self) -> None:
+    self.wall_times: Dict[str, float] = {}
+    self.cpu_times: Dict[str, float] = {}
+    self.num_boards = 0
+    self.num_boards_represented = 0
+    self.num_holdings = 0
+    self.hand_ranks: Counter = Counter()
+    self.ipc_bytes_sent = 0
+    self.ipc_bytes_received = 0
+    self.peak_memory: Dict[int, int] = {}
+
+  @contextmanager
+  def measure(self, phase: str) -> Iterator[None]:
+    'Adds the time spent in the block to the phase.'
+    wall_time, cpu_time = time.perf_counter(), time.process_time()
+    try:
+      yield
+    finally:
+      self.add_time(phase, time.perf_counter() - wall_time, time.process_time() - cpu_time)
+
+  def add_time(self, phase: str, wall_time: float, cpu_time: float):
+    self.wall_times[phase] = self.wall_times.get(phase, 0.0) + wall_time
+    self.cpu_times[phase] = self.cpu_times.get(phase, 0.0) + cpu_time
+
+  @contextmanager
+  def count_hand_ranks(self) -> Iterator[None]:
+    '''Counts the hands evaluated by `evaluate_hand.evaluate_hole_cards` in this process during the
+    block.
+    '''
+    counts = [0] * (max(HandRank) + 1)
+    evaluate_hand._hand_rank_counts = counts
+    try:
+      yield
+    finally:
+      evaluate_hand._hand_rank_counts = None
+      self.hand_ranks.update({HandRank(i): n for i, n in enumerate(counts) if n})
+
+  def record_peak_memory(self):
+    'Records the peak resident memory of the current process so far.'
+    if resource is None:
+      return
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # It's in bytes on macOS and in kilobytes elsewhere.
+    self.peak_memory[os.getpid()] = max_rss if sys.platform == 'darwin' else 1024 * max_rss
+
+  def merge(self, other: 'ComputationStats'):
+    'Adds the statistics of another computation or worker process to these.'
+    for phase, wall_time in other.wall_times.items():
+      self.add_time(phase, wall_time, other.cpu_times[phase])
+    self.num_boards += other.num_boards
+    self.num_boards_represented += other.num_boards_represented
+    self.num_holdings += other.num_holdings
+    self.hand_ranks.update(other.hand_ranks)
+    self.ipc_bytes_sent += other.ipc_bytes_sent
+    self.ipc_bytes_received += other.ipc_bytes_received
+    for pid, peak_memory in other.peak_memory.items():
+      self.peak_memory[pid] = max(self.peak_memory.get(pid, 0), peak_memory)
+
+  @property
+  def num_hands_evaluated(self) -> int:
+    return sum(self.hand_ranks.values())
+
+  def as_dict(self) -> Dict[str, Any]:
+    'Returns the statistics as a dict that can be serialized as JSON.'
+    return {
+        'wall_times': dict(self.wall_times),
+        'cpu_times': dict(self.cpu_times),
+        'num_boards': self.num_boards,
+        'num_boards_represented': self.num_boards_represented,
+        'num_holdings': self.num_holdings,
+        'num_hands_evaluated': self.num_hands_evaluated,
+        'hand_ranks': {rank.name: n for rank, n in sorted(self.hand_ranks.items())},
+        'ipc_bytes_sent': self.ipc_bytes_sent,
+        'ipc_bytes_received': self.ipc_bytes_received,
+        'peak_memory': {str(pid): peak for pid, peak in self.peak_memory.items()},
+        'max_peak_memory': max(self.peak_memory.values(), default=None),
+    }
+
+  def __repr__(self):
+    return f'ComputationStats({self.as_dict()})'
+
+
+def measure(stats: Optional[ComputationStats], phase: str):
+  'Same as `ComputationStats.measure` but does nothing if there are no stats.'
+  return _NO_MEASUREMENT if stats is None else stats.measure(phase)
+
+
+class _NoMeasurement:
+  'A context manager that does nothing.'
+
+  def __enter__(self):
+    return None
+
+  def __exit__(self, *exc_info):
+    return False
+
+
+_NO_MEASUREMENT = _NoMeasurement()
+
@@ -0,0 +1,170 @@
+'''Estimates your chances by sampling instead of enumerating every case.
+
+Each sample deals the missing community cards and the opponent's hole cards at random and checks
+whether the opponent has a better hand. The estimate comes with its standard error, so the sampling
+can stop as soon as the estimate is accurate enough or the time is up, which makes it usable when
+the exact computation (see `my_chances.compute`) would take too long, e.g. on the flop with
+assumptions about the opponent.
+
+When the samples are drawn by a pool of worker processes, each batch of samples gets its own
+random stream derived from the seed and the index of the batch. The batches are collected in
+order, so the same seed gives the same estimate (unless the sampling is stopped by the time
+budget).
+'''
+import math
+import random
+import time
+from multiprocessing.pool import Pool
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from texas_holdem.card import cards_to_mask, list_remaining_card_ints
+from texas_holdem.evaluate_hand import get_evaluator
+from texas_holdem.my_chances import Opponent, OpponentError, _is_picklable
+
+
+class Estimate(NamedTuple):
+  '''The estimated chances along with the standard error of the estimate and its confidence
+  interval (clipped to [0, 1]).
+  '''
+  chances: float
+  standard_error: float
+  confidence_interval: Tuple[float, float]
+  num_samples: int
+
+
+_SAMPLES_PER_BATCH = 1000
+# The standard error is not trusted to decide whether to stop before this many samples.
+_MIN_SAMPLES = 2 * _SAMPLES_PER_BATCH
+
+
+def estimate_by_sampling(
+    hole_cards: Tuple[int, ...], community_cards: Tuple[int, ...],
+    against: Optional[Opponent] = None, target_error: Optional[float] = None,
+    time_budget: Optional[float] = None, max_samples: int = 1000000, seed: Optional[int] = None,
+    confidence: float = 0.95, pool: Optional[Pool] = None,
+    num_processes: Optional[int] = None, num_opponents: int = 1) -> Estimate:
+  '''Estimates the chances computed by `my_chances.compute`, taking the integer encoding of the
+  cards.
+
+  The sampling stops when the standard error drops to `target_error`, when `time_budget` seconds
+  have passed or when `max_samples` samples have been drawn, whichever comes first.
+
+  Against more than one opponent, each sample deals hole cards to every opponent and it's bad if
+  any of them has a better hand than you. The weight of the sample is the product of the weights
+  of their hole cards.
+
+  The samples are drawn in the given pool (which has `num_processes` processes) or in the current
+  process if no pool is given. An `Opponent` that can't be sent to the worker processes is always
+  sampled in the current process.
+  '''
+  if seed is None:
+    seed = random.randrange(1 << 64)
+  num_batches = -(-max_samples // _SAMPLES_PER_BATCH)
+  tasks = ((hole_cards, community_cards, against, num_opponents, f'{seed}:{i}',
+      min(_SAMPLES_PER_BATCH, max_samples - i * _SAMPLES_PER_BATCH)) for i in range(num_batches))
+  results: Iterable[List[float]]
+  if pool is None or (against is not None and not _is_picklable(against)):
+    results = map(_sample_batch, tasks)
+  else:
+    results = _imap_with_bounded_queue(pool, _sample_batch, tasks, 2 * (num_processes or 1))
+
+  deadline = None if time_budget is None else time.monotonic() + time_budget
+  # The number of samples and the sums of w, w * b, w^2 and w^2 * b over the samples where w is
+  # the weight of the opponent's hole cards and b is 1 if the opponent has a better hand.
+  sums = [0.0] * 5
+  for partial_sums in results:
+    sums = [s + ps for s, ps in zip(sums, partial_sums)]
+    estimate = _estimate(sums, confidence)
+    if target_error is not None and sums[0] >= _MIN_SAMPLES and \
+        estimate.standard_error <= target_error:
+      break
+    if deadline is not None and time.monotonic() >= deadline:
+      break
+  if sums[1] == 0:
+    raise OpponentError(
+        'The `hole_cards_weights` method of your `Opponent` instance returns 0 for every ' +
+        'sampled hole cards of the opponent. Change the method so at least one possible hole ' +
+        'cards receive positive weight.')
+  return _estimate(sums, confidence)
+
+
+def _imap_with_bounded_queue(
+    pool: Pool, func: Callable, tasks: Iterator, max_pending: int) -> Iterator:
+  '''Same as `pool.imap(func, tasks)`, but only submits a new task when a result is taken, so that
+  stopping early leaves at most `max_pending` tasks running in the pool.
+  '''
+  pending = [pool.apply_async(func, (task,)) for task in _take(tasks, max_pending)]
+  while pending:
+    result = pending.pop(0).get()
+    pending.extend(pool.apply_async(func, (task,)) for task in _take(tasks, 1))
+    yield result
+
+
+def _take(iterator: Iterator, n: int) -> List:
+  return [task for _, task in zip(range(n), iterator)]
+
+
+def _sample_batch(task) -> List[float]:
+  'Draws a batch of samples and returns the sums described in `estimate_by_sampling`.'
+  hole_cards, community_cards, against, num_opponents, stream_seed, num_samples = task
+  rng = random.Random(stream_seed)
+  evaluate = get_evaluator()
+  remaining_cards = list_remaining_card_ints(cards_to_mask(hole_cards + community_cards))
+  num_missing_cards = 5 - len(community_cards)
+  sums = [0.0] * 5
+  for _ in range(num_samples):
+    dealt_cards = rng.sample(remaining_cards, num_missing_cards + 2 * num_opponents)
+    board = community_cards + tuple(dealt_cards[:num_missing_cards])
+    opponents_hole_cards = [
+        tuple(sorted(dealt_cards[i:i + 2])) for i in range(num_missing_cards, len(dealt_cards), 2)]
+    my_strength = evaluate((*hole_cards, *board))
+    better = any(my_strength < evaluate((*hc, *board)) for hc in opponents_hole_cards)
+    weight = 1.0
+    if against is not None:
+      for hc, w in zip(opponents_hole_cards,
+          against.hole_cards_weights(board, opponents_hole_cards)):
+        if w < 0:
+          raise OpponentError(
+              'The `hole_cards_weights` method of your `Opponent` instance returns a negative ' +
+              f'weight ({w}) for the hole cards {hc} on the board {board}.')
+        weight *= w
+    sums[0] += 1
+    sums[1] += weight
+    sums[3] += weight * weight
+    if better:
+      sums[2] += weight
+      sums[4] += weight * weight
+  return sums
+
+
+def _estimate(sums: List[float], confidence: float) -> Estimate:
+  'Computes the ratio estimate of the chances and its standard error from the sums.'
+  num_samples, sum_w, sum_wb, sum_ww, sum_wwb = sums
+  if sum_w == 0 or num_samples < 2:
+    return Estimate(math.nan, math.inf, (0.0, 1.0), int(num_samples))
+  # The opponent's chance for a better hand is the ratio of the weighted bad cases and all the
+  # weighted cases. Its variance is approximated using the delta method.
+  ratio = sum_wb / sum_w
+  residual_sum_of_squares = (1 - 2 * ratio) * sum_wwb + ratio * ratio * sum_ww
+  mean_w = sum_w / num_samples
+  variance = residual_sum_of_squares / (num_samples - 1) / num_samples / (mean_w * mean_w)
+  standard_error = math.sqrt(max(variance, 0.0))
+  chances = 1 - ratio
+  half_width = _normal_quantile((1 + confidence) / 2) * standard_error
+  return Estimate(
+      chances=chances,
+      standard_error=standard_error,
+      confidence_interval=(max(0.0, chances - half_width), min(1.0, chances + half_width)),
+      num_samples=int(num_samples))
+
+
+def _normal_quantile(p: float) -> float:
+  'Returns x for which the standard normal distribution function is p (found by bisection).'
+  low, high = -10.0, 10.0
+  for _ in range(100):
+    middle = (low + high) / 2
+    if (1 + math.erf(middle / math.sqrt(2))) / 2 < p:
+      low = middle
+    else:
+      high = middle
+  return (low + high) / 2
@@ -0,0 +1,80 @@
+'''Counts the ways several opponents can hold their hole cards at the same time.
+
+Against more than one opponent your chances on a board are not simply the product of your chances
+against each of them, as they can't hold the same cards (card removal). Instead of enumerating the
+deals of every opponent, the possible hole cards are treated as the edges of a graph on the cards
+and the number of ways to deal them to k opponents is the number of k element sets of pairwise
+disjoint edges (matchings). For k <= 3 these can be counted from a few sums over the edges and the
+cards (see `count_disjoint_holdings`), so the chances against up to `MAX_EXACT_OPPONENTS` opponents
+are computed exactly and sampled otherwise.
+'''
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+MAX_EXACT_OPPONENTS = 3
+
+
+def count_disjoint_holdings(
+    holdings: Sequence[Tuple[int, ...]], num_opponents: int,
+    weights: Optional[Dict[Tuple[int, ...], float]] = None) -> float:
+  '''Returns the number of sets of `num_opponents` pairwise disjoint hole cards from the given
+  ones. If `weights` are given then each set counts as the product of the weights of its hole
+  cards.
+
+  It supports at most `MAX_EXACT_OPPONENTS` opponents.
+  '''
+  if num_opponents > MAX_EXACT_OPPONENTS:
+    raise ValueError(
+        f'Disjoint hole cards can only be counted for at most {MAX_EXACT_OPPONENTS} opponents.')
+  if num_opponents == 0:
+    return 1
+  edge_weights = [1.0] * len(holdings) if weights is None else [weights[hc] for hc in holdings]
+  # The sums of the first three powers of the weights in total and of the hole cards containing
+  # each card.
+  p1, p2, p3 = (sum(w ** i for w in edge_weights) for i in (1, 2, 3))
+  d1: List[float] = [0] * 52
+  d2: List[float] = [0] * 52
+  d3: List[float] = [0] * 52
+  for (c1, c2), w in zip(holdings, edge_weights):
+    for c in (c1, c2):
+      d1[c] += w
+      d2[c] += w * w
+      d3[c] += w * w * w
+  if num_opponents == 1:
+    return p1
+
+  # The pairs of distinct hole cards minus those sharing a card.
+  pairs = (p1 * p1 - p2) / 2
+  pairs_at = [(d1[c] * d1[c] - d2[c]) / 2 for c in range(52)]
+  if num_opponents == 2:
+    return pairs - sum(pairs_at)
+
+  # The triples of distinct hole cards minus those where any two share a card. By inclusion-
+  # exclusion over the pairs sharing a card, that's
+  #   triples - (pairs sharing a card) * (any third one)
+  #   + (paths of 3 hole cards) + 2 * (triangles) + 2 * (3 hole cards sharing a card)
+  # where the number of paths is the number of (hole cards, neighbour on one side, neighbour on the
+  # other side) triples minus 3 * (triangles).
+  triples = (p1 ** 3 - 3 * p1 * p2 + 2 * p3) / 6
+  pairs_sharing_a_card_with_a_third = sum(
+      p1 * pairs_at[c] - (d2[c] * d1[c] - d3[c]) for c in range(52))
+  stars = sum((d1[c] ** 3 - 3 * d1[c] * d2[c] + 2 * d3[c]) / 6 for c in range(52))
+  walks = sum(w * (d1[c1] - w) * (d1[c2] - w) for (c1, c2), w in zip(holdings, edge_weights))
+  triangles = _sum_triangles(holdings, edge_weights)
+  return triples - pairs_sharing_a_card_with_a_third + walks - triangles + 2 * stars
+
+
+def _sum_triangles(holdings: Sequence[Tuple[int, ...]], edge_weights: Sequence[float]) -> float:
+  'Sums the products of the weights of the triangles formed by the hole cards.'
+  neighbours: List[Dict[int, float]] = [{} for _ in range(52)]
+  for (c1, c2), w in zip(holdings, edge_weights):
+    neighbours[c1][c2] = w
+    neighbours[c2][c1] = w
+  total: float = 0
+  for (c1, c2), w in zip(holdings, edge_weights):
+    n1, n2 = neighbours[c1], neighbours[c2]
+    if len(n2) < len(n1):
+      n1, n2 = n2, n1
+    total += w * sum(w1 * n2[c] for c, w1 in n1.items() if c in n2)
+  # Each triangle is counted once for each of its edges.
+  return total / 3
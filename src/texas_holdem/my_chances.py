@@ -1,13 +1,25 @@
 from abc import ABC, abstractmethod
+import atexit
 from functools import reduce
-from multiprocessing import Pool
 import operator as op
-from itertools import combinations
-from statistics import mean
-from typing import Sequence, Tuple, Dict, Optional
+import os
+import pickle
+from itertools import combinations, compress, islice
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, NamedTuple, Sequence, \
+    Tuple, Dict, Optional
 
-from texas_holdem.card import Card, HoleCards, Board, list_remaining_cards
-from texas_holdem.find_better_hole_cards import find_better_hole_cards
+from texas_holdem.card import Card, HoleCards, Board, card_to_int, int_to_card, cards_to_mask, \
+    list_remaining_card_ints
+from texas_holdem.cache import ResultCache, situation_key
+from texas_holdem.evaluate_hand import evaluate_hole_cards, get_evaluator
+from texas_holdem.find_better_hole_cards import count_better_hole_cards, find_better_hole_card_ints
+from texas_holdem.instrumentation import ComputationStats, measure
+from texas_holdem.multiway import count_disjoint_holdings
+from texas_holdem.suit_isomorphism import list_dealt_cards_up_to_suit_permutation
+
+# Imported by the functions starting a pool, so processes that don't need one start faster.
+if TYPE_CHECKING:
+  from multiprocessing.pool import Pool
 
 
 class Opponent(ABC):
@@ -19,11 +31,48 @@ class Opponent(ABC):
   These assumptions can be included in the calculation of your chances against the opponent.
   To do this, subclass this class and overwrite the `hole_cards_weight` method to return a
   non-negative weight representing the assumed likeliness of each scenario.
+
+  If the weights don't change when the suits of the cards are permuted (e.g. they only depend on the
+  rank of the opponent's hand), then set `suit_symmetric` to True. This lets `compute` skip the
+  boards that only differ from an already checked one in the suits, which makes it several times
+  faster.
+
+  The results computed with assumptions are only cached (see `cache.ResultCache`) if `cache_key`
+  is set. Results are reused between `Opponent`s with equal cache keys, so it should identify the
+  assumptions, e.g. the name of the subclass and its parameters.
+
+  `compute` asks for the weights of all the possible hole cards on a board at once through the
+  `hole_cards_weights` method, which calls `hole_cards_weight` for each of them by default.
+  Overwrite it as well if the weights can be computed faster together (e.g. using NumPy).
+
+  If the weights don't depend on the board, then `combo_weights` can be set to the weight of each
+  of the 1326 hole cards instead, indexed by `hand_range.combo_index`. `compute` then selects the
+  weights of the possible hole cards on each board from it without calling back into Python code
+  for each of them (see `hand_range.HandRange`).
   '''
+  suit_symmetric = False
+  cache_key: Optional[str] = None
+  combo_weights: Optional[Sequence[float]] = None
+
   @abstractmethod
   def hole_cards_weight(self, opponents_hole_cards: HoleCards, board: Board) -> float:
     pass
 
+  def hole_cards_weights(
+      self, board: Sequence[int], holdings: Sequence[Tuple[int, int]]) -> Sequence[float]:
+    '''Returns the weight of each of the opponent's possible hole cards on the board.
+
+    The cards are given using their integer encoding (see `card.card_to_int`) and the result can
+    be any sequence of the same length as `holdings` (e.g. a list or a NumPy array).
+    '''
+    board_ = Board(*(int_to_card(c) for c in board))
+    return [self.hole_cards_weight(HoleCards(int_to_card(c1), int_to_card(c2)), board_)
+        for c1, c2 in holdings]
+
+
+class ComputationCancelled(Exception):
+  'The computation was cancelled before it finished.'
+
 
 class OpponentError(Exception):
   def __init__(self, msg):
@@ -33,11 +82,24 @@ class OpponentError(Exception):
     else:
       msg = base_msg + msg
     super().__init__(msg)
+    self._msg = msg
+
+  def __reduce__(self):
+    # Makes sure the message doesn't get prefixed again when the error is passed between processes.
+    return (_rebuild_opponent_error, (self._msg,))
+
+
+def _rebuild_opponent_error(msg: str) -> OpponentError:
+  error = OpponentError(None)
+  error.args = (msg,)
+  error._msg = msg
+  return error
 
 
 def compute(
     hole_cards: Sequence[Card], community_cards: Sequence[Card],
-    against: Optional[Opponent] = None) -> float:
+    against: Optional[Opponent] = None, cache: Optional[ResultCache] = None,
+    stats: Optional[ComputationStats] = None) -> float:
   '''Computes the probabilty that when all 5 community cards are dealt you will have a hand not
   weaker than the player sitting across you.
 
@@ -46,22 +108,191 @@ def compute(
   Knowing your chances against any of your opponets is intuitively also a good heuristic to gauge
   your chances in case of multiple opponents while being much easier to compute compared to the
   probability that none of your opponents having a better hand than you.
+
+  If a `cache` is given then the result is looked up from it or stored in it after computing it.
+  If `stats` are given then the statistics of the computation are added to them (see
+  `instrumentation`).
   '''
+  # Imported here as the engine module builds on this one.
+  from texas_holdem.engine import EquityEngine
+
+  with EquityEngine(cache=cache) as engine:
+    return engine.compute(hole_cards, community_cards, against, stats=stats)
+
+
+async def compute_async(
+    hole_cards: Sequence[Card], community_cards: Sequence[Card],
+    against: Optional[Opponent] = None, cache: Optional[ResultCache] = None) -> float:
+  '''Same as `compute` but it can be awaited without blocking the event loop.
+
+  The chances are computed by an engine shared by the whole process (see `shared_engine`). If the
+  computation is cancelled, then its worker processes stop enumerating the boards as well.
+  '''
+  key = None
+  if cache is not None:
+    key = situation_key(
+        [card_to_int(c) for c in hole_cards], [card_to_int(c) for c in community_cards], against)
+    chances = None if key is None else cache.get(key)
+    if chances is not None:
+      return chances
+  chances = await shared_engine().compute_async(hole_cards, community_cards, against)
+  if cache is not None and key is not None:
+    cache.put(key, chances)
+  return chances
+
+
+async def compute_batch_async(
+    queries: Iterable[Tuple[Sequence[Card], Sequence[Card]]],
+    against: Optional[Opponent] = None) -> List[float]:
+  '''Computes the chances for each (hole cards, community cards) query concurrently using the
+  shared engine (see `engine.EquityEngine.compute_batch_async`).
+  '''
+  return await shared_engine().compute_batch_async(queries, against)
+
+
+_shared_engine = None
+
+
+def shared_engine():
+  '''Returns the `engine.EquityEngine` used by `compute_async`. Its worker processes are started
+  by the first computation and stopped when the process exits.
+  '''
+  # Imported here as the engine module builds on this one.
+  from texas_holdem.engine import EquityEngine
+
+  global _shared_engine
+  if _shared_engine is None:
+    _shared_engine = EquityEngine()
+    atexit.register(_shared_engine.close)
+  return _shared_engine
+
+
+def estimate(
+    hole_cards: Sequence[Card], community_cards: Sequence[Card],
+    against: Optional[Opponent] = None, target_error: Optional[float] = None,
+    time_budget: Optional[float] = None, max_samples: int = 1000000, seed: Optional[int] = None,
+    confidence: float = 0.95):
+  '''Estimates the chances computed by `compute` by sampling the possible cases.
+
+  The sampling stops when the standard error of the estimate drops to `target_error`, when
+  `time_budget` seconds have passed or when `max_samples` samples have been drawn, whichever comes
+  first. The same `seed` gives the same estimate unless the sampling is stopped by the time budget.
+
+  Returns a `monte_carlo.Estimate` containing the estimated chances along with its standard error
+  and its `confidence` level confidence interval.
+  '''
+  # Imported here as the engine module builds on this one.
+  from texas_holdem.engine import EquityEngine
+
+  with EquityEngine() as engine:
+    return engine.estimate(
+        hole_cards, community_cards, against, target_error=target_error, time_budget=time_budget,
+        max_samples=max_samples, seed=seed, confidence=confidence)
+
+
+def compute_anytime(
+    hole_cards: Sequence[Card], community_cards: Sequence[Card],
+    against: Optional[Opponent] = None, time_budget: Optional[float] = None,
+    progress: Optional[Callable] = None, seed: Optional[int] = None, confidence: float = 0.95,
+    cache: Optional[ResultCache] = None):
+  '''Same as `compute`, but the computation can be bounded by `time_budget` seconds and followed
+  by a `progress` callback.
+
+  The boards are enumerated in a random order (determined by the `seed`), so the chances computed
+  from the boards enumerated before the time is up are an unbiased estimate of your chances.
+  Returns an `anytime.PartialChances` containing them along with their standard error, their
+  `confidence` level confidence interval and the fraction of the boards enumerated. The
+  `progress` callback is called with the same after each block of boards.
+  '''
+  # Imported here as the engine module builds on this one.
+  from texas_holdem.engine import EquityEngine
+
+  with EquityEngine(cache=cache) as engine:
+    return engine.compute_anytime(
+        hole_cards, community_cards, against, time_budget=time_budget, progress=progress,
+        seed=seed, confidence=confidence)
+
+
+def compute_multiway(
+    hole_cards: Sequence[Card], community_cards: Sequence[Card], num_opponents: int,
+    against: Optional[Opponent] = None, target_error: Optional[float] = None,
+    time_budget: Optional[float] = None, max_samples: int = 1000000, seed: Optional[int] = None,
+    confidence: float = 0.95):
+  '''Computes the probability that when all 5 community cards are dealt none of `num_opponents`
+  opponents has a better hand than you, taking into account that they can't hold the same cards.
+
+  It's computed exactly when it's tractable (see `engine.EquityEngine.compute_multiway`) and
+  estimated by sampling otherwise (see `estimate`). Returns a `monte_carlo.Estimate`, whose error
+  is zero when it's computed exactly.
+  '''
+  # Imported here as the engine module builds on this one.
+  from texas_holdem.engine import EquityEngine
+
+  with EquityEngine() as engine:
+    return engine.compute_multiway(
+        hole_cards, community_cards, num_opponents, against, target_error=target_error,
+        time_budget=time_budget, max_samples=max_samples, seed=seed, confidence=confidence)
+
+
+def check_cards(hole_cards: Sequence[Card], community_cards: Sequence[Card]):
   assert len(hole_cards) == 2, f'Needs exactly 2 hole cards. Got: {len(hole_cards)}.'
   assert len(community_cards) in (0, 3, 4, 5), (
       f'There can be either 0, 3, 4 or 5 community cards revealed. Got: {len(community_cards)}.')
-  hole_cards_ = HoleCards(*hole_cards)
-  community_cards_ = tuple(community_cards)
-  possible_boards = _list_possible_boards(hole_cards_, community_cards_)
 
-  worker_args = ((hole_cards_, board, _compute_weights(hole_cards_, board, against))
-      for board in possible_boards)
 
-  with Pool() as p:
-    partition_results = p.starmap(worker, worker_args)
+# The deals of the missing community cards are split into this many shards per worker process.
+# Each shard is a single task for the pool, so there are only a handful of tasks while the work can
+# still be balanced between the processes.
+_SHARDS_PER_PROCESS = 4
+# The number of boards sent in a single task when the workers can't enumerate the boards themselves.
+_BOARDS_PER_TASK = 1000
 
-  weighted_bad_cases = sum(r['bad'] for r in partition_results)
-  weighted_all_cases = sum(r['all'] for r in partition_results)
+
+def compute_by_enumeration(
+    hole_cards: Tuple[int, ...], community_cards: Tuple[int, ...],
+    against: Optional[Opponent] = None, pool: Optional['Pool'] = None,
+    num_processes: Optional[int] = None, num_opponents: int = 1,
+    cancellation: Optional[Tuple[Any, int]] = None,
+    stats: Optional[ComputationStats] = None, in_process: bool = False) -> float:
+  '''Same as `compute` but takes the integer encoding of the cards and always enumerates all the
+  possible cases instead of using precomputed results.
+
+  Against more than one opponent it returns the chances that none of them have a better hand than
+  you (see `multiway`).
+
+  The work is distributed among the processes of the pool. If it's not given, then a new pool is
+  created for the computation. `num_processes` is the number of processes in the pool (by default
+  the number of CPUs). On the river the single board is evaluated in the current process instead,
+  as sending it to a worker process would take longer. With `in_process` every board is evaluated
+  in the current process (e.g. when it's a worker process computing many situations itself).
+
+  Instead of sending each board to the workers, the boards are split into a few shards that the
+  workers enumerate themselves and they only send back the sums of the cases of their shard.
+
+  The computation can be cancelled if the processes of the pool were initialized by
+  `_init_worker` with a shared array of flags: `cancellation` is that array and the index of the
+  flag of this computation. Once the flag is set, the workers stop enumerating their boards and
+  `ComputationCancelled` is raised.
+
+  If `stats` are given then the statistics of the workers are sent back along with their results
+  and added to them (see `instrumentation`).
+  '''
+  tasks = _list_tasks(
+      hole_cards, community_cards, against, num_processes or os.cpu_count() or 1, num_opponents,
+      cancellation=cancellation)
+  if in_process or len(community_cards) == 5:
+    weighted_bad_cases, weighted_all_cases = _run_tasks(map, tasks, stats)
+  elif pool is None:
+    from multiprocessing.pool import Pool
+    # Build the evaluator's tables before forking so the workers don't need to build their own.
+    get_evaluator()
+    with Pool(num_processes) as p:
+      weighted_bad_cases, weighted_all_cases = _run_tasks(p.imap_unordered, tasks, stats)
+  else:
+    weighted_bad_cases, weighted_all_cases = _run_tasks(pool.imap_unordered, tasks, stats)
+
+  if cancellation is not None and _is_cancelled(*cancellation):
+    raise ComputationCancelled('The computation was cancelled.')
   if weighted_all_cases == 0:
     raise OpponentError(
         'The `hole_cards_weights` method of your `Opponent` instance returns 0 for every possible ' +
@@ -72,49 +303,405 @@ def compute(
   return  1 - opp_chance_for_better_hole_cards
 
 
-def worker(hole_cards: HoleCards, board: Board, weights: Optional[Dict[HoleCards, int]]):
-  better_hole_cards = find_better_hole_cards(hole_cards, board)
-  if weights is None:
-    weighted_bad_cases = len(better_hole_cards)
-    weighted_all_cases = n_choose_m(45, 2)
+def count_cases_per_board(
+    hole_cards: Tuple[int, ...], community_cards: Tuple[int, ...],
+    against: Optional[Opponent] = None, pool: Optional['Pool'] = None,
+    num_processes: Optional[int] = None) -> Dict[int, Tuple[float, float]]:
+  '''Same as `compute_by_enumeration` but instead of summing them, it returns the weighted bad
+  cases and all the cases for each possible board, keyed by the bitmask of the board.
+
+  Every board is checked (even those that only differ in the suits), so the results can be reused
+  once more community cards are revealed (see `hand_tracker`).
+  '''
+  tasks = _list_tasks(
+      hole_cards, community_cards, against, num_processes or os.cpu_count() or 1,
+      use_suit_isomorphism=False)
+  if pool is None:
+    from multiprocessing.pool import Pool
+    get_evaluator()
+    with Pool(num_processes) as p:
+      results = list(p.imap_unordered(_run_task_per_board, tasks))
+  else:
+    results = list(pool.imap_unordered(_run_task_per_board, tasks))
+  return {board_mask: cases for result in results for board_mask, cases in result}
+
+
+def _list_tasks(
+    hole_cards: Tuple[int, ...], community_cards: Tuple[int, ...], against: Optional[Opponent],
+    num_processes: int, num_opponents: int = 1, use_suit_isomorphism: Optional[bool] = None,
+    cancellation: Optional[Tuple[Any, int]] = None) -> Iterator[Tuple[Any, ...]]:
+  '''Lists the arguments of `_run_task` that cover all the possible boards.
+
+  If the opponent can't be sent to the worker processes (e.g. its class is defined inside a
+  function), then the weights are computed here and sent along with the boards instead.
+  By default, suit isomorphism is used whenever the assumptions allow it.
+  The tasks end with the index of the cancellation flag (see `compute_by_enumeration`) or None.
+  '''
+  if use_suit_isomorphism is None:
+    use_suit_isomorphism = against is None or against.suit_symmetric
+  cancel_index = None if cancellation is None else cancellation[1]
+  if against is None or _is_picklable(against):
+    num_remaining_cards = 52 - len(hole_cards) - len(community_cards)
+    num_deals = n_choose_m(num_remaining_cards, 5 - len(community_cards))
+    num_shards = min(num_deals, _SHARDS_PER_PROCESS * num_processes)
+    for shard_index in range(num_shards):
+      yield (
+          'shard', num_opponents, hole_cards, community_cards, against, use_suit_isomorphism,
+          (shard_index, num_shards), cancel_index)
+  else:
+    boards = ((board, _compute_weights(hole_cards, board, against), num_boards)
+        for board, num_boards in _list_possible_boards(
+          hole_cards, community_cards, use_suit_isomorphism))
+    for chunk in _split(boards, _BOARDS_PER_TASK):
+      if cancellation is not None and _is_cancelled(*cancellation):
+        return
+      yield ('boards', num_opponents, hole_cards, chunk, cancel_index)
+
+
+def _run_tasks(
+    map_: Callable[[Callable, Iterable], Iterable], tasks: Iterator[Tuple[Any, ...]],
+    stats: Optional[ComputationStats]) -> Tuple[float, float]:
+  '''Runs the tasks with the map function (e.g. the `imap_unordered` method of a pool) and returns
+  the sums of their results.
+  '''
+  if stats is None:
+    return _sum_cases(map_(_run_task, tasks))
+  results = []
+  with stats.measure('wait'):
+    for result, worker_stats in map_(_run_instrumented_task, _instrument_tasks(tasks, stats)):
+      results.append(result)
+      stats.merge(worker_stats)
+  return _sum_cases(results)
+
+
+def _instrument_tasks(
+    tasks: Iterator[Tuple[Any, ...]], stats: ComputationStats) -> Iterator[Tuple[Any, ...]]:
+  'Measures the time taken to list and pickle the tasks and their size.'
+  while True:
+    with stats.measure('tasks'):
+      task = next(tasks, None)
+    if task is None:
+      return
+    with stats.measure('pickling'):
+      stats.ipc_bytes_sent += len(pickle.dumps(task))
+    yield task
+
+
+def _run_task(
+    task: Tuple[Any, ...], stats: Optional[ComputationStats] = None) -> Tuple[float, float]:
+  '''Returns the sums of the weighted bad cases and all the cases over the boards of the task.'''
+  weighted_bad_cases: float = 0
+  weighted_all_cases: float = 0
+  for _, result in _list_task_results(task, stats):
+    weighted_bad_cases += result['bad']
+    weighted_all_cases += result['all']
+  return weighted_bad_cases, weighted_all_cases
+
+
+def _run_instrumented_task(
+    task: Tuple[Any, ...]) -> Tuple[Tuple[float, float], ComputationStats]:
+  'Same as `_run_task` but also returns the statistics of the task.'
+  stats = ComputationStats()
+  with stats.measure('worker'), stats.count_hand_ranks():
+    result = _run_task(task, stats)
+  stats.ipc_bytes_received += len(pickle.dumps(result))
+  stats.record_peak_memory()
+  return result, stats
+
+
+def _run_task_per_board(task: Tuple[Any, ...]) -> List[Tuple[int, Tuple[float, float]]]:
+  '''Returns the weighted bad cases and all the cases for each board of the task.'''
+  return [(cards_to_mask(board), (result['bad'], result['all']))
+      for board, result in _list_task_results(task)]
+
+
+def _list_task_results(
+    task: Tuple[Any, ...], stats: Optional[ComputationStats] = None
+) -> Iterator[Tuple[Tuple[int, ...], Dict[str, float]]]:
+  if task[0] == 'shard':
+    (_, num_opponents, hole_cards, community_cards, against, use_suit_isomorphism, shard,
+        cancel_index) = task
+    if stats is not None:
+      yield from _list_instrumented_results(
+          hole_cards, ((board, None, num_boards) for board, num_boards in _list_possible_boards(
+            hole_cards, community_cards, use_suit_isomorphism, shard)),
+          against, num_opponents, cancel_index, stats)
+      return
+    boards: Iterable = ((board, _compute_weights(hole_cards, board, against), num_boards)
+        for board, num_boards in _list_possible_boards(
+          hole_cards, community_cards, use_suit_isomorphism, shard))
   else:
-    weighted_bad_cases = sum(weights[hc] for hc in better_hole_cards)
-    weighted_all_cases = sum(weights.values())
-  return {'bad': weighted_bad_cases, 'all': weighted_all_cases}
+    _, num_opponents, hole_cards, boards, cancel_index = task
+    if stats is not None:
+      yield from _list_instrumented_results(
+          hole_cards, boards, None, num_opponents, cancel_index, stats)
+      return
+  for board, weights, num_boards in boards:
+    if cancel_index is not None and _is_cancelled(_cancel_flags, cancel_index):
+      return
+    yield board, worker(hole_cards, board, weights, num_boards, num_opponents)
+
+
+def _list_instrumented_results(
+    hole_cards: Tuple[int, ...], boards: Iterable[Tuple[Any, ...]], against: Optional[Opponent],
+    num_opponents: int, cancel_index: Optional[int], stats: ComputationStats
+) -> Iterator[Tuple[Tuple[int, ...], Dict[str, float]]]:
+  '''Same as the loop of `_list_task_results` but measures its phases. If the opponent is given,
+  then the weights of the boards are computed here.
+  '''
+  for board, weights, num_boards in boards:
+    if cancel_index is not None and _is_cancelled(_cancel_flags, cancel_index):
+      return
+    if against is not None:
+      with stats.measure('weights'):
+        weights = _compute_weights(hole_cards, board, against)
+    with stats.measure('evaluation'):
+      result = worker(hole_cards, board, weights, num_boards, num_opponents)
+    stats.num_boards += 1
+    stats.num_boards_represented += num_boards
+    stats.num_holdings += (
+        n_choose_m(52 - len(hole_cards) - len(board), 2) if weights is None else len(weights[0]))
+    yield board, result
 
 
-def _compute_weights(hole_cards: HoleCards, board: Board, opp=None):
+# The flags of the cancellable computations, shared by the process that started the worker
+# processes (see `_init_worker`).
+_cancel_flags = None
+
+
+def _init_worker(cancel_flags):
+  'Initializes a worker process of a pool, so that it can stop cancelled computations.'
+  global _cancel_flags
+  _cancel_flags = cancel_flags
+
+
+def _is_cancelled(cancel_flags, cancel_index: int) -> bool:
+  return cancel_flags is not None and bool(cancel_flags[cancel_index])
+
+
+def _sum_cases(results: Iterable[Tuple[float, float]]) -> Tuple[float, float]:
+  weighted_bad_cases: float = 0
+  weighted_all_cases: float = 0
+  for bad_cases, all_cases in results:
+    weighted_bad_cases += bad_cases
+    weighted_all_cases += all_cases
+  return weighted_bad_cases, weighted_all_cases
+
+
+def _is_picklable(obj) -> bool:
+  try:
+    pickle.dumps(obj)
+    return True
+  except (pickle.PicklingError, AttributeError, TypeError):
+    return False
+
+
+def _split(iterable: Iterable, size: int) -> Iterator[List]:
+  iterator = iter(iterable)
+  chunk = list(islice(iterator, size))
+  while chunk:
+    yield chunk
+    chunk = list(islice(iterator, size))
+
+
+def worker(
+    hole_cards: Tuple[int, ...], board: Tuple[int, ...], weights: Optional['_Weights'],
+    num_boards: int = 1, num_opponents: int = 1):
+  '''Counts the (weighted) cases where the opponent has a better hand on the given board.
+
+  The cards are passed using their integer encoding (see `card.card_to_int`) and the weights
+  are the opponent's possible hole cards (each in increasing order) with the weight of each of
+  them, as returned by `_compute_weights`.
+  `num_boards` is the number of boards the given board represents, i.e. the number of boards
+  that only differ from it in the suits (see `suit_isomorphism`).
+
+  With more than one opponent, a case is a set of hole cards for each opponent and it's bad if any
+  of them has a better hand than you.
+  '''
+  weighted_bad_cases: float
+  weighted_all_cases: float
+  if num_opponents > 1:
+    all_hole_cards = list(_list_possible_opp_hole_cards(hole_cards, board))
+    better_hole_cards_set = set(find_better_hole_card_ints(hole_cards, board))
+    not_better_hole_cards = [hc for hc in all_hole_cards if hc not in better_hole_cards_set]
+    weights_by_hole_cards: Optional[Dict[Tuple[int, ...], float]] = None
+    if weights is None:
+      # Any hole cards can be dealt, so it's the number of ways to deal them from 45 cards.
+      weighted_all_cases = reduce(
+          op.mul, (n_choose_m(45 - 2 * i, 2) for i in range(num_opponents)), 1
+      ) // reduce(op.mul, range(1, num_opponents + 1), 1)
+    else:
+      holdings, holding_weights = weights
+      weights_by_hole_cards = dict(zip(
+          holdings,
+          holding_weights.tolist() if _is_array(holding_weights) else holding_weights))
+      weighted_all_cases = count_disjoint_holdings(
+          all_hole_cards, num_opponents, weights_by_hole_cards)
+    weighted_bad_cases = weighted_all_cases - count_disjoint_holdings(
+        not_better_hole_cards, num_opponents, weights_by_hole_cards)
+  elif weights is None:
+    # Only the number of better hole cards is needed, not the hole cards themselves.
+    counts = count_better_hole_cards(hole_cards, board)
+    weighted_bad_cases = counts.better
+    weighted_all_cases = sum(counts)
+  else:
+    weighted_bad_cases, weighted_all_cases = _count_weighted_cases(hole_cards, board, *weights)
+  return {'bad': num_boards * weighted_bad_cases, 'all': num_boards * weighted_all_cases}
+
+
+def _count_weighted_cases(
+    hole_cards: Tuple[int, ...], board: Tuple[int, ...], holdings: List[Tuple[int, int]],
+    weights: Any) -> Tuple[float, float]:
+  '''Returns the weighted number of the opponent's hole cards that are better than yours and of all
+  of them. NumPy arrays of weights are summed and filtered without a loop over the hole cards.
+  '''
+  if _is_array(weights):
+    weighted_all_cases = float(weights.sum())
+  else:
+    weighted_all_cases = sum(weights)
+  if weighted_all_cases == 0:
+    # No hole cards are possible on this board (`OpponentError` is raised if that's so on all of
+    # them).
+    return 0, 0
+  # Only the hole cards with positive weight are evaluated, e.g. those in a narrow range.
+  if _is_array(weights):
+    held_indices = (weights > 0).nonzero()[0].tolist()
+  else:
+    held_indices = [i for i, w in enumerate(weights) if w > 0]
+  my_strength, *strengths = evaluate_hole_cards(
+      board, [(hole_cards[0], hole_cards[1]), *(holdings[i] for i in held_indices)])
+  better_indices = [i for i, strength in zip(held_indices, strengths) if my_strength < strength]
+  if _is_array(weights):
+    weighted_bad_cases = float(weights[better_indices].sum())
+  else:
+    weighted_bad_cases = sum(weights[i] for i in better_indices)
+  return weighted_bad_cases, weighted_all_cases
+
+
+# The opponent's possible hole cards and their weights, as a list or a NumPy array.
+_Weights = Tuple[List[Tuple[int, int]], Any]
+
+
+def _compute_weights(
+    hole_cards: Tuple[int, ...], board: Tuple[int, ...], opp=None) -> Optional[_Weights]:
+  '''Returns the opponent's possible hole cards on the board with their weights. The weights are
+  kept as a NumPy array if `hole_cards_weights` returns one, and they are validated without a loop
+  over the hole cards then.
+  '''
   if opp is None:
-    return
-  weights = {hc: opp.hole_cards_weight(hc, board) for hc
-      in _list_possible_opp_hole_cards(hole_cards, board)}
-  negative_weights = {hc: w for hc, w in weights.items() if w < 0}
-  if len(negative_weights) > 0:
+    return None
+  holdings: List[Tuple[int, int]] = list(_list_possible_opp_hole_cards(hole_cards, board))
+  weights: Any
+  if opp.combo_weights is not None:
+    weights = _select_combo_weights(opp.combo_weights, hole_cards + board)
+  else:
+    weights = opp.hole_cards_weights(board, holdings)
+  if not _is_array(weights):
+    weights = list(weights)
+  if len(weights) != len(holdings):
+    raise OpponentError(
+        f'The `hole_cards_weights` method of your `Opponent` instance returns {len(weights)} ' +
+        f'weights for {len(holdings)} hole cards.')
+  if _is_array(weights):
+    has_negative_weights = bool((weights < 0).any())
+  else:
+    has_negative_weights = bool(holdings) and min(weights) < 0
+  if has_negative_weights:
     msg = (
         'The `hole_cards_weights` method of your `Opponent` instance returns negative weights for ' +
         'the following hole cards:\n')
-    for hc, w in negative_weights.items():
-      msg += f'  {hc}: {w}\n'
+    for hc, w in zip(holdings, weights):
+      if w < 0:
+        msg += f'  {HoleCards(int_to_card(hc[0]), int_to_card(hc[1]))}: {w}\n'
     raise OpponentError(msg)
-  return weights
+  return holdings, weights
 
 
-def _list_possible_opp_hole_cards(hole_cards: HoleCards, board: Board):
-  cards_seen = hole_cards + board
-  remaining_cards = list_remaining_cards(cards_seen)
-  return (HoleCards(*c) for c in combinations(remaining_cards, 2))
+class _PairTables(NamedTuple):
+  '''Tables for selecting the weights of the possible hole cards from `Opponent.combo_weights`.
 
+  order: Lists the weights in the order of `itertools.combinations` of the cards.
+  all_pairs: A byte set to 1 for each of the 1326 pairs of cards (in the order of
+    `itertools.combinations`) as an integer, so it can be combined with bitwise operators.
+  pairs_with_card: The same for the pairs containing each of the cards.
+  '''
+  order: Callable[[Sequence[float]], Tuple[float, ...]]
+  all_pairs: int
+  pairs_with_card: List[int]
+
+
+_pair_tables: Optional[_PairTables] = None
+# The last `Opponent.combo_weights` selected from and its weights ordered by `_PairTables.order`.
+_pair_ordered_weights: Optional[Tuple[Sequence[float], Tuple[float, ...]]] = None
+
+
+def _select_combo_weights(
+    combo_weights: Sequence[float], dead_cards: Tuple[int, ...]) -> List[float]:
+  '''Returns the weights of the hole cards that don't contain any of the dead cards, in the order
+  of `_list_possible_opp_hole_cards`.
+  '''
+  global _pair_ordered_weights
+  tables = _get_pair_tables()
+  if _pair_ordered_weights is None or _pair_ordered_weights[0] is not combo_weights:
+    # Ordered once for each `Opponent` (e.g. for each task sent to a worker process) instead of
+    # once for each board.
+    _pair_ordered_weights = (combo_weights, tables.order(combo_weights))
+  pair_ordered_weights = _pair_ordered_weights[1]
+  dead_pairs = 0
+  for c in dead_cards:
+    dead_pairs |= tables.pairs_with_card[c]
+  selectors = (tables.all_pairs & ~dead_pairs).to_bytes(len(pair_ordered_weights), 'little')
+  return list(compress(pair_ordered_weights, selectors))
+
+
+def _get_pair_tables() -> _PairTables:
+  global _pair_tables
+  if _pair_tables is None:
+    pairs = list(combinations(range(52), 2))
+    pairs_with_card = []
+    for card in range(52):
+      selectors = bytes(card in pair for pair in pairs)
+      pairs_with_card.append(int.from_bytes(selectors, 'little'))
+    _pair_tables = _PairTables(
+        op.itemgetter(*(c2 * (c2 - 1) // 2 + c1 for c1, c2 in pairs)),
+        int.from_bytes(bytes([1] * len(pairs)), 'little'), pairs_with_card)
+  return _pair_tables
 
-def _list_possible_boards(hole_cards, community_cards):
-  cards_seen = hole_cards + community_cards
-  remaining_cards = list_remaining_cards(cards_seen)
+
+def _is_array(weights) -> bool:
+  'Whether the weights are a NumPy array (NumPy is only imported by the `Opponent`s using it).'
+  return hasattr(weights, 'dtype')
+
+
+def _list_possible_opp_hole_cards(hole_cards: Tuple[int, ...], board: Tuple[int, ...]):
+  remaining_cards = list_remaining_card_ints(cards_to_mask(hole_cards + board))
+  return combinations(remaining_cards, 2)
+
+
+def _list_possible_boards(
+    hole_cards: Tuple[int, ...], community_cards: Tuple[int, ...], use_suit_isomorphism: bool,
+    shard: Tuple[int, int] = (0, 1)):
+  '''Lists the possible boards along with the number of boards each of them represents.
+
+  If `use_suit_isomorphism` is set, then only one board is listed from the boards that only differ
+  in the suits of the cards in a way that doesn't change your or your opponent's chances.
+  The boards can be restricted to a shard of them (see
+  `suit_isomorphism.list_dealt_cards_up_to_suit_permutation`).
+  '''
   num_missing_cards = 5 - len(community_cards)
-  return (Board(*(community_cards + cards))
-      for cards in combinations(remaining_cards, num_missing_cards))
+  if use_suit_isomorphism:
+    dealt_cards = list_dealt_cards_up_to_suit_permutation(
+        [hole_cards, community_cards], num_missing_cards, shard)
+  else:
+    remaining_cards = list_remaining_card_ints(cards_to_mask(hole_cards + community_cards))
+    shard_index, num_shards = shard
+    dealt_cards = ((cards, 1) for cards in islice(
+        combinations(remaining_cards, num_missing_cards), shard_index, None, num_shards))
+  return ((community_cards + cards, num_boards) for cards, num_boards in dealt_cards)
 
 
 def n_choose_m(n: int, m: int):
   m = min(m, n - m)
-  numer = reduce(op.mul, range(n, n - m, -1))
-  denom = reduce(op.mul, range(1, m + 1))
+  numer = reduce(op.mul, range(n, n - m, -1), 1)
+  denom = reduce(op.mul, range(1, m + 1), 1)
   return numer // denom
@@ -0,0 +1,214 @@
+'''Precomputed chances for the case when no community cards have been revealed yet.
+
+Before the flop your chances only depend on the ranks of your hole cards and whether they are
+suited, so there are only 169 distinct cases (e.g. AKs for an ace and a king of the same suit, AKo
+for ones of different suits and AA for a pair of aces). For each of them, the table stores the
+number of (board, opponent's hole cards) combinations where the opponent has a better hand than you.
+The table is shipped with the package in `preflop_table.bin` and it's memory-mapped when it's first
+needed.
+
+The table can be regenerated (and checked against `my_chances.compute`) by running::
+
+    python -m texas_holdem.preflop_table generate
+    python -m texas_holdem.preflop_table verify AKs 72o
+'''
+import argparse
+import mmap
+import os
+import struct
+import sys
+from itertools import combinations, islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from texas_holdem.card import cards_to_mask, list_remaining_card_ints
+from texas_holdem.evaluate_hand import evaluate_hole_cards, get_evaluator
+from texas_holdem.suit_isomorphism import list_dealt_cards_up_to_suit_permutation
+
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_table.bin')
+
+_MAGIC = b'THPREFL1'
+_NUM_CLASSES = 13 * 13
+_RANK_ALIASES = '23456789TJQKA'
+
+# The number of (board, opponent's hole cards) combinations for any hole cards.
+NUM_CASES = 2118760 * 990  # (50 choose 5) * (45 choose 2)
+
+_table: Optional[mmap.mmap] = None
+
+
+def hole_cards_class(hole_cards: Sequence[int]) -> int:
+  '''Returns the index of the class of the (integer encoded) hole cards in the table.
+
+  The classes are laid out as a 13x13 grid: pairs are on the diagonal, suited hole cards are
+  indexed by (higher rank, lower rank) and offsuit ones by (lower rank, higher rank).
+  '''
+  c1, c2 = hole_cards
+  r1, r2 = c1 % 13, c2 % 13
+  high, low = max(r1, r2), min(r1, r2)
+  if c1 // 13 == c2 // 13:
+    return 13 * high + low
+  return 13 * low + high
+
+
+def class_alias(class_index: int) -> str:
+  'Returns the shorthand notation of the class, e.g. AKs, AKo or AA.'
+  r1, r2 = divmod(class_index, 13)
+  if r1 == r2:
+    return _RANK_ALIASES[r1] * 2
+  if r1 > r2:
+    return _RANK_ALIASES[r1] + _RANK_ALIASES[r2] + 's'
+  return _RANK_ALIASES[r2] + _RANK_ALIASES[r1] + 'o'
+
+
+def class_representative(class_index: int) -> Tuple[int, int]:
+  'Returns (integer encoded) hole cards belonging to the class.'
+  r1, r2 = divmod(class_index, 13)
+  if r1 == r2:
+    return (r1, 13 + r1)
+  if r1 > r2:
+    return (r2, r1)
+  return (r1, 13 + r2)
+
+
+def lookup(hole_cards: Sequence[int]) -> Optional[float]:
+  '''Returns your chances with the (integer encoded) hole cards before the flop, as computed by
+  `my_chances.compute`. Returns None if the table is not available.
+  '''
+  table = _load()
+  if table is None:
+    return None
+  num_bad_cases, = struct.unpack_from('<Q', table, len(_MAGIC) + 8 * hole_cards_class(hole_cards))
+  return 1 - num_bad_cases / NUM_CASES
+
+
+def _load() -> Optional[mmap.mmap]:
+  global _table
+  if _table is None and os.path.exists(TABLE_PATH):
+    with open(TABLE_PATH, 'rb') as f:
+      table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if table[:len(_MAGIC)] != _MAGIC or len(table) != len(_MAGIC) + 8 * _NUM_CLASSES:
+      raise ValueError(f'{TABLE_PATH} is not a valid preflop table. Regenerate it.')
+    _table = table
+  return _table
+
+
+### Generating and verifying the table ###
+
+
+def generate(path: str = TABLE_PATH, processes: Optional[int] = None):
+  '''Computes the number of bad cases for each class and writes them to the table.
+
+  Instead of running `my_chances.compute` for each class, it goes through the boards only once
+  (and only one of those that only differ in the suits), evaluates the hands of all the possible
+  hole cards on the board and counts the better hands for each of them.
+  '''
+  from multiprocessing import Pool
+
+  boards = list_dealt_cards_up_to_suit_permutation([], 5)
+  totals = [0] * _NUM_CLASSES
+  get_evaluator()
+  with Pool(processes) as p:
+    for partial_totals in p.imap_unordered(_count_bad_cases, _split(boards, 1000)):
+      totals = [t + pt for t, pt in zip(totals, partial_totals)]
+
+  # Each class was counted for each hole cards in it.
+  num_bad_cases = []
+  for class_index, total in enumerate(totals):
+    r1, r2 = divmod(class_index, 13)
+    class_size = 6 if r1 == r2 else 4 if r1 > r2 else 12
+    assert total % class_size == 0, f'The cases of {class_alias(class_index)} do not add up.'
+    num_bad_cases.append(total // class_size)
+
+  global _table
+  _table = None
+  with open(path, 'wb') as f:
+    f.write(_MAGIC + struct.pack(f'<{_NUM_CLASSES}Q', *num_bad_cases))
+
+
+def _split(iterable: Iterable, size: int) -> Iterator[List]:
+  iterator = iter(iterable)
+  chunk = list(islice(iterator, size))
+  while chunk:
+    yield chunk
+    chunk = list(islice(iterator, size))
+
+
+def _count_bad_cases(boards: Iterable[Tuple[Sequence[int], int]]) -> List[int]:
+  '''For each class, sums the number of better opponent hole cards over the boards and the hole
+  cards in the class. Each board is counted as many times as the number of boards it represents.
+  '''
+  totals = [0] * _NUM_CLASSES
+  for board, num_boards in boards:
+    for hole_cards, num_better_hole_cards in count_better_hole_cards_for_all(board):
+      totals[hole_cards_class(hole_cards)] += num_boards * num_better_hole_cards
+  return totals
+
+
+def count_better_hole_cards_for_all(
+    board: Sequence[int]) -> Iterator[Tuple[Tuple[int, int], int]]:
+  '''For each hole cards that can be dealt next to the board, counts the opponent's hole cards
+  that would give them a better hand.
+  '''
+  hole_cards_list = list(combinations(list_remaining_card_ints(cards_to_mask(board)), 2))
+  strengths = evaluate_hole_cards(board, hole_cards_list)
+  order = sorted(range(len(hole_cards_list)), key=strengths.__getitem__, reverse=True)
+  # The number of hole cards with a stronger hand than the current one, in total and among those
+  # containing a given card. The hole cards containing one of your cards can't be the opponent's.
+  num_stronger = 0
+  num_stronger_containing = [0] * 52
+  group: List[Tuple[int, int]] = []
+  group_strength = None
+  for i in order:
+    if strengths[i] != group_strength:
+      for c1, c2 in group:
+        num_stronger_containing[c1] += 1
+        num_stronger_containing[c2] += 1
+      num_stronger += len(group)
+      group = []
+      group_strength = strengths[i]
+    c1, c2 = hole_cards_list[i]
+    group.append((c1, c2))
+    yield (c1, c2), num_stronger - num_stronger_containing[c1] - num_stronger_containing[c2]
+
+
+def verify(class_aliases: Sequence[str]) -> bool:
+  '''Checks the entries of the table against `my_chances.compute` enumerating all the cases.
+
+  Note that it takes several minutes for each class.
+  '''
+  # Imported here as my_chances itself imports this module.
+  from texas_holdem.my_chances import compute_by_enumeration
+
+  aliases = [class_alias(i) for i in range(_NUM_CLASSES)]
+  ok = True
+  for alias in class_aliases:
+    hole_cards = class_representative(aliases.index(alias))
+    expected = compute_by_enumeration(hole_cards, ())
+    actual = lookup(hole_cards)
+    print(f'{alias}: table: {actual}, enumeration: {expected}')
+    ok = ok and actual == expected
+  return ok
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+  subparsers = parser.add_subparsers(dest='command')
+  generate_parser = subparsers.add_parser('generate', help='Regenerates the table.')
+  generate_parser.add_argument('--processes', type=int, default=None)
+  verify_parser = subparsers.add_parser(
+      'verify', help='Checks the given classes (e.g. AKs AKo AA) or all of them against compute.')
+  verify_parser.add_argument('classes', nargs='*')
+  parsed_args = parser.parse_args(args)
+  if parsed_args.command == 'generate':
+    generate(processes=parsed_args.processes)
+    return 0
+  if parsed_args.command == 'verify':
+    classes = parsed_args.classes or [class_alias(i) for i in range(_NUM_CLASSES)]
+    return 0 if verify(classes) else 1
+  parser.print_help()
+  return 1
+
+
+if __name__ == '__main__':
+  sys.exit(main())
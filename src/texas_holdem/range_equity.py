@@ -0,0 +1,144 @@
+'''Computes the chances of a range of hole cards against another range (see `hand_range`).
+
+Computing your chances for each hole cards of your range separately (see `my_chances.compute`)
+would enumerate the same boards again for every one of them. Instead, each board is enumerated
+once: every hole cards of either range that can still be dealt is evaluated a single time, then
+for each of your hole cards the weight of the opponent's better hole cards is read from the sorted
+strengths of the opponent's range. The opponent's hole cards sharing a card with yours are
+subtracted using the same sums kept for the hole cards containing each card.
+
+Usage
+-----
+
+    >>> from texas_holdem.hand_range import HandRange
+    >>> from texas_holdem.range_equity import compute_range_vs_range
+    >>> result = compute_range_vs_range(
+    ...     HandRange.parse('TT+, AQs+'), HandRange.parse('88+, ATs+, KQs'), [H2, D3, S5])
+    >>> result.equity  # Your chances with the whole range.
+    >>> result.holdings  # Your chances with each of your hole cards.
+'''
+import os
+from bisect import bisect_right
+from itertools import accumulate, combinations, islice
+from multiprocessing.pool import Pool
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from texas_holdem.card import Card, HoleCards, card_to_int, cards_to_mask, int_to_card, \
+    list_remaining_card_ints
+from texas_holdem.evaluate_hand import evaluate_hole_cards, get_evaluator
+from texas_holdem.hand_range import COMBOS, NUM_COMBOS, HandRange
+from texas_holdem.my_chances import OpponentError, _SHARDS_PER_PROCESS, n_choose_m
+
+
+class RangeEquity(NamedTuple):
+  '''Your chances with your whole range and with each of your hole cards that can be dealt along
+  with at least one hole cards of the opponent's range.
+
+  The chances are defined the same way as in `my_chances.compute`: the probability that the
+  opponent doesn't have a better hand than you. For a single hole cards they are the same as
+  computed by `my_chances.compute` with the opponent's range as `against`.
+  '''
+  equity: float
+  holdings: Dict[HoleCards, float]
+
+
+def compute_range_vs_range(
+    my_range: HandRange, opponents_range: HandRange, community_cards: Sequence[Card],
+    pool: Optional[Pool] = None, num_processes: Optional[int] = None) -> RangeEquity:
+  '''Computes your chances when you hold the hole cards of `my_range` and the opponent holds
+  those of `opponents_range`, both proportionally to their weights.
+
+  The work is distributed among the processes of the pool the same way as in
+  `my_chances.compute_by_enumeration`. Before the flop there are too many boards to enumerate in a
+  reasonable time.
+  '''
+  assert len(community_cards) in (0, 3, 4, 5), (
+      f'There can be either 0, 3, 4 or 5 community cards revealed. Got: {len(community_cards)}.')
+  assert len(set(community_cards)) == len(community_cards), (
+      'The same card is listed multiple times in the community cards.')
+  community_cards_ = tuple(card_to_int(c) for c in community_cards)
+  my_weights = my_range.remove_cards(community_cards).weights
+  opponents_weights = opponents_range.remove_cards(community_cards).weights
+
+  num_processes = num_processes or os.cpu_count() or 1
+  num_deals = n_choose_m(52 - len(community_cards_), 5 - len(community_cards_))
+  num_shards = min(num_deals, _SHARDS_PER_PROCESS * num_processes)
+  tasks = [(my_weights, opponents_weights, community_cards_, (shard_index, num_shards))
+      for shard_index in range(num_shards)]
+  if pool is None:
+    get_evaluator()
+    with Pool(num_processes) as p:
+      bad_cases, all_cases = _sum_cases_per_hole_cards(p.imap_unordered(_count_cases, tasks))
+  else:
+    bad_cases, all_cases = _sum_cases_per_hole_cards(pool.imap_unordered(_count_cases, tasks))
+
+  weighted_bad_cases = sum(w * bad for w, bad in zip(my_weights, bad_cases))
+  weighted_all_cases = sum(w * all_ for w, all_ in zip(my_weights, all_cases))
+  if weighted_all_cases == 0:
+    raise OpponentError(
+        'None of the hole cards of the opponent\'s range can be dealt along with any of the hole ' +
+        'cards of your range on this board.')
+  holdings = {
+      HoleCards(int_to_card(c1), int_to_card(c2)): 1 - bad / all_
+      for (c1, c2), w, bad, all_ in zip(COMBOS, my_weights, bad_cases, all_cases)
+      if w > 0 and all_ > 0}
+  return RangeEquity(1 - weighted_bad_cases / weighted_all_cases, holdings)
+
+
+def _sum_cases_per_hole_cards(
+    results: Iterable[Tuple[List[float], List[float]]]) -> Tuple[List[float], List[float]]:
+  bad_cases = [0.0] * NUM_COMBOS
+  all_cases = [0.0] * NUM_COMBOS
+  for shard_bad_cases, shard_all_cases in results:
+    bad_cases = [x + y for x, y in zip(bad_cases, shard_bad_cases)]
+    all_cases = [x + y for x, y in zip(all_cases, shard_all_cases)]
+  return bad_cases, all_cases
+
+
+def _count_cases(task) -> Tuple[List[float], List[float]]:
+  '''Enumerates the boards of a shard and returns the weighted bad cases and all the cases (of the
+  opponent's range) for each of your hole cards, indexed by `hand_range.combo_index`.
+  '''
+  my_weights, opponents_weights, community_cards, (shard_index, num_shards) = task
+  # The hole cards in either range with their bitmask and weights.
+  live_combos = [
+      ((c1, c2), 1 << c1 | 1 << c2, i, my_weight, opponents_weight)
+      for i, ((c1, c2), my_weight, opponents_weight)
+      in enumerate(zip(COMBOS, my_weights, opponents_weights))
+      if my_weight > 0 or opponents_weight > 0]
+  remaining_cards = list_remaining_card_ints(cards_to_mask(community_cards))
+  bad_cases = [0.0] * NUM_COMBOS
+  all_cases = [0.0] * NUM_COMBOS
+  for dealt_cards in islice(
+      combinations(remaining_cards, 5 - len(community_cards)), shard_index, None, num_shards):
+    board = community_cards + dealt_cards
+    dealt_mask = cards_to_mask(dealt_cards)
+    combos = [combo for combo in live_combos if not combo[1] & dealt_mask]
+    strengths = evaluate_hole_cards(board, [combo[0] for combo in combos])
+
+    # The strengths of the opponent's hole cards in increasing order with the cumulative sums of
+    # their weights, in total and for the hole cards containing each card.
+    opponents_combos = sorted(
+        (strength, combo) for strength, combo in zip(strengths, combos) if combo[4] > 0)
+    all_strengths = [strength for strength, _ in opponents_combos]
+    all_sums = [0.0, *accumulate(combo[4] for _, combo in opponents_combos)]
+    strengths_with_card: List[List[int]] = [[] for _ in range(52)]
+    weights_with_card: List[List[float]] = [[] for _ in range(52)]
+    for strength, ((c1, c2), _, _, _, weight) in opponents_combos:
+      for c in (c1, c2):
+        strengths_with_card[c].append(strength)
+        weights_with_card[c].append(weight)
+    sums_with_card = [[0.0, *accumulate(weights)] for weights in weights_with_card]
+
+    for strength, ((c1, c2), _, i, my_weight, opponents_weight) in zip(strengths, combos):
+      if my_weight == 0:
+        continue
+      # The opponent's hole cards sharing both cards with yours are your own hole cards, which are
+      # never better, so they are only added back to all the cases.
+      sums_1, sums_2 = sums_with_card[c1], sums_with_card[c2]
+      bad_cases[i] += (
+          all_sums[-1] - all_sums[bisect_right(all_strengths, strength)]
+          - sums_1[-1] + sums_1[bisect_right(strengths_with_card[c1], strength)]
+          - sums_2[-1] + sums_2[bisect_right(strengths_with_card[c2], strength)])
+      all_cases[i] += all_sums[-1] - sums_1[-1] - sums_2[-1] + opponents_weight
+  return bad_cases, all_cases
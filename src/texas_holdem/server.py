@@ -0,0 +1,244 @@
+'''A local server computing your chances for other processes.
+
+Every process calling `my_chances.compute` starts its own pool of worker processes, so several
+processes asking for chances at the same time start more workers than there are CPUs. Instead, a
+single server can own an `engine.EquityEngine` (and its pool) and the processes ask it through
+`compute`, which has the same signature as `my_chances.compute`.
+
+The server answers JSON lines over a Unix socket (or a TCP socket on localhost). The same
+situations asked at the same time (see `cache.situation_key`) are only computed once, the results
+can be cached (see `cache`) and at most `max_concurrency` situations are computed at once.
+
+The opponent can only be described by a `hand_range.HandRange`, as other `Opponent`s are code
+which isn't sent to the server.
+
+Usage
+-----
+
+Start the server with::
+
+    python -m texas_holdem.server [--socket PATH | --port PORT] [--cache PATH]
+
+then ask it from other processes:
+
+    >>> from texas_holdem import server
+    >>> server.compute(hole_cards=[S2, DA], community_cards=[H2, D3, S5, C9])
+'''
+import argparse
+import asyncio
+import json
+import os
+import socket
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+from texas_holdem.cache import ResultCache, situation_key
+from texas_holdem.card import Card, card_to_int, parse
+from texas_holdem.engine import EquityEngine
+from texas_holdem.hand_range import NUM_COMBOS, HandRange
+from texas_holdem.my_chances import Opponent, OpponentError, check_cards
+
+
+DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), 'texas_holdem.sock')
+
+# A path of a Unix socket or a (host, port) pair of a TCP socket.
+Address = Union[str, Tuple[str, int]]
+
+
+class ServerError(Exception):
+  'The server could not answer the request (or could not be started).'
+
+
+class EquityServer:
+  '''Answers the requests of `compute` using an engine with `processes` worker processes and an
+  optional `cache`.
+
+  At most `max_concurrency` situations are computed at the same time (by default twice the number
+  of processes), while the boards of each of them are split between the processes.
+  '''
+  def __init__(
+      self, processes: Optional[int] = None, cache: Optional[ResultCache] = None,
+      max_concurrency: Optional[int] = None):
+    self.engine = EquityEngine(processes, cache)
+    self.max_concurrency = max_concurrency or 2 * (processes or os.cpu_count() or 1)
+    self._executor = ThreadPoolExecutor(self.max_concurrency)
+    self._in_flight: Dict[str, 'asyncio.Future[float]'] = {}
+    # The number of situations asked and the number of those that were being computed already.
+    self.num_requests = 0
+    self.num_coalesced = 0
+
+  async def compute(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card],
+      against: Optional[Opponent] = None) -> float:
+    'Computes the chances in the engine, joining the same situation if it is being computed.'
+    check_cards(hole_cards, community_cards)
+    self.num_requests += 1
+    key = situation_key(
+        [card_to_int(c) for c in hole_cards], [card_to_int(c) for c in community_cards], against)
+    if key is None:
+      return await self._run(hole_cards, community_cards, against)
+    future = self._in_flight.get(key)
+    if future is None:
+      future = asyncio.ensure_future(self._run(hole_cards, community_cards, against))
+      self._in_flight[key] = future
+      future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+    else:
+      self.num_coalesced += 1
+    # A cancelled request doesn't cancel the computation the other requests are waiting for.
+    return await asyncio.shield(future)
+
+  async def _run(
+      self, hole_cards: Sequence[Card], community_cards: Sequence[Card],
+      against: Optional[Opponent]) -> float:
+    return await asyncio.get_event_loop().run_in_executor(
+        self._executor, self.engine.compute, hole_cards, community_cards, against)
+
+  async def start(self, address: Address = DEFAULT_ADDRESS) -> asyncio.AbstractServer:
+    'Starts listening on the address. Use the returned server to stop it.'
+    # The worker processes are started before accepting any connection, otherwise they would
+    # inherit the open sockets.
+    self.engine.start()
+    if isinstance(address, str):
+      _remove_stale_socket(address)
+      return await asyncio.start_unix_server(self._handle_connection, address)
+    host, port = address
+    return await asyncio.start_server(self._handle_connection, host, port)
+
+  async def serve_forever(self, address: Address = DEFAULT_ADDRESS):
+    server = await self.start(address)
+    try:
+      # Only returns when it's cancelled.
+      await asyncio.Event().wait()
+    finally:
+      server.close()
+      await server.wait_closed()
+
+  def close(self):
+    'Stops the threads and the worker processes of the engine.'
+    self._executor.shutdown()
+    self.engine.close()
+
+  async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+      while True:
+        line = await reader.readline()
+        if not line:
+          break
+        writer.write(json.dumps(await self._answer(line)).encode() + b'\n')
+        await writer.drain()
+    except ConnectionError:
+      pass
+    finally:
+      writer.close()
+
+  async def _answer(self, line: bytes) -> Dict[str, Any]:
+    try:
+      request = json.loads(line)
+      hole_cards = [parse(c) for c in request['hc']]
+      community_cards = [parse(c) for c in request.get('cc', [])]
+      against = None
+      if request.get('range') is not None:
+        weights = [0.0] * NUM_COMBOS
+        for index, weight in request['range']:
+          weights[index] = weight
+        against = HandRange(weights)
+      return {'chances': await self.compute(hole_cards, community_cards, against)}
+    except Exception as e:
+      return {'error': str(e) or type(e).__name__, 'type': type(e).__name__}
+
+
+def _remove_stale_socket(path: str):
+  '''Removes the socket left at the path by a server that is no longer running. Raises
+  `ServerError` if something else is at the path or a server is still accepting connections on it.
+  '''
+  try:
+    mode = os.lstat(path).st_mode
+  except FileNotFoundError:
+    return
+  if not stat.S_ISSOCK(mode):
+    raise ServerError(f'{path} already exists and it is not a socket.')
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+    try:
+      connection.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+      os.remove(path)
+      return
+  raise ServerError(f'A server is already listening on {path}.')
+
+
+def compute(
+    hole_cards: Sequence[Card], community_cards: Sequence[Card],
+    against: Optional[Opponent] = None, cache: Optional[ResultCache] = None,
+    address: Address = DEFAULT_ADDRESS) -> float:
+  '''Same as `my_chances.compute` but asks the server listening on the address to compute the
+  chances. The opponent can only be a `hand_range.HandRange`.
+
+  If a `cache` is given then the result is looked up from it or stored in it after asking the
+  server (which can have its own cache as well).
+  '''
+  if against is not None and not isinstance(against, HandRange):
+    raise TypeError('Only a `HandRange` can be sent to the server as the opponent.')
+  check_cards(hole_cards, community_cards)
+  key = None
+  if cache is not None:
+    key = situation_key(
+        [card_to_int(c) for c in hole_cards], [card_to_int(c) for c in community_cards], against)
+    chances = None if key is None else cache.get(key)
+    if chances is not None:
+      return chances
+
+  request: Dict[str, Any] = {
+      'hc': [str(c) for c in hole_cards], 'cc': [str(c) for c in community_cards]}
+  if against is not None:
+    request['range'] = [[i, w] for i, w in enumerate(against.weights) if w > 0]
+  family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+  with socket.socket(family, socket.SOCK_STREAM) as connection:
+    connection.connect(address)
+    with connection.makefile('rwb') as stream:
+      stream.write(json.dumps(request).encode() + b'\n')
+      stream.flush()
+      line = stream.readline()
+  if not line:
+    raise ServerError('The server closed the connection without answering.')
+  response = json.loads(line)
+  if 'error' in response:
+    raise (OpponentError if response['type'] == 'OpponentError' else ServerError)(
+        response['error'])
+
+  if cache is not None and key is not None:
+    cache.put(key, response['chances'])
+  return response['chances']
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+  parser.add_argument(
+      '--socket', default=DEFAULT_ADDRESS, help='The path of the Unix socket to listen on.')
+  parser.add_argument(
+      '--port', type=int, help='Listens on this TCP port of localhost instead of a Unix socket.')
+  parser.add_argument(
+      '--processes', type=int, help='The number of worker processes (by default the number of ' +
+      'CPUs).')
+  parser.add_argument(
+      '--max_concurrency', type=int, help='The number of situations computed at the same time.')
+  parser.add_argument('--cache', help='The path of an sqlite database to cache the results in.')
+  args = parser.parse_args()
+
+  cache = ResultCache(path=args.cache) if args.cache else ResultCache()
+  server = EquityServer(args.processes, cache, args.max_concurrency)
+  address = args.socket if args.port is None else ('127.0.0.1', args.port)
+  loop = asyncio.new_event_loop()
+  try:
+    loop.run_until_complete(server.serve_forever(address))
+  except KeyboardInterrupt:
+    pass
+  finally:
+    loop.close()
+    server.close()
+    cache.close()
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,75 @@
+'''Exploits that the suits are interchangeable: permuting the suits of every card doesn't change
+the strength of any of the hands.
+
+E.g. your chances with the hole cards (SA, SK) are the same as with (HA, HK), and if the
+community cards are (S2, H7, D9) then the board (S2, H7, D9, C3, C4) is as good for you as
+(S2, H7, D9, C3, C5) whatever your hole cards are except the clubs ones.
+
+The cards are represented by their integer encoding (see `card.card_to_int`).
+'''
+from itertools import combinations, islice, permutations
+from typing import Iterator, List, Sequence, Tuple
+
+from texas_holdem.card import cards_to_mask, list_remaining_card_ints
+
+
+# A suit permutation is represented by the tuple of the images of the suits 0, 1, 2, 3.
+SuitPermutation = Tuple[int, ...]
+
+_SUIT_PERMUTATIONS: List[SuitPermutation] = list(permutations(range(4)))
+
+
+def permute_suits_of_mask(mask: int, suit_permutation: SuitPermutation) -> int:
+  'Replaces the suit of each card in the bitmask according to the permutation.'
+  permuted = 0
+  for suit in range(4):
+    permuted |= ((mask >> 13 * suit) & 0x1FFF) << 13 * suit_permutation[suit]
+  return permuted
+
+
+def list_suit_permutations_fixing(card_sets: Sequence[Sequence[int]]) -> List[SuitPermutation]:
+  'Lists the suit permutations that map each of the sets of cards to itself.'
+  masks = [cards_to_mask(cards) for cards in card_sets]
+  return [p for p in _SUIT_PERMUTATIONS
+      if all(permute_suits_of_mask(m, p) == m for m in masks)]
+
+
+def canonical_masks(card_sets: Sequence[Sequence[int]]) -> Tuple[int, ...]:
+  '''Returns the bitmasks of the card sets after applying the suit permutation that makes them
+  the smallest. So two lists of card sets get the same result if and only if there is a suit
+  permutation that maps each card set of one of them to the corresponding one of the other.
+  '''
+  masks = [cards_to_mask(cards) for cards in card_sets]
+  return min(tuple(permute_suits_of_mask(m, p) for m in masks) for p in _SUIT_PERMUTATIONS)
+
+
+def list_dealt_cards_up_to_suit_permutation(
+    card_sets: Sequence[Sequence[int]], num_cards: int, shard: Tuple[int, int] = (0, 1)
+    ) -> Iterator[Tuple[Tuple[int, ...], int]]:
+  '''Lists the ways `num_cards` cards can be dealt from the cards not contained in any of the
+  card sets, considering two deals the same when a suit permutation that maps each card set to
+  itself maps one of them to the other.
+
+  For each class of deals, it yields a representative deal and the number of deals in the class.
+  Summing a function of the deals that doesn't change under these suit permutations over the
+  representatives weighted by the number of deals gives the same as summing it over all the deals.
+
+  The deals can be split into shards so that they can be processed in parallel: when `shard` is
+  (i, n), only every n-th deal starting from the i-th one is considered.
+  '''
+  remaining_cards = list_remaining_card_ints(cards_to_mask(c for cs in card_sets for c in cs))
+  shard_index, num_shards = shard
+  deals = islice(combinations(remaining_cards, num_cards), shard_index, None, num_shards)
+  suit_permutations = [
+      p for p in list_suit_permutations_fixing(card_sets) if p != tuple(range(4))]
+  if not suit_permutations:
+    for cards in deals:
+      yield cards, 1
+    return
+  for cards in deals:
+    mask = cards_to_mask(cards)
+    # The representative of each class is the deal whose bitmask is the smallest.
+    images = {permute_suits_of_mask(mask, p) for p in suit_permutations}
+    if mask <= min(images):
+      images.add(mask)
+      yield cards, len(images)
@@ -1 +1,14 @@
 """Unit test package for texas_holdem."""
+from texas_holdem.card import Rank, card_to_int
+from texas_holdem.my_chances import Opponent
+
+
+class NoAces(Opponent):
+  'Defined at the module level so that it can be sent to the worker processes.'
+  def hole_cards_weight(self, opponents_hole_cards, board):
+    return 0 if Rank.ACE in (c.rank for c in opponents_hole_cards) else 1
+
+
+def ints(*cards):
+  'Returns the integer encoding of the cards (see `card.card_to_int`).'
+  return tuple(card_to_int(c) for c in cards)
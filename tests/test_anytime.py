@@ -0,0 +1,54 @@
+import unittest
+from itertools import combinations
+
+from texas_holdem.anytime import _permute, _unrank_combination, compute_by_anytime_enumeration
+from texas_holdem.card import card_to_int
+from texas_holdem.engine import EquityEngine
+from texas_holdem.my_chances import compute, compute_anytime, n_choose_m
+from texas_holdem.shorthand_notations import *
+
+from tests import NoAces
+
+
+class TestAnytime(unittest.TestCase):
+  def test_same_as_compute_when_every_board_is_enumerated(self):
+    for community_cards in ([H2, D3, S5, C9, CA], [H2, D3, S5, C9]):
+      partial_chances = compute_anytime([S2, DA], community_cards, NoAces(), seed=0)
+      self.assertAlmostEqual(
+          partial_chances.chances, compute([S2, DA], community_cards, NoAces()), places=12)
+      self.assertEqual(partial_chances.fraction_covered, 1)
+      self.assertEqual(partial_chances.standard_error, 0)
+
+  def test_progress_and_time_budget(self):
+    with EquityEngine(processes=2) as engine:
+      exact_chances = engine.compute([S2, DA], [H2, D3, S5, C9], NoAces())
+      fractions_covered = []
+      partial_chances = engine.compute_anytime(
+          [S2, DA], [H2, D3, S5, C9], NoAces(), seed=1,
+          progress=lambda p: fractions_covered.append(p.fraction_covered))
+      self.assertEqual(fractions_covered, sorted(fractions_covered))
+      self.assertEqual(fractions_covered[-1], 1)
+      self.assertAlmostEqual(partial_chances.chances, exact_chances, places=12)
+
+      partial_chances = compute_by_anytime_enumeration(
+          (card_to_int(S2), card_to_int(DA)), tuple(card_to_int(c) for c in [H2, D3, S5]),
+          NoAces(), time_budget=0, seed=2)
+      self.assertLess(partial_chances.fraction_covered, 1)
+      self.assertGreater(partial_chances.standard_error, 0)
+      low, high = partial_chances.confidence_interval
+      self.assertLess(low, partial_chances.chances)
+      self.assertLess(partial_chances.chances, high)
+
+  def test_boards_are_a_permutation(self):
+    for size in (1, 2, 46, 1081, 1000):
+      self.assertEqual(
+          sorted(_permute(i, size, (1, 2, 3, 4)) for i in range(size)), list(range(size)))
+    cards = list(range(10))
+    binomials = [[n_choose_m(n, k) if n >= k else 0 for n in range(11)] for k in range(4)]
+    self.assertEqual(
+        [_unrank_combination(i, cards, 3, binomials) for i in range(n_choose_m(10, 3))],
+        sorted(combinations(cards, 3), key=lambda c: c[::-1]))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,52 @@
+import random
+import unittest
+
+try:
+  import numpy as np
+  from texas_holdem.batch_evaluate import evaluate_batch, evaluate_hole_cards_batch
+except ImportError:
+  np = None
+
+from texas_holdem.card import card_to_int
+from texas_holdem.evaluate_hand import HandRank, HandValue, get_evaluator
+from texas_holdem.shorthand_notations import *
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestBatchEvaluate(unittest.TestCase):
+  def test_same_strengths_as_the_lookup_engine(self):
+    deck = list(range(52))
+    rng = random.Random(0)
+    hands = [rng.sample(deck, 7) for _ in range(20000)]
+    evaluate = get_evaluator('lookup')
+    strengths = evaluate_batch(np.array(hands))
+    self.assertEqual(strengths.shape, (len(hands),))
+    self.assertListEqual(strengths.tolist(), [evaluate(cards) for cards in hands])
+
+  def test_each_hand_rank(self):
+    hands = {
+        HandRank.ROYAL_FLUSH: [SA, SK, SQ, SJ, S10, H2, H3],
+        HandRank.STRAIGHT_FLUSH: [SA, S2, S3, S4, S5, H2, H3],
+        HandRank.FOUR_OF_A_KIND: [SA, HA, DA, CA, S5, H5, D5],
+        HandRank.FULL_HOUSE: [SA, HA, DA, S5, H5, D5, C2],
+        HandRank.FLUSH: [S2, S4, S6, S8, S10, SK, HA],
+        HandRank.STRAIGHT: [S2, H3, D4, C5, S6, H7, DK],
+        HandRank.THREE_OF_A_KIND: [S2, H2, D2, C5, S6, H7, DK],
+        HandRank.TWO_PAIRS: [S2, H2, D5, C5, S6, H6, DK],
+        HandRank.ONE_PAIR: [S2, H2, D5, C9, S6, HJ, DK],
+        HandRank.HIGH_CARD: [S2, H3, D5, C9, S10, HJ, DK],
+    }
+    evaluate = get_evaluator('lookup')
+    cards = np.array([[card_to_int(c) for c in hand] for hand in hands.values()])
+    for hand_rank, strength, cards_of_hand in zip(hands, evaluate_batch(cards), cards):
+      self.assertEqual(HandValue.from_strength(int(strength)).rank, hand_rank)
+      self.assertEqual(strength, evaluate(cards_of_hand))
+
+  def test_evaluate_hole_cards_batch(self):
+    board = [card_to_int(c) for c in [C5, C6, D8, D9, HA]]
+    hole_cards_list = [(card_to_int(c1), card_to_int(c2)) for c1, c2 in [(S2, S3), (S7, H10)]]
+    evaluate = get_evaluator('lookup')
+    self.assertListEqual(
+        evaluate_hole_cards_batch(board, hole_cards_list).tolist(),
+        [evaluate((c1, c2, *board)) for c1, c2 in hole_cards_list])
+
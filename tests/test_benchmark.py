@@ -0,0 +1,45 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from texas_holdem.benchmark import compare, main, run
+
+
+class TestBenchmark(unittest.TestCase):
+  def test_run(self):
+    results = run(['has_better_hand', 'compute[river'], processes=1, min_time=0.01, repeat=2)
+    self.assertEqual(
+        [r['name'] for r in results['results']],
+        ['has_better_hand_than_hand_value', 'compute[river,none]', 'compute[river,opponent]',
+         'compute[river,range]'])
+    for result in results['results']:
+      self.assertGreater(result['rate'], 0)
+      self.assertLessEqual(result['best_seconds'], result['median_seconds'])
+    self.assertEqual(results['metadata']['processes'], 1)
+    json.dumps(results)
+
+  def test_compare(self):
+    baseline = {'results': [{'name': 'a', 'rate': 100.0}, {'name': 'b', 'rate': 100.0}]}
+    results = {'results': [{'name': 'a', 'rate': 95.0}, {'name': 'b', 'rate': 80.0},
+                           {'name': 'c', 'rate': 1.0}]}
+    self.assertEqual(
+        compare(baseline, results), [('a', 100.0, 95.0, False), ('b', 100.0, 80.0, True)])
+
+    with tempfile.TemporaryDirectory() as directory:
+      baseline_path = os.path.join(directory, 'baseline.json')
+      results_path = os.path.join(directory, 'results.json')
+      with open(baseline_path, 'w') as f:
+        json.dump(baseline, f)
+      with open(results_path, 'w') as f:
+        json.dump(results, f)
+      with redirect_stdout(io.StringIO()) as output:
+        self.assertEqual(main(['compare', baseline_path, results_path]), 1)
+        self.assertEqual(main(['compare', baseline_path, results_path, '--tolerance', '0.25']), 0)
+      self.assertIn('slower', output.getvalue())
+
+
+if __name__ == '__main__':
+  unittest.main()
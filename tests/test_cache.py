@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from texas_holdem.cache import ResultCache, situation_key
+from texas_holdem.my_chances import compute, Opponent
+from texas_holdem.shorthand_notations import *
+
+from tests import ints
+
+
+class TestSituationKey(unittest.TestCase):
+  def test_situations_differing_in_suits_have_the_same_key(self):
+    self.assertEqual(
+        situation_key(ints(SA, SK), ints(S2, H7, D9)),
+        situation_key(ints(HK, HA), ints(C9, D7, H2)))
+    self.assertNotEqual(
+        situation_key(ints(SA, SK), ints(S2, H7, D9)),
+        situation_key(ints(SA, SK), ints(H2, S7, D9)))
+
+  def test_opponents(self):
+    class WithoutKey(Opponent):
+      def hole_cards_weight(self, hole_cards, board):
+        return 1
+
+    class WithKey(WithoutKey):
+      cache_key = 'uniform'
+
+    class SuitSymmetricWithKey(WithKey):
+      suit_symmetric = True
+
+    self.assertIsNone(situation_key(ints(SA, SK), (), WithoutKey()))
+    self.assertNotEqual(
+        situation_key(ints(SA, SK), (), WithKey()), situation_key(ints(HA, HK), (), WithKey()))
+    self.assertEqual(
+        situation_key(ints(SA, SK), (), SuitSymmetricWithKey()),
+        situation_key(ints(HA, HK), (), SuitSymmetricWithKey()))
+    self.assertNotEqual(
+        situation_key(ints(SA, SK), (), SuitSymmetricWithKey()), situation_key(ints(SA, SK), ()))
+
+
+class TestResultCache(unittest.TestCase):
+  def test_lru_eviction(self):
+    cache = ResultCache(maxsize=2)
+    cache.put('a', 0.1)
+    cache.put('b', 0.2)
+    self.assertEqual(cache.get('a'), 0.1)
+    cache.put('c', 0.3)  # Evicts 'b' as 'a' was used more recently.
+    self.assertIsNone(cache.get('b'))
+    self.assertEqual(cache.get('c'), 0.3)
+    stats = cache.stats
+    self.assertEqual((stats.hits, stats.misses, stats.evictions, stats.size), (2, 1, 1, 2))
+
+  def test_persistent_store(self):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      path = os.path.join(tmp_dir, 'chances.sqlite')
+      cache = ResultCache(maxsize=1, path=path)
+      cache.put('a', 0.1)
+      cache.put('b', 0.2)
+      cache.close()
+
+      cache = ResultCache(maxsize=1, path=path)
+      self.assertEqual(cache.get('a'), 0.1)
+      self.assertEqual(cache.stats.persistent_hits, 1)
+      self.assertEqual(cache.get('a'), 0.1)
+      self.assertEqual(cache.stats.memory_hits, 1)
+      cache.close()
+
+  def test_compute_with_cache(self):
+    cache = ResultCache()
+    my_chances = compute([DK, CK], [SJ, SQ, SK, HK], cache=cache)
+    self.assertEqual(cache.stats.misses, 1)
+    self.assertEqual(compute([HK, CK], [DJ, DQ, DK, SK], cache=cache), my_chances)
+    self.assertEqual(cache.stats.hits, 1)
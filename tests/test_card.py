@@ -54,6 +54,19 @@ class TestCard(unittest.TestCase):
     self.assertSetEqual({hc1}, {hc2})
 
 
+  def test_card_int_encoding(self):
+    cards = list(list_all_cards())
+    card_ints = [card_to_int(c) for c in cards]
+    self.assertListEqual(sorted(card_ints), list(range(52)))
+    for card, card_int in zip(cards, card_ints):
+      self.assertEqual(int_to_card(card_int), card)
+
+  def test_list_remaining_card_ints(self):
+    cards_seen = [Card(suit=Suit.SPADES, rank=Rank.TWO), Card(suit=Suit.CLUBS, rank=Rank.ACE)]
+    remaining_card_ints = list_remaining_card_ints(cards_to_mask(map(card_to_int, cards_seen)))
+    self.assertListEqual(
+        [int_to_card(c) for c in remaining_card_ints], list_remaining_cards(cards_seen))
+
   def test_parse(self):
     self.assertEqual(parse('S2'), Card(suit=Suit.SPADES, rank=Rank.TWO))
     self.assertEqual(parse('DJ'), Card(suit=Suit.DIAMONDS, rank=Rank.JACK))
@@ -0,0 +1,51 @@
+import io
+import json
+import unittest
+
+from texas_holdem.cli import run_batch
+from texas_holdem.hand_range import HandRange
+from texas_holdem.my_chances import compute
+from texas_holdem.shorthand_notations import *
+
+
+class TestBatch(unittest.TestCase):
+  def test_json_lines_in_order(self):
+    queries = [
+        '{"id": "q1", "hc": ["S2", "DA"], "cc": ["H2", "D3", "S5", "C9"]}',
+        '{"hc": "SK SQ"}',
+        '',
+        '{"hc": "SK SX"}',
+        'not json',
+        '{"id": 7, "hc": "S2 DA", "cc": "H2 D3 S5 C9 CA", "range": "TT+, AJs+"}',
+        '{"hc": "S2 S2"}',
+    ]
+    output = io.StringIO()
+    num_failed = run_batch(queries, output, processes=2, jobs=3)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    self.assertEqual(num_failed, 3)
+    self.assertEqual([r['id'] for r in results], ['q1', 1, 2, 3, 7, 5])
+    self.assertAlmostEqual(results[0]['chances'], compute([S2, DA], [H2, D3, S5, C9]), places=12)
+    self.assertAlmostEqual(results[1]['chances'], compute([SK, SQ], []), places=12)
+    self.assertAlmostEqual(
+        results[4]['chances'],
+        compute([S2, DA], [H2, D3, S5, C9, CA], HandRange.parse('TT+, AJs+')), places=12)
+    for i in (2, 3, 5):
+      self.assertIn('error', results[i])
+
+  def test_csv_unordered(self):
+    queries = io.StringIO(
+        'id,hc,cc,range\n' +
+        'q1,S2 DA,H2 D3 S5 C9,\n' +
+        'q2,SK SQ,H2 D3 S5 C9,"TT+, AJs+"\n' +
+        'q3,S2 DA,H2 D3 S5 C9 CA,\n')
+    output = io.StringIO()
+    self.assertEqual(run_batch(queries, output, 'csv', ordered=False, processes=2, jobs=2), 0)
+    lines = output.getvalue().splitlines()
+    self.assertEqual(lines[0], 'id,chances,error')
+    results = {line.split(',')[0]: float(line.split(',')[1]) for line in lines[1:]}
+    self.assertEqual(set(results), {'q1', 'q2', 'q3'})
+    self.assertAlmostEqual(results['q3'], compute([S2, DA], [H2, D3, S5, C9, CA]), places=12)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from texas_holdem.cache import ResultCache
+from texas_holdem.engine import EquityEngine
+from texas_holdem.my_chances import ComputationCancelled, compute, compute_async
+from texas_holdem.shorthand_notations import *
+
+from tests import NoAces
+
+
+def _square(x):
+  return x * x
+
+
+class TestEquityEngine(unittest.TestCase):
+  def test_compute(self):
+    with EquityEngine(processes=2) as engine:
+      self.assertEqual(
+          engine.compute([DK, CK], [SJ, SQ, SK, HK]), compute([DK, CK], [SJ, SQ, SK, HK]))
+      self.assertEqual(engine.compute([S2, DA], []), compute([S2, DA], []))
+
+  def test_pool_is_reused(self):
+    with EquityEngine(processes=2) as engine:
+      engine.compute([DK, CK], [SJ, SQ, SK, HK])
+      pool = engine._pool
+      engine.compute([S2, DA], [H2, D3, S5, C9])
+      self.assertIs(engine._pool, pool)
+
+  def test_compute_batch(self):
+    queries = [
+        ([DK, CK], [SJ, SQ, SK, HK]),
+        ([S2, DA], [H2, D3, S5, C9, CA]),
+        ([HK, CK], [DJ, DQ, DK, SK]),  # Same as the first one up to the suits.
+    ]
+    cache = ResultCache()
+    with EquityEngine(processes=2, cache=cache) as engine:
+      results = engine.compute_batch(queries)
+    self.assertListEqual(results, [compute(*q) for q in queries])
+    self.assertEqual(cache.stats.misses, 2)
+
+  def test_compute_async(self):
+    queries = [
+        ([DK, CK], [SJ, SQ, SK, HK]),
+        ([S2, DA], [H2, D3, S5, C9, CA]),
+        ([HK, CK], [DJ, DQ, DK, SK]),
+    ]
+
+    async def compute_all(engine):
+      return (
+          await engine.compute_async([S2, DA], [H2, D3, S5, C9]),
+          await engine.compute_batch_async(queries),
+          await compute_async([S2, DA], [H2, D3, S5, C9, CA]))
+    with EquityEngine(processes=2) as engine:
+      loop = asyncio.new_event_loop()
+      try:
+        chances, batch_results, shared_engine_chances = loop.run_until_complete(
+            compute_all(engine))
+      finally:
+        loop.close()
+    self.assertEqual(chances, compute([S2, DA], [H2, D3, S5, C9]))
+    self.assertListEqual(batch_results, [compute(*q) for q in queries])
+    self.assertEqual(shared_engine_chances, compute([S2, DA], [H2, D3, S5, C9, CA]))
+
+  def test_cancelled_computation_stops_in_the_workers(self):
+    cache = ResultCache()
+    outcomes = []
+
+    async def cancel_and_compute_another(engine):
+      # Takes seconds with a single worker process.
+      slow = asyncio.ensure_future(engine.compute_async([S2, DA], [H2, D3, S5], NoAces()))
+      await asyncio.sleep(0.2)
+      slow.cancel()
+      with self.assertRaises(asyncio.CancelledError):
+        await slow
+      await engine.compute_async([S2, DA], [H2, D3, S5, C9])
+    with EquityEngine(processes=1, cache=cache) as engine:
+      engine.compute([S2, DA], [H2, D3, S5, C9])  # Starts the pool.
+      cache.clear()
+      compute_ = engine._compute
+
+      def record_outcome(hole_cards, community_cards, *args):
+        try:
+          chances = compute_(hole_cards, community_cards, *args)
+        except ComputationCancelled as e:
+          outcomes.append((len(community_cards), e))
+          raise
+        outcomes.append((len(community_cards), chances))
+        return chances
+      with mock.patch.object(engine, '_compute', record_outcome):
+        loop = asyncio.new_event_loop()
+        try:
+          loop.run_until_complete(cancel_and_compute_another(engine))
+        finally:
+          loop.close()
+    # Closing the engine waited for the cancelled computation, which stopped before finishing.
+    outcomes = dict(outcomes)
+    self.assertIsInstance(outcomes[3], ComputationCancelled)
+    self.assertEqual(outcomes[4], compute([S2, DA], [H2, D3, S5, C9]))
+    self.assertEqual(cache.stats.size, 1)
+    self.assertEqual(sorted(engine._free_cancel_indices), list(range(len(engine._cancel_flags))))
+    self.assertFalse(any(engine._cancel_flags))
+
+  def test_count_cases_per_board(self):
+    with EquityEngine(processes=2) as engine:
+      cases = engine.count_cases_per_board([S2, DA], [H2, D3, S5, C9])
+    self.assertEqual(len(cases), 46)
+    bad_cases = sum(bad for bad, _ in cases.values())
+    all_cases = sum(all_ for _, all_ in cases.values())
+    self.assertAlmostEqual(
+        1 - bad_cases / all_cases, compute([S2, DA], [H2, D3, S5, C9]), places=12)
+
+  def test_map_unordered(self):
+    stats = []
+    with EquityEngine(processes=2, stats_hook=stats.append) as engine:
+      self.assertListEqual(
+          sorted(engine.map_unordered(_square, range(10))), [i * i for i in range(10)])
+      pool = engine._pool
+      self.assertListEqual(list(engine.map_unordered(_square, [])), [])
+      self.assertIs(engine._pool, pool)
+    self.assertEqual(len(stats), 2)
+    self.assertIn('pool_startup', stats[0].wall_times)
+    self.assertNotIn('pool_startup', stats[1].wall_times)
+
+  def test_closed_engine_cannot_be_used(self):
+    engine = EquityEngine(processes=1)
+    engine.close()
+    with self.assertRaises(RuntimeError):
+      engine.compute([DK, CK], [SJ, SQ, SK, HK])
+    with self.assertRaises(RuntimeError):
+      engine.map_unordered(_square, range(10))
@@ -1,5 +1,13 @@
+import importlib.util
+import multiprocessing
+import os
+import random
+import tempfile
 import unittest
+from unittest import mock
 
+from texas_holdem import evaluate_hand
+from texas_holdem.card import card_to_int, list_all_cards
 from texas_holdem.evaluate_hand import *
 from texas_holdem.shorthand_notations import *
 
@@ -45,6 +53,27 @@ class TestHandValue(unittest.TestCase):
     self.assertFalse(hv1 > hv3)
 
 
+  def test_strength(self):
+    hand_values = [
+        HandValue(
+          rank=HandRank.HIGH_CARD,
+          tie_breaker_card_ranks=[Rank.ACE, Rank.NINE, Rank.EIGHT, Rank.SIX, Rank.FIVE]),
+        HandValue(
+          rank=HandRank.ONE_PAIR,
+          tie_breaker_card_ranks=[Rank.TWO, Rank.FIVE, Rank.FOUR, Rank.THREE]),
+        HandValue(
+          rank=HandRank.ONE_PAIR,
+          tie_breaker_card_ranks=[Rank.TWO, Rank.SIX, Rank.FOUR, Rank.THREE]),
+        HandValue(rank=HandRank.FULL_HOUSE, tie_breaker_card_ranks=[Rank.THREE, Rank.TWO]),
+        HandValue(rank=HandRank.ROYAL_FLUSH, tie_breaker_card_ranks=[]),
+    ]
+    strengths = [hv.strength for hv in hand_values]
+    self.assertListEqual(strengths, sorted(strengths))
+    self.assertEqual(len(set(strengths)), len(strengths))
+    for hv in hand_values:
+      self.assertEqual(HandValue.from_strength(hv.strength), hv)
+
+
 class TestEvaluateHand(unittest.TestCase):
   def test_high_card(self):
     hole_cards = [S2, S3]
@@ -218,3 +247,104 @@ class TestEvaluateHand(unittest.TestCase):
         rank=HandRank.ROYAL_FLUSH,
         tie_breaker_card_ranks=[])
     self.assertEqual(hand_value, expected)
+
+
+# The numpy engine can only be tested if NumPy is installed.
+_ENGINES_TO_TEST = [
+    e for e in ENGINES if e != 'numpy' or importlib.util.find_spec('numpy') is not None]
+
+
+class TestEngines(unittest.TestCase):
+  def test_engines_give_the_same_hand_value(self):
+    deck = list(range(52))
+    rng = random.Random(0)
+    hands = [rng.sample(deck, 7) for _ in range(2000)]
+    reference = get_evaluator('rank_checks')
+    for engine in _ENGINES_TO_TEST:
+      evaluate = get_evaluator(engine)
+      for cards in hands:
+        self.assertEqual(evaluate(cards), reference(cards), msg=(engine, cards))
+
+  def test_evaluate_hole_cards(self):
+    board = [card_to_int(c) for c in [C5, C6, D8, D9, HA]]
+    hole_cards_list = [
+        (card_to_int(c1), card_to_int(c2)) for c1, c2 in [(S2, S3), (S7, H10), (HK, HQ), (H2, H3)]]
+    for engine in _ENGINES_TO_TEST:
+      self.assertListEqual(
+          evaluate_hole_cards(board, hole_cards_list, engine=engine),
+          [evaluate((c1, c2, *board), engine=engine) for c1, c2 in hole_cards_list])
+
+  def test_set_default_engine(self):
+    hole_cards = [S2, S3]
+    board = [C5, C6, D8, D9, HA]
+    try:
+      set_default_engine('rank_checks')
+      self.assertIs(get_evaluator(), get_evaluator('rank_checks'))
+      self.assertEqual(
+          get_hand_value(hole_cards, board), get_hand_value(hole_cards, board, 'lookup'))
+    finally:
+      set_default_engine('lookup')
+    with self.assertRaises(ValueError):
+      set_default_engine('unknown')
+
+  def test_lookup_tables_file_is_up_to_date(self):
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, 'lookup_tables.bin')
+      save_lookup_tables(path)
+      with open(path, 'rb') as generated, open(TABLES_PATH, 'rb') as shipped:
+        self.assertEqual(generated.read(), shipped.read(), msg='Regenerate lookup_tables.bin.')
+
+  def test_lookup_tables_are_mapped_from_the_expanded_tables(self):
+    built_tables = evaluate_hand._build_lookup_tables()
+    with tempfile.TemporaryDirectory() as directory, \
+        mock.patch.object(evaluate_hand, '_private_directory', return_value=directory):
+      # The first load expands the tables into a file, the later ones only map it.
+      for _ in range(2):
+        tables = evaluate_hand._load_lookup_tables()
+        self.assertEqual(len(os.listdir(directory)), 1)
+        for table, built_table in zip(tables, built_tables):
+          self.assertIsInstance(table, memoryview)
+          self.assertEqual(table.tobytes(), built_table.tobytes())
+      # A partially written file is replaced.
+      path = os.path.join(directory, os.listdir(directory)[0])
+      os.truncate(path, 1000)
+      tables = evaluate_hand._load_lookup_tables()
+      self.assertEqual(tables.rank_table.tobytes(), built_tables.rank_table.tobytes())
+
+  def test_poisoned_expanded_tables_are_replaced(self):
+    built_tables = evaluate_hand._build_lookup_tables()
+    with tempfile.TemporaryDirectory() as directory, \
+        mock.patch.object(evaluate_hand, '_private_directory', return_value=directory):
+      evaluate_hand._load_lookup_tables()
+      path = os.path.join(directory, os.listdir(directory)[0])
+      # Makes a straight flush the weakest hand.
+      with open(path, 'r+b') as f:
+        f.seek(2 * (evaluate_hand._MAX_RANK_KEY + 1) + (1 << 12) + 2 * 0b11111)
+        f.write(bytes(2))
+      tables = evaluate_hand._load_lookup_tables()
+      self.assertEqual(tables.flush_table.tobytes(), built_tables.flush_table.tobytes())
+      self.assertEqual(os.listdir(directory), [os.path.basename(path)])
+
+  @unittest.skipUnless(hasattr(os, 'getuid'), 'The temporary directory is private on Windows.')
+  def test_expanded_tables_are_only_written_to_a_private_directory(self):
+    with tempfile.TemporaryDirectory() as directory, \
+        mock.patch.object(tempfile, 'gettempdir', return_value=directory):
+      private_directory = evaluate_hand._private_directory()
+      self.assertEqual(os.stat(private_directory).st_mode & 0o777, 0o700)
+      self.assertEqual(evaluate_hand._private_directory(), private_directory)
+      os.chmod(private_directory, 0o777)
+      with self.assertRaises(OSError):
+        evaluate_hand._private_directory()
+      tables = evaluate_hand._load_lookup_tables()
+      self.assertNotIsInstance(tables.rank_table, memoryview)
+      self.assertEqual(os.listdir(private_directory), [])
+
+  def test_worker_processes_map_the_lookup_tables(self):
+    # Spawned worker processes don't inherit the tables, but they map the same file.
+    with multiprocessing.get_context('spawn').Pool(2) as pool:
+      table_types = pool.map(_lookup_tables_type, range(2))
+    self.assertEqual(table_types, ['memoryview', 'memoryview'])
+
+
+def _lookup_tables_type(_):
+  return type(evaluate_hand._lookup_tables().rank_table).__name__
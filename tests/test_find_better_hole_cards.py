@@ -1,8 +1,10 @@
 import unittest
+from itertools import combinations
 
-from texas_holdem.card import HoleCards, Board
+from texas_holdem.card import HoleCards, Board, card_to_int, cards_to_mask, list_remaining_card_ints
+from texas_holdem.evaluate_hand import evaluate
 from texas_holdem.shorthand_notations import *
-from texas_holdem.find_better_hole_cards import find_better_hole_cards
+from texas_holdem.find_better_hole_cards import count_better_hole_cards, find_better_hole_cards
 
 
 class TestFindBetterHoleCards(unittest.TestCase):
@@ -22,3 +24,14 @@ class TestFindBetterHoleCards(unittest.TestCase):
         HoleCards(S10, SA)
         }
     self.assertSetEqual(better_hole_cards, expected)
+
+  def test_count_better_hole_cards(self):
+    board = [card_to_int(c) for c in (H5, C5, SJ, SQ, SK)]
+    my_hole_cards = [card_to_int(c) for c in (HQ, CQ)]
+    counts = count_better_hole_cards(my_hole_cards, board)
+    my_strength = evaluate((*my_hole_cards, *board))
+    strengths = [evaluate((c1, c2, *board)) for c1, c2 in combinations(
+        list_remaining_card_ints(cards_to_mask(my_hole_cards + board)), 2)]
+    self.assertEqual(counts.better, 6)
+    self.assertEqual(counts.tied, sum(1 for s in strengths if s == my_strength))
+    self.assertEqual(counts.worse, sum(1 for s in strengths if s < my_strength))
@@ -0,0 +1,112 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from texas_holdem.cache import ResultCache
+from texas_holdem.engine import EquityEngine
+from texas_holdem.hand_history import analyze, analyze_file, parse_hand
+from texas_holdem.hand_range import HandRange
+from texas_holdem.my_chances import compute
+from texas_holdem.shorthand_notations import *
+
+
+_HAND_HISTORY = '''# The same hands up to the suits.
+h1 | S2 DA | H2 D3 S5 C9 | turn
+h2 | H2 SA | D2 S3 H5 C9 CA
+
+h3 | SK SQ
+h4 | S2 | H2 D3 S5
+h5 | SK SQ | H2 D3 S5 C9 | river
+'''
+
+
+class TestHandHistory(unittest.TestCase):
+  def test_parse_hand(self):
+    hand = parse_hand('h1 | S2 DA | H2 D3 S5 C9 | turn\n')
+    self.assertEqual(hand.id, 'h1')
+    self.assertEqual(hand.hole_cards, [S2, DA])
+    self.assertEqual(hand.community_cards, [H2, D3, S5, C9])
+    self.assertEqual(hand.all_in_street, 'turn')
+    self.assertEqual(parse_hand('h3 | SK SQ').community_cards, [])
+    for invalid in ('h1', 'h1 | S2 DA | H2', 'h1 | S2 DA | H2 D3 S5 | turn', 'h1 | S2 X9',
+                    'h1 | S2 S2', 'h1 | S2 DA | | showdown'):
+      with self.assertRaises(ValueError, msg=invalid):
+        parse_hand(invalid)
+
+  def test_analyze(self):
+    output = io.StringIO()
+    cache = ResultCache()
+    with EquityEngine(processes=2, cache=cache) as engine:
+      num_failed = analyze(io.StringIO(_HAND_HISTORY), output, engine=engine)
+    self.assertEqual(num_failed, 2)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    self.assertEqual([r['id'] for r in results], ['h1', 'h2', 'h3', 'h4', 'h5'])
+    expected_chances = {
+        'preflop': compute([S2, DA], []),
+        'flop': compute([S2, DA], [H2, D3, S5]),
+        'turn': compute([S2, DA], [H2, D3, S5, C9]),
+    }
+    self.assertEqual(
+        results[0], {'id': 'h1', 'chances': expected_chances,
+                     'all_in_chances': expected_chances['turn']})
+    self.assertEqual(results[1]['chances'], {
+        **expected_chances, 'river': compute([H2, SA], [D2, S3, H5, C9, CA])})
+    self.assertEqual(results[2], {'id': 'h3', 'chances': {'preflop': compute([SK, SQ], [])}})
+    self.assertIn('hole cards', results[3]['error'])
+    self.assertIn('river', results[4]['error'])
+    # The situations of the first two hands are only computed once.
+    self.assertEqual(cache.stats.misses, 5)
+
+  def test_analyze_against_a_range(self):
+    output = io.StringIO()
+    history = 'h1 | S2 DA | H2 D3 S5 C9 CA\nh2 | S2 HA | H2 D3 S5 C9 CA\n'
+    against = HandRange.parse('TT+, AJs+')
+    # The chances before the flop against a range would take minutes to compute.
+    analyze(io.StringIO(history), output, against, streets=['turn', 'river'])
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    self.assertEqual(
+        results[0]['chances']['river'], compute([S2, DA], [H2, D3, S5, C9, CA], against))
+    self.assertEqual(
+        results[1]['chances']['turn'], compute([S2, HA], [H2, D3, S5, C9], against))
+    self.assertEqual(list(results[1]['chances']), ['turn', 'river'])
+
+  def test_preflop_is_skipped_against_a_range_by_default(self):
+    output = io.StringIO()
+    history = 'h1 | SK SQ\nh2 | S2 DA | H2 D3 S5\n'
+    against = HandRange.parse('TT+, AJs+')
+    analyze(io.StringIO(history), output, against)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    self.assertEqual(results[0], {'id': 'h1', 'chances': {}})
+    self.assertEqual(
+        results[1], {'id': 'h2', 'chances': {'flop': compute([S2, DA], [H2, D3, S5], against)}})
+
+  def test_resume(self):
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, 'hands.txt')
+      output_path = os.path.join(directory, 'results.jsonl')
+      with open(path, 'w') as f:
+        f.write(_HAND_HISTORY)
+      analyze_file(path, output_path, chunk_size=2)
+      with open(output_path) as f:
+        complete_output = f.read()
+
+      # Interrupted while writing the results of the third hand.
+      lines = complete_output.splitlines(keepends=True)
+      with open(output_path, 'w') as f:
+        f.write(''.join(lines[:2]) + lines[2][:10])
+      with EquityEngine(processes=1, cache=ResultCache()) as engine:
+        analyze_file(path, output_path, engine=engine)
+        # Only the chances of h3 before the flop were computed, the rest of the hands are invalid.
+        self.assertEqual(engine.cache.stats.misses, 1)
+      with open(output_path) as f:
+        self.assertEqual(f.read(), complete_output)
+
+      analyze_file(path, output_path, resume=False)
+      with open(output_path) as f:
+        self.assertEqual(f.read(), complete_output)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from unittest import mock
+
+from texas_holdem.card import card_to_int, int_to_card
+from texas_holdem.engine import EquityEngine
+from texas_holdem.hand_range import COMBOS, HandRange, NUM_COMBOS, combo_index
+from texas_holdem.my_chances import Opponent, _compute_weights
+from texas_holdem.shorthand_notations import *
+
+
+class TopPairsOrAceKing(Opponent):
+  'The callback equivalent of the range "TT+, AKs, AQo:0.5".'
+  def hole_cards_weight(self, opponents_hole_cards, board):
+    c1, c2 = opponents_hole_cards
+    ranks = sorted([c1.rank.value, c2.rank.value])
+    if ranks[0] == ranks[1] and ranks[0] >= 10:
+      return 1
+    if ranks == [13, 14] and c1.suit == c2.suit:
+      return 1
+    if ranks == [12, 14] and c1.suit != c2.suit:
+      return 0.5
+    return 0
+
+
+class TestHandRange(unittest.TestCase):
+  def test_combo_index(self):
+    self.assertEqual(NUM_COMBOS, 1326)
+    self.assertEqual([combo_index(c1, c2) for c1, c2 in COMBOS], list(range(NUM_COMBOS)))
+    self.assertEqual(combo_index(5, 40), combo_index(40, 5))
+
+  def test_number_of_combos(self):
+    cases = [
+        ('AA', 6), ('TT+', 30), ('TT-77', 24), ('77-TT', 24), ('AKs', 4), ('AKo', 12), ('AK', 16),
+        ('KA', 16), ('AJs+', 12), ('KTo-K7o', 48), ('76s', 4), ('AsKs', 1),
+        ('TT+, AJs+, KQo, 76s', 58), ('TT+ AJs+,KQo', 54), ('', 0)]
+    for notation, num_combos in cases:
+      with self.subTest(notation=notation):
+        self.assertEqual(len(HandRange.parse(notation)), num_combos)
+
+  def test_parse(self):
+    ace_king_of_spades = HandRange.parse('AsKs')
+    self.assertEqual([hc for hc, _ in ace_king_of_spades.combos()], [(SA, SK)])
+    self.assertEqual(HandRange.parse('AJs+'), HandRange.parse('AJs, AQs, AKs'))
+    self.assertEqual(HandRange.parse('AK'), HandRange.parse('AKs, AKo'))
+    weighted = HandRange.parse('AK:0.25, AKs')
+    self.assertEqual(weighted.hole_cards_weight((SA, SK), None), 1)
+    self.assertEqual(weighted.hole_cards_weight((SA, HK), None), 0.25)
+    for notation in ('AX', 'AAs', 'TT-AKo', 'AKs-QJs', 'AKs-AQo', 'AsAs', 'AK:x', 'AKs+-'):
+      with self.subTest(notation=notation):
+        with self.assertRaises(ValueError):
+          HandRange.parse(notation)
+
+  def test_set_operations(self):
+    high_pairs = HandRange.parse('TT+')
+    self.assertEqual(high_pairs | HandRange.parse('77-99'), HandRange.parse('77+'))
+    self.assertEqual(high_pairs & HandRange.parse('99-QQ'), HandRange.parse('TT-QQ'))
+    self.assertEqual(high_pairs - HandRange.parse('AA, KK'), HandRange.parse('TT-QQ'))
+    weighted = HandRange.parse('AA:0.5') | HandRange.parse('AA:0.25, KK:0.75')
+    self.assertEqual(weighted, HandRange.parse('AA:0.5, KK:0.75'))
+
+  def test_remove_cards(self):
+    aces = HandRange.parse('AA, AKs').remove_cards([SA, H2, D3])
+    self.assertEqual(len(aces), 3 + 3)
+    self.assertNotIn(SA, {c for hc, _ in aces.combos() for c in hc})
+
+  def test_suit_symmetry(self):
+    self.assertTrue(HandRange.parse('TT+, AJs+, KQo, 76s:0.5').suit_symmetric)
+    self.assertFalse(HandRange.parse('AsKs').suit_symmetric)
+    self.assertFalse(HandRange.parse('TT+').remove_cards([SA]).suit_symmetric)
+
+  def test_cache_key_depends_on_weights(self):
+    self.assertEqual(HandRange.parse('TT+').cache_key, HandRange.parse('AA-TT').cache_key)
+    self.assertNotEqual(HandRange.parse('TT+').cache_key, HandRange.parse('JJ+').cache_key)
+
+  def test_batch_weights(self):
+    hand_range = HandRange.parse('TT+, AKs, AQo:0.5')
+    board = tuple(card_to_int(c) for c in [H2, D3, S5])
+    holdings = [(c1, c2) for c1, c2 in COMBOS if c1 not in board and c2 not in board]
+    self.assertEqual(
+        list(hand_range.hole_cards_weights(board, holdings)),
+        [TopPairsOrAceKing().hole_cards_weight(
+            tuple(int_to_card(c) for c in hc), None) for hc in holdings])
+
+  def test_weights_are_selected_from_the_vector(self):
+    hand_range = HandRange.parse('TT+, AKs, AQo:0.5')
+    hole_cards = (card_to_int(S2), card_to_int(DA))
+    for board in [(), (card_to_int(H2), card_to_int(D3), card_to_int(S5), card_to_int(C9))]:
+      with mock.patch.object(HandRange, 'hole_cards_weights', side_effect=AssertionError):
+        holdings, weights = _compute_weights(hole_cards, board, hand_range)
+      self.assertEqual(weights, list(hand_range.hole_cards_weights(board, holdings)))
+
+  def test_same_chances_as_the_equivalent_opponent(self):
+    hand_range = HandRange.parse('TT+, AKs, AQo:0.5')
+    with EquityEngine(processes=2) as engine:
+      for hole_cards, community_cards in [
+          ([S2, DA], [H2, D3, S5]), ([SK, SQ], [HA, DK, S5, C9]), ([C7, C8], [H2, D3, S5, C9, CA])]:
+        self.assertAlmostEqual(
+            engine.compute(hole_cards, community_cards, against=hand_range),
+            engine.compute(hole_cards, community_cards, against=TopPairsOrAceKing()), places=12)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from texas_holdem.engine import EquityEngine
+from texas_holdem.hand_tracker import HandTracker
+from texas_holdem.my_chances import compute
+from texas_holdem.shorthand_notations import *
+
+from tests import NoAces
+
+
+class TestHandTracker(unittest.TestCase):
+  def test_same_chances_as_compute_on_every_street(self):
+    hole_cards = [S2, DA]
+    streets = [[H2, D3, S5], [H2, D3, S5, C9], [H2, D3, S5, C9, CA]]
+    with EquityEngine(processes=2) as engine:
+      for against in (None, NoAces()):
+        tracker = HandTracker(hole_cards, against, engine=engine)
+        # Enumerating the boards before the flop with assumptions would take too long.
+        for community_cards in ([[]] if against is None else []) + streets:
+          self.assertAlmostEqual(
+              tracker.compute(community_cards),
+              engine.compute(hole_cards, community_cards, against), places=12)
+
+  def test_results_of_the_flop_are_reused(self):
+    with HandTracker([S2, DA]) as tracker:
+      tracker.compute([H2, D3, S5])
+      num_boards_on_the_flop = len(tracker._cases)
+      tracker.compute([H2, D3, S5, C9])
+      self.assertEqual(num_boards_on_the_flop, 47 * 46 // 2)
+      self.assertEqual(len(tracker._cases), 46)
+
+  def test_new_hand_is_enumerated_again(self):
+    with HandTracker([S2, DA]) as tracker:
+      tracker.compute([H2, D3, S5, C9])
+      self.assertEqual(
+          tracker.compute([HK, DK, SK, CK]), compute([S2, DA], [HK, DK, SK, CK]))
+
+  def test_closed_engine_cannot_be_used(self):
+    engine = EquityEngine(processes=1)
+    tracker = HandTracker([S2, DA], engine=engine)
+    engine.close()
+    with self.assertRaises(RuntimeError):
+      tracker.compute([H2, D3, S5])
@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+import time
+import unittest
+
+# The time of importing the CLI relative to starting a bare interpreter. Generous enough for slow
+# CI machines and older interpreters (e.g. `typing` alone takes longer than starting Python 3.6),
+# while catching e.g. the lookup tables being built on import.
+_IMPORT_TIME_BUDGET = 10
+
+
+def _run_python(code):
+  output = subprocess.run(
+      [sys.executable, '-c', code], stdout=subprocess.PIPE, universal_newlines=True,
+      check=True).stdout
+  return json.loads(output)
+
+
+def _time_subprocess(args):
+  start = time.perf_counter()
+  subprocess.run(args, check=True)
+  return time.perf_counter() - start
+
+
+class TestImportTime(unittest.TestCase):
+  def test_importing_the_package_is_cheap(self):
+    modules = _run_python(
+        'import json, sys, texas_holdem; print(json.dumps(list(sys.modules)))')
+    for module in ('multiprocessing', 'asyncio', 'sqlite3', 'texas_holdem.my_chances'):
+      self.assertNotIn(module, modules)
+
+  def test_exports_are_imported_on_first_use(self):
+    import texas_holdem
+    from texas_holdem.my_chances import compute
+    self.assertIs(texas_holdem.compute_my_chances, compute)
+    self.assertIn('compute_my_chances', dir(texas_holdem))
+    with self.assertRaises(AttributeError):
+      texas_holdem.unknown
+
+  def test_computing_on_the_river_does_not_start_processes(self):
+    modules = _run_python(
+        'import contextlib, io, json, sys\n'
+        'from texas_holdem.cli import main\n'
+        'with contextlib.redirect_stdout(io.StringIO()):\n'
+        '  main(["--hc", "S2", "DA", "--cc", "H2", "D3", "S5", "C9", "CA"])\n'
+        'print(json.dumps(list(sys.modules)))')
+    for module in ('multiprocessing.pool', 'concurrent.futures', 'asyncio', 'sqlite3'):
+      self.assertNotIn(module, modules)
+
+  def test_import_time_budget(self):
+    # The fastest of a few runs, so that a busy machine doesn't fail the test.
+    startup_time = min(_time_subprocess([sys.executable, '-c', 'pass']) for _ in range(3))
+    import_time = min(_run_python(
+        'import time\n'
+        'start = time.perf_counter()\n'
+        'import texas_holdem.cli\n'
+        'print(time.perf_counter() - start)') for _ in range(3))
+    self.assertLess(import_time, _IMPORT_TIME_BUDGET * startup_time)
+
+
+if __name__ == '__main__':
+  unittest.main()
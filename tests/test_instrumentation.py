@@ -0,0 +1,74 @@
+import json
+import unittest
+from collections import Counter
+from itertools import combinations
+
+from texas_holdem.card import card_to_int
+from texas_holdem.engine import EquityEngine
+from texas_holdem.evaluate_hand import HandRank, evaluate
+from texas_holdem.hand_range import HandRange
+from texas_holdem.instrumentation import ComputationStats
+from texas_holdem.my_chances import Opponent, compute
+from texas_holdem.shorthand_notations import *
+
+
+class TestInstrumentation(unittest.TestCase):
+  def test_compute_on_the_turn(self):
+    stats = ComputationStats()
+    chances = compute([S2, DA], [H2, D3, S5, C9], stats=stats)
+    self.assertEqual(chances, compute([S2, DA], [H2, D3, S5, C9]))
+    self.assertEqual(stats.num_boards, 46)
+    self.assertEqual(stats.num_boards_represented, 46)
+    self.assertEqual(stats.num_holdings, 46 * 990)
+    # Your hand and the hands of the opponent's hole cards on each board.
+    self.assertEqual(stats.num_hands_evaluated, 46 * 991)
+    hole_cards = [card_to_int(c) for c in [S2, DA]]
+    community_cards = [card_to_int(c) for c in [H2, D3, S5, C9]]
+    remaining_cards = set(range(52)) - set(hole_cards + community_cards)
+    hand_ranks: Counter = Counter()
+    for river_card in remaining_cards:
+      board = community_cards + [river_card]
+      for hc in [hole_cards, *combinations(remaining_cards - {river_card}, 2)]:
+        hand_ranks[HandRank(evaluate(board + list(hc)) >> 20)] += 1
+    self.assertEqual(stats.hand_ranks, hand_ranks)
+    for phase in ('pool_startup', 'tasks', 'pickling', 'evaluation', 'worker', 'wait', 'total'):
+      self.assertGreater(stats.wall_times[phase], 0)
+      self.assertIn(phase, stats.cpu_times)
+    self.assertNotIn('weights', stats.wall_times)
+    self.assertGreater(stats.ipc_bytes_sent, 0)
+    self.assertGreater(stats.ipc_bytes_received, 0)
+    self.assertTrue(stats.peak_memory)
+    json.dumps(stats.as_dict())
+
+  def test_stats_hook(self):
+    class Local(Opponent):
+      def hole_cards_weight(self, opponents_hole_cards, board):
+        return 1
+
+    received = []
+    with EquityEngine(processes=2, stats_hook=received.append) as engine:
+      engine.compute([S2, DA], [H2, D3, S5, C9, CA], HandRange.parse('TT+, AJs+'))
+      engine.compute([S2, DA], [H2, D3, S5, C9, CA], Local())
+      engine.compute([S2, DA], [])
+    self.assertEqual(len(received), 3)
+    range_stats, local_stats, preflop_stats = received
+    self.assertEqual(range_stats.num_boards, 1)
+    self.assertGreater(range_stats.wall_times['weights'], 0)
+    # The weights of the local opponent are computed in this process and sent to the workers.
+    self.assertNotIn('weights', local_stats.wall_times)
+    self.assertGreater(local_stats.ipc_bytes_sent, 990)
+    self.assertEqual(local_stats.num_hands_evaluated, 1 + 990)
+    self.assertIn('preflop_table', preflop_stats.wall_times)
+    self.assertEqual(preflop_stats.num_boards, 0)
+
+    merged = ComputationStats()
+    for stats in received:
+      merged.merge(stats)
+    self.assertEqual(merged.num_boards, 2)
+    self.assertEqual(merged.hand_ranks, range_stats.hand_ranks + local_stats.hand_ranks)
+    self.assertAlmostEqual(
+        merged.wall_times['total'], sum(stats.wall_times['total'] for stats in received))
+
+
+if __name__ == '__main__':
+  unittest.main()
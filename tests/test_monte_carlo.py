@@ -0,0 +1,55 @@
+import unittest
+
+from texas_holdem.engine import EquityEngine
+from texas_holdem.monte_carlo import estimate_by_sampling
+from texas_holdem.my_chances import compute, estimate, Opponent, OpponentError
+from texas_holdem.shorthand_notations import *
+
+from tests import ints
+
+
+class NoFaceCards(Opponent):
+  'Defined at the module level so that it can be sent to the worker processes.'
+  def hole_cards_weight(self, opponents_hole_cards, board):
+    return 0 if any(c.rank.value in (11, 12, 13) for c in opponents_hole_cards) else 1
+
+
+class TestMonteCarlo(unittest.TestCase):
+  def test_estimate_is_close_to_the_exact_chances(self):
+    hole_cards, community_cards = [S2, DA], [H2, D3, S5, C9]
+    for against in (None, NoFaceCards()):
+      exact = compute(hole_cards, community_cards, against)
+      result = estimate(hole_cards, community_cards, against, max_samples=20000, seed=0)
+      self.assertEqual(result.num_samples, 20000)
+      self.assertLess(abs(result.chances - exact), 5 * result.standard_error)
+      low, high = result.confidence_interval
+      self.assertLess(low, result.chances)
+      self.assertLess(result.chances, high)
+
+  def test_same_seed_gives_the_same_estimate(self):
+    with EquityEngine(processes=2) as engine:
+      results = [
+          engine.estimate([S2, DA], [H2, D3, S5], max_samples=5000, seed=42) for _ in range(2)]
+    self.assertEqual(results[0], results[1])
+    # The parallel sampling draws the same samples as the serial one.
+    self.assertEqual(
+        estimate_by_sampling(ints(S2, DA), ints(H2, D3, S5), max_samples=5000, seed=42),
+        results[0])
+
+  def test_stops_at_target_error(self):
+    result = estimate_by_sampling(ints(S2, DA), ints(H2, D3, S5), target_error=0.01, seed=0)
+    self.assertLessEqual(result.standard_error, 0.01)
+    self.assertLess(result.num_samples, 10000)
+
+  def test_preflop_uses_the_table(self):
+    result = estimate([S2, DA], [])
+    self.assertEqual(result.chances, compute([S2, DA], []))
+    self.assertEqual(result.standard_error, 0)
+
+  def test_error_when_all_weights_are_zero(self):
+    class AllZeros(Opponent):
+      def hole_cards_weight(self, hole_cards, board):
+        return 0
+
+    with self.assertRaises(OpponentError):
+      estimate_by_sampling(ints(S2, DA), ints(H2, D3, S5), AllZeros(), max_samples=100)
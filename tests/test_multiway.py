@@ -0,0 +1,56 @@
+import random
+import unittest
+from itertools import combinations
+
+from texas_holdem.engine import EquityEngine
+from texas_holdem.monte_carlo import estimate_by_sampling
+from texas_holdem.multiway import count_disjoint_holdings
+from texas_holdem.my_chances import compute, compute_multiway
+from texas_holdem.shorthand_notations import *
+
+from tests import ints
+
+
+class TestMultiway(unittest.TestCase):
+  def test_count_disjoint_holdings(self):
+    rng = random.Random(0)
+    for _ in range(10):
+      holdings = [hc for hc in combinations(range(9), 2) if rng.random() < 0.7]
+      weights = {hc: rng.choice([0, 0.5, 1, 2]) for hc in holdings}
+      for num_opponents in (1, 2, 3):
+        expected = 0
+        for dealt in combinations(holdings, num_opponents):
+          cards = [c for hc in dealt for c in hc]
+          if len(set(cards)) == len(cards):
+            product = 1
+            for hc in dealt:
+              product *= weights[hc]
+            expected += product
+        self.assertAlmostEqual(
+            count_disjoint_holdings(holdings, num_opponents, weights), expected)
+
+  def test_one_opponent_is_the_same_as_compute(self):
+    result = compute_multiway([S2, DA], [H2, D3, S5, C9, CA], 1)
+    self.assertEqual(result.chances, compute([S2, DA], [H2, D3, S5, C9, CA]))
+    self.assertEqual(result.standard_error, 0)
+
+  def test_exact_matches_sampling(self):
+    hole_cards, community_cards = [S2, DA], [H2, D3, S5, C9, CA]
+    with EquityEngine(processes=2) as engine:
+      for num_opponents in (2, 3):
+        exact = engine.compute_multiway(hole_cards, community_cards, num_opponents)
+        self.assertEqual(exact.num_samples, 0)
+        sampled = estimate_by_sampling(
+            ints(*hole_cards), ints(*community_cards), max_samples=20000, seed=0,
+            num_opponents=num_opponents)
+        self.assertLess(abs(sampled.chances - exact.chances), 5 * sampled.standard_error)
+        # Having more opponents makes it harder to have the best hand.
+        self.assertLess(exact.chances, compute(hole_cards, community_cards))
+
+  def test_falls_back_to_sampling(self):
+    result = compute_multiway([S2, DA], [H2, D3, S5, C9, CA], 5, max_samples=2000, seed=0)
+    self.assertEqual(result.num_samples, 2000)
+
+  def test_number_of_opponents_is_checked(self):
+    with self.assertRaises(ValueError):
+      compute_multiway([S2, DA], [H2, D3, S5], 23)
@@ -1,13 +1,36 @@
+import pickle
 import unittest
 
-from texas_holdem.card import HoleCards
-from texas_holdem.my_chances import compute, n_choose_m, Opponent, OpponentError
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+from texas_holdem.card import HoleCards, Rank, card_to_int
+from texas_holdem.my_chances import compute, compute_by_enumeration, n_choose_m, Opponent, \
+    OpponentError
 from texas_holdem.shorthand_notations import *
 
+from tests import NoAces
+
 
 class TestMyChances(unittest.TestCase):
   def test_n_choose_m(self):
     self.assertEqual(n_choose_m(7, 3), 35)
+    self.assertEqual(n_choose_m(7, 0), 1)
+
+  def test_result_does_not_depend_on_the_number_of_shards(self):
+    hole_cards = tuple(card_to_int(c) for c in (DK, CQ))
+    community_cards = tuple(card_to_int(c) for c in (SJ, S2, H7, D9))
+    for against in (None, NoAces()):
+      results = [
+          compute_by_enumeration(hole_cards, community_cards, against, num_processes=n)
+          for n in (1, 3)]
+      self.assertAlmostEqual(results[0], results[1], places=12)
+
+  def test_opponent_error_can_be_pickled(self):
+    error = OpponentError('Something is wrong.')
+    self.assertEqual(str(pickle.loads(pickle.dumps(error))), str(error))
 
   def test_my_chances(self):
     my_chances = compute([DK, CK], [SJ, SQ, SK, HK])
@@ -58,6 +81,76 @@ class TestMyChances(unittest.TestCase):
     opponents_chance = (1 + 2 + 1) / all_possibilities
     self.assertEqual(my_chances, 1 - opponents_chance)
 
+  def test_my_chances_with_suit_symmetric_assumptions(self):
+    'Skipping boards that only differ in the suits gives the same result.'
+    class NoHighCards(Opponent):
+      def hole_cards_weight(self, hole_cards, board):
+        return 0 if max(c.rank for c in hole_cards) >= Rank.JACK else 1
+
+    class SuitSymmetricNoHighCards(NoHighCards):
+      suit_symmetric = True
+
+    hole_cards = [D4, C4]
+    community_cards = [S2, S7, HK, HA]
+    my_chances = compute(hole_cards, community_cards, against=NoHighCards())
+    self.assertAlmostEqual(
+        compute(hole_cards, community_cards, against=SuitSymmetricNoHighCards()), my_chances)
+
+  def test_my_chances_with_batch_assumptions(self):
+    'Computing the weights of every hole cards at once gives the same result.'
+    class NoHighCards(Opponent):
+      def hole_cards_weight(self, hole_cards, board):
+        return 0 if max(c.rank for c in hole_cards) >= Rank.JACK else 1
+
+    class BatchNoHighCards(NoHighCards):
+      def hole_cards_weight(self, hole_cards, board):
+        raise AssertionError('The batch method should be used.')
+
+      def hole_cards_weights(self, board, holdings):
+        return [0 if max(c1 % 13, c2 % 13) >= Rank.JACK - 2 else 1 for c1, c2 in holdings]
+
+    hole_cards = [D4, C4]
+    community_cards = [S2, S7, HK, HA]
+    self.assertEqual(
+        compute(hole_cards, community_cards, against=BatchNoHighCards()),
+        compute(hole_cards, community_cards, against=NoHighCards()))
+
+  @unittest.skipIf(np is None, 'NumPy is not installed.')
+  def test_my_chances_with_numpy_weights(self):
+    class NoHighCards(Opponent):
+      def hole_cards_weight(self, hole_cards, board):
+        return 0 if max(c.rank for c in hole_cards) >= Rank.JACK else 1
+
+    class NumPyNoHighCards(NoHighCards):
+      def hole_cards_weights(self, board, holdings):
+        ranks = np.array(holdings) % 13
+        return np.where(ranks.max(axis=1) >= Rank.JACK - 2, 0.0, 1.0)
+
+    class NumPyNegativeWeights(NoHighCards):
+      def hole_cards_weights(self, board, holdings):
+        return -np.ones(len(holdings))
+
+    hole_cards = [D4, C4]
+    community_cards = [S2, S7, HK, HA]
+    self.assertAlmostEqual(
+        compute(hole_cards, community_cards, against=NumPyNoHighCards()),
+        compute(hole_cards, community_cards, against=NoHighCards()))
+    with self.assertRaises(OpponentError) as exc:
+      compute(hole_cards, community_cards, against=NumPyNegativeWeights())
+    self.assertIn('returns negative weights', str(exc.exception))
+
+  def test_error_when_batch_weights_have_wrong_length(self):
+    class TooFewWeights(Opponent):
+      def hole_cards_weight(self, hole_cards, board):
+        return 1
+
+      def hole_cards_weights(self, board, holdings):
+        return [1] * (len(holdings) - 1)
+
+    with self.assertRaises(OpponentError) as exc:
+      compute([DK, CK], [SJ, SQ, SK, HK], against=TooFewWeights())
+    self.assertIn('weights for', str(exc.exception))
+
   def test_error_when_assuming_negative_weight(self):
     '''Only non-negative weights should be used for assumptions.
 
@@ -0,0 +1,37 @@
+import unittest
+from collections import Counter
+from itertools import combinations
+
+from texas_holdem.card import card_to_int
+from texas_holdem.find_better_hole_cards import find_better_hole_card_ints
+from texas_holdem.my_chances import compute
+from texas_holdem.preflop_table import *
+from texas_holdem.shorthand_notations import *
+
+
+class TestPreflopTable(unittest.TestCase):
+  def test_classes(self):
+    class_sizes = Counter(hole_cards_class(hc) for hc in combinations(range(52), 2))
+    self.assertEqual(len(class_sizes), 169)
+    for class_index, size in class_sizes.items():
+      alias = class_alias(class_index)
+      self.assertEqual(size, 6 if len(alias) == 2 else 4 if alias.endswith('s') else 12)
+      self.assertEqual(hole_cards_class(class_representative(class_index)), class_index)
+    self.assertEqual(class_alias(hole_cards_class((card_to_int(SA), card_to_int(SK)))), 'AKs')
+    self.assertEqual(class_alias(hole_cards_class((card_to_int(HK), card_to_int(SA)))), 'AKo')
+    self.assertEqual(class_alias(hole_cards_class((card_to_int(D2), card_to_int(C2)))), '22')
+
+  def test_count_better_hole_cards_for_all(self):
+    board = tuple(card_to_int(c) for c in [H5, C5, SJ, SQ, SK])
+    counts = list(count_better_hole_cards_for_all(board))
+    self.assertEqual(len(counts), 1081)
+    for hole_cards, num_better_hole_cards in counts[::10]:
+      self.assertEqual(
+          num_better_hole_cards, len(find_better_hole_card_ints(hole_cards, board)))
+
+  def test_compute_uses_table(self):
+    chances = compute([SA, HA], [])
+    self.assertEqual(chances, lookup((card_to_int(SA), card_to_int(HA))))
+    self.assertEqual(chances, compute([CA, DA], []))
+    self.assertGreater(chances, compute([SK, HK], []))
+    self.assertGreater(compute([SA, SK], []), compute([SA, HK], []))
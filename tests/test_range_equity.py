@@ -0,0 +1,51 @@
+import unittest
+from itertools import islice
+
+from texas_holdem.card import card_to_int
+from texas_holdem.engine import EquityEngine
+from texas_holdem.evaluate_hand import evaluate
+from texas_holdem.hand_range import COMBOS, HandRange
+from texas_holdem.my_chances import OpponentError
+from texas_holdem.range_equity import compute_range_vs_range
+from texas_holdem.shorthand_notations import *
+
+
+class TestRangeEquity(unittest.TestCase):
+  def test_same_as_every_pair_of_hole_cards_on_the_river(self):
+    my_range = HandRange.parse('TT+, AQs+, 76s:0.5')
+    opponents_range = HandRange.parse('88+, ATs+, KQs, AsKh:2')
+    community_cards = [H2, D3, S5, C9, CA]
+    board = tuple(card_to_int(c) for c in community_cards)
+    weighted_bad_cases = weighted_all_cases = 0.0
+    my_combos = [(hc, w) for hc, w in zip(COMBOS, my_range.weights) if w > 0]
+    opponents_combos = [(hc, w) for hc, w in zip(COMBOS, opponents_range.weights) if w > 0]
+    for my_hole_cards, my_weight in my_combos:
+      for opponents_hole_cards, opponents_weight in opponents_combos:
+        if len(set(my_hole_cards + opponents_hole_cards + board)) == 9:
+          weight = my_weight * opponents_weight
+          weighted_all_cases += weight
+          if evaluate(board + my_hole_cards) < evaluate(board + opponents_hole_cards):
+            weighted_bad_cases += weight
+    result = compute_range_vs_range(my_range, opponents_range, community_cards, num_processes=2)
+    self.assertAlmostEqual(result.equity, 1 - weighted_bad_cases / weighted_all_cases, places=12)
+
+  def test_holdings_same_as_compute(self):
+    my_range = HandRange.parse('TT+, AQs+, 76s:0.5')
+    opponents_range = HandRange.parse('88+, ATs+, KQs, AsKh')
+    with EquityEngine(processes=2) as engine:
+      for community_cards in ([H2, D3, S5, C9], [H2, D3, S5, C9, CA]):
+        result = engine.compute_range_vs_range(my_range, opponents_range, community_cards)
+        self.assertEqual(len(result.holdings), len(my_range.remove_cards(community_cards)))
+        for hole_cards, chances in islice(result.holdings.items(), 0, None, 5):
+          self.assertAlmostEqual(
+              chances, engine.compute(list(hole_cards), community_cards, opponents_range),
+              places=12)
+
+  def test_blocked_ranges(self):
+    with self.assertRaises(OpponentError):
+      compute_range_vs_range(
+          HandRange.parse('AsKs'), HandRange.parse('AsKh'), [H2, D3, S5], num_processes=1)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from texas_holdem import server
+from texas_holdem.cache import ResultCache
+from texas_holdem.hand_range import HandRange
+from texas_holdem.my_chances import OpponentError, compute
+from texas_holdem.shorthand_notations import *
+
+from tests import NoAces
+
+
+class TestEquityServer(unittest.TestCase):
+  def test_identical_requests_are_coalesced(self):
+    equity_server = server.EquityServer(processes=2)
+
+    async def ask_concurrently():
+      return await asyncio.gather(
+          *(equity_server.compute([S2, DA], [H2, D3, S5, C9]) for _ in range(3)),
+          # The same situation with the suits swapped.
+          equity_server.compute([H2, DA], [S2, D3, H5, C9]),
+          equity_server.compute([SK, SQ], [H2, D3, S5, C9]))
+    loop = asyncio.new_event_loop()
+    try:
+      results = loop.run_until_complete(ask_concurrently())
+    finally:
+      loop.close()
+      equity_server.close()
+    expected = compute([S2, DA], [H2, D3, S5, C9])
+    for chances in results[:4]:
+      self.assertAlmostEqual(chances, expected, places=12)
+    self.assertAlmostEqual(results[4], compute([SK, SQ], [H2, D3, S5, C9]), places=12)
+    self.assertEqual(equity_server.num_requests, 5)
+    self.assertEqual(equity_server.num_coalesced, 3)
+
+  def test_client(self):
+    address = os.path.join(tempfile.mkdtemp(), 'texas_holdem.sock')
+    equity_server = server.EquityServer(processes=2, cache=ResultCache())
+    loop = asyncio.new_event_loop()
+    listening = loop.run_until_complete(equity_server.start(address))
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    try:
+      hand_range = HandRange.parse('TT+, AJs+')
+      self.assertAlmostEqual(
+          server.compute([S2, DA], [H2, D3, S5, C9], address=address),
+          compute([S2, DA], [H2, D3, S5, C9]), places=12)
+      self.assertAlmostEqual(
+          server.compute([S2, DA], [H2, D3, S5, C9, CA], hand_range, address=address),
+          compute([S2, DA], [H2, D3, S5, C9, CA], hand_range), places=12)
+
+      local_cache = ResultCache()
+      server.compute([S2, DA], [H2, D3, S5, C9], cache=local_cache, address=address)
+      self.assertEqual(local_cache.stats.size, 1)
+      self.assertEqual(equity_server.engine.cache.stats.hits, 1)
+
+      with self.assertRaises(OpponentError):
+        server.compute([S2, DA], [H2, D3, S5, C9], HandRange.parse('AdAh'), address=address)
+      with self.assertRaises(AssertionError):
+        server.compute([S2, DA], [H2, D3, S5, C9, CA, C2], address=address)
+      with self.assertRaises(TypeError):
+        server.compute([S2, DA], [H2, D3, S5, C9], NoAces(), address=address)
+    finally:
+      listening.close()
+      # Lets the handlers of the connections notice that they were closed.
+      asyncio.run_coroutine_threadsafe(asyncio.sleep(0.1), loop).result()
+      loop.call_soon_threadsafe(loop.stop)
+      thread.join()
+      loop.close()
+      equity_server.close()
+
+  def test_start_only_replaces_a_stale_socket(self):
+    directory = tempfile.mkdtemp()
+    address = os.path.join(directory, 'texas_holdem.sock')
+    equity_server = server.EquityServer(processes=1)
+    loop = asyncio.new_event_loop()
+    try:
+      # Not a socket.
+      with open(address, 'w') as f:
+        f.write('data')
+      with self.assertRaises(server.ServerError):
+        loop.run_until_complete(equity_server.start(address))
+      with open(address) as f:
+        self.assertEqual(f.read(), 'data')
+      os.remove(address)
+
+      # A socket nobody listens on any more.
+      with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(address)
+      listening = loop.run_until_complete(equity_server.start(address))
+      try:
+        # Another server is still listening.
+        with self.assertRaises(server.ServerError):
+          loop.run_until_complete(equity_server.start(address))
+        self.assertTrue(os.path.exists(address))
+      finally:
+        listening.close()
+        loop.run_until_complete(listening.wait_closed())
+    finally:
+      loop.close()
+      equity_server.close()
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from texas_holdem.my_chances import n_choose_m
+from texas_holdem.shorthand_notations import *
+from texas_holdem.suit_isomorphism import list_suit_permutations_fixing, \
+    list_dealt_cards_up_to_suit_permutation
+
+from tests import ints
+
+
+class TestSuitIsomorphism(unittest.TestCase):
+  def test_list_suit_permutations_fixing(self):
+    # Suited hole cards: the other 3 suits can be permuted freely.
+    self.assertEqual(len(list_suit_permutations_fixing([ints(SA, SK)])), 6)
+    # Offsuit hole cards: only the 2 suits not in the hole cards can be swapped.
+    self.assertEqual(len(list_suit_permutations_fixing([ints(SA, HK)])), 2)
+    # Pocket pair: the suits of the pair can be swapped and so can the other 2 suits.
+    self.assertEqual(len(list_suit_permutations_fixing([ints(SA, HA)])), 4)
+    # The hole cards and the community cards are fixed separately.
+    self.assertEqual(len(list_suit_permutations_fixing([ints(SA, HA), ints(S2, S3, S4)])), 2)
+
+  def test_number_of_deals_adds_up(self):
+    for card_sets in [[ints(SA, SK)], [ints(SA, HK), ints(D2, S7, C9, C10)], [ints(D5, C5)]]:
+      num_remaining_cards = 52 - sum(len(cs) for cs in card_sets)
+      for num_cards in (1, 2):
+        deals = list(list_dealt_cards_up_to_suit_permutation(card_sets, num_cards))
+        self.assertEqual(sum(n for _, n in deals), n_choose_m(num_remaining_cards, num_cards))
+        self.assertEqual(len(set(cards for cards, _ in deals)), len(deals))
+
+  def test_deals_are_reduced(self):
+    deals = list(list_dealt_cards_up_to_suit_permutation([ints(SA, SK)], 1))
+    # The 11 remaining spades are all different, but the other cards of the same rank are
+    # interchangeable.
+    self.assertEqual(len(deals), 11 + 13)
+
+  def test_shards_partition_the_deals(self):
+    card_sets = [ints(SA, HK), ints(D2, S7, C9)]
+    deals = list(list_dealt_cards_up_to_suit_permutation(card_sets, 2))
+    sharded_deals = [
+        deal for shard_index in range(7)
+        for deal in list_dealt_cards_up_to_suit_permutation(card_sets, 2, (shard_index, 7))]
+    self.assertCountEqual(sharded_deals, deals)